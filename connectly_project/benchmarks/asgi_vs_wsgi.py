@@ -0,0 +1,189 @@
+"""
+Compares concurrency of the async (ASGI, uvicorn) endpoints with their sync (WSGI) twins.
+
+    python benchmarks/asgi_vs_wsgi.py --requests 500 --concurrency 50
+
+Starts uvicorn (one worker, event loop) and a WSGI server with a fixed thread pool
+(like one sync worker with N threads), seeds a benchmark user with a few posts in the
+configured database, then fires the same number of concurrent requests at each pair:
+    /async/feed/              vs  /feed/
+    /async/posts/<id>/        vs  /posts/<id>/
+    /async/users/<id>/followers/  vs  /posts/users/<id>/followers/
+
+Requires uvicorn and httpx. The servers run over plain HTTP (SECURE_SSL_REDIRECT=False).
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "connectly_project.settings")
+os.environ["SECURE_SSL_REDIRECT"] = "False"
+
+
+# -------------------- WSGI SERVER --------------------
+class PooledWSGIServer(WSGIServer):
+    """
+    wsgiref server that handles requests on a fixed-size thread pool.
+    """
+    threads = 4
+
+    def server_activate(self):
+        super().server_activate()
+        self.executor = ThreadPoolExecutor(max_workers=self.threads)
+
+    def process_request(self, request, client_address):
+        self.executor.submit(self._handle, request, client_address)
+
+    def _handle(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_wsgi(port, threads):
+    from connectly_project.wsgi import application
+
+    PooledWSGIServer.threads = threads
+    server = make_server("127.0.0.1", port, application, server_class=PooledWSGIServer, handler_class=QuietHandler)
+    server.serve_forever()
+
+
+# -------------------- SETUP --------------------
+def seed():
+    import django
+    django.setup()
+
+    from django.contrib.auth.models import User
+    from rest_framework_simplejwt.tokens import RefreshToken
+    from factories.post_factory import PostFactory
+
+    user, _ = User.objects.get_or_create(username="bench_user", defaults={"email": "bench@connectly.com"})
+    posts = list(user.posts.all()[:1])
+    if not posts:
+        posts = [
+            PostFactory.create_post(post_type="text", title=f"Benchmark post {i}", content="x" * 500, author=user)
+            for i in range(10)
+        ]
+    return str(RefreshToken.for_user(user).access_token), user.id, posts[0].id
+
+
+def start_servers(asgi_port, wsgi_port, wsgi_threads):
+    env = dict(os.environ)
+    asgi = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "connectly_project.asgi:application",
+         "--port", str(asgi_port), "--workers", "1", "--log-level", "warning", "--no-access-log"],
+        cwd=PROJECT_DIR, env=env,
+    )
+    wsgi = subprocess.Popen(
+        [sys.executable, __file__, "--serve-wsgi", str(wsgi_port), "--wsgi-threads", str(wsgi_threads)],
+        cwd=PROJECT_DIR, env=env,
+    )
+    return [asgi, wsgi]
+
+
+async def wait_until_up(client, url, timeout=20):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            await client.get(url)
+            return
+        except Exception:
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not start")
+
+
+# -------------------- LOAD --------------------
+async def run_load(client, url, headers, total, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def one():
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.get(url, headers=headers)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rps": total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "errors": errors,
+    }
+
+
+async def main(args, token, user_id, post_id):
+    import httpx
+
+    headers = {"Authorization": f"Bearer {token}"}
+    asgi_base = f"http://127.0.0.1:{args.asgi_port}"
+    wsgi_base = f"http://127.0.0.1:{args.wsgi_port}"
+
+    pairs = [
+        ("feed", "/async/feed/", "/feed/"),
+        ("post detail", f"/async/posts/{post_id}/", f"/posts/{post_id}/"),
+        ("follower counts", f"/async/users/{user_id}/followers/", f"/posts/users/{user_id}/followers/"),
+    ]
+
+    servers = start_servers(args.asgi_port, args.wsgi_port, args.wsgi_threads)
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency)
+        async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+            await wait_until_up(client, asgi_base + "/async/feed/")
+            await wait_until_up(client, wsgi_base + "/feed/")
+
+            print(f"{args.requests} requests, concurrency {args.concurrency}, "
+                  f"WSGI pool of {args.wsgi_threads} threads vs 1 uvicorn event loop\n")
+            print(f"{'endpoint':<18}{'server':<8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'errors':>8}")
+            for name, asgi_path, wsgi_path in pairs:
+                for server, url in (("ASGI", asgi_base + asgi_path), ("WSGI", wsgi_base + wsgi_path)):
+                    await run_load(client, url, headers, min(args.concurrency, args.requests), args.concurrency)  # warm up
+                    result = await run_load(client, url, headers, args.requests, args.concurrency)
+                    print(f"{name:<18}{server:<8}{result['rps']:>10.1f}{result['p50_ms']:>10.1f}"
+                          f"{result['p95_ms']:>10.1f}{result['errors']:>8}")
+    finally:
+        for server in servers:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--wsgi-threads", type=int, default=4)
+    parser.add_argument("--asgi-port", type=int, default=8101)
+    parser.add_argument("--wsgi-port", type=int, default=8102)
+    parser.add_argument("--serve-wsgi", type=int, metavar="PORT", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve_wsgi:
+        serve_wsgi(args.serve_wsgi, args.wsgi_threads)
+    else:
+        # Seed with the sync ORM before entering the event loop
+        asyncio.run(main(args, *seed()))
@@ -0,0 +1,97 @@
+"""
+Compares DRF's stdlib JSON renderer/parser with the orjson-backed ones (posts/renderers.py),
+and a cache hit on a pickled page dict with one on pre-encoded bytes.
+
+    python benchmarks/json_rendering.py --posts 20 --comments 10 --iterations 2000
+
+The payload is shaped like a feed page from PostSerializer: posts with metadata,
+nested comments and like counts.
+"""
+import argparse
+import datetime
+import io
+import os
+import pickle
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "connectly_project.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from rest_framework.parsers import JSONParser  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from posts.renderers import FastJSONParser, FastJSONRenderer, dumps, orjson  # noqa: E402
+
+
+def feed_page(posts, comments):
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return {
+        "count": posts * 10,
+        "next": "https://localhost:8000/feed/?page=2",
+        "previous": None,
+        "results": [{
+            "id": i,
+            "title": f"Post {i}",
+            "content": "Lorem ipsum dolor sit amet " * 10,
+            "post_type": "text",
+            "metadata": {"tags": ["django", "python"], "location": {"lat": 14.6, "lng": 121.0}},
+            "author": f"user{i}",
+            "privacy": "public",
+            "created_at": (now - datetime.timedelta(minutes=i)).isoformat(),
+            "like_count": i * 3,
+            "comments": [{
+                "id": i * 100 + j,
+                "content": "Nice post! " * 3,
+                "author": f"commenter{j}",
+                "created_at": (now - datetime.timedelta(seconds=j)).isoformat(),
+                "like_count": j,
+            } for j in range(comments)],
+        } for i in range(posts)],
+    }
+
+
+def per_call_us(func, iterations):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - started) / iterations * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=20)
+    parser.add_argument("--comments", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    if orjson is None:
+        print("orjson is not installed: the fast renderer falls back to stdlib json.\n")
+
+    page = feed_page(args.posts, args.comments)
+    body = dumps(page)
+    pickled_page = pickle.dumps(page)
+    pickled_body = pickle.dumps(body)
+    print(f"Page: {args.posts} posts x {args.comments} comments, {len(body)} bytes\n")
+
+    stdlib_renderer, fast_renderer = JSONRenderer(), FastJSONRenderer()
+    stdlib_parser, fast_parser = JSONParser(), FastJSONParser()
+    rows = [
+        ("render, stdlib json", lambda: stdlib_renderer.render(page)),
+        ("render, orjson", lambda: fast_renderer.render(page)),
+        ("parse, stdlib json", lambda: stdlib_parser.parse(io.BytesIO(body))),
+        ("parse, orjson", lambda: fast_parser.parse(io.BytesIO(body))),
+        ("cache hit, pickled dict + render", lambda: stdlib_renderer.render(pickle.loads(pickled_page))),
+        ("cache hit, encoded bytes", lambda: pickle.loads(pickled_body)),
+    ]
+    for label, func in rows:
+        print(f"{label:34} {per_call_us(func, args.iterations):10.1f} us")
+
+
+if __name__ == "__main__":
+    main()
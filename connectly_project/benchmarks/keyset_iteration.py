@@ -0,0 +1,106 @@
+"""
+Peak memory of walking every user: keyset chunks (posts/iteration.py) vs loading the table.
+
+    python benchmarks/keyset_iteration.py --users 1000000
+
+Builds a scratch SQLite database from the migrated snapshot (posts/db_snapshot.py), fills
+auth_user with --users rows, then measures with tracemalloc, at growing table sizes:
+    instances     for user in User.objects.all()              (up to --max-instances users)
+    values_list   for id in User.objects.values_list("id", flat=True)
+    keyset        for id in iter_ids(User.objects.all())
+and clear_pages(), which invalidates every user's pages (one increment of the family's
+generation, so it stays flat however many users there are).
+The configured database is not touched.
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "connectly_project.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth.models import User  # noqa: E402
+from django.db import connections  # noqa: E402
+
+from posts.db_snapshot import build_snapshot  # noqa: E402
+from posts.event_handlers import FEED_PAGE_KEY, clear_pages  # noqa: E402
+from posts.iteration import CHUNK_SIZE, iter_ids  # noqa: E402
+
+
+def add_users(path, start, stop):
+    with sqlite3.connect(path) as db:
+        db.executemany(
+            "INSERT INTO auth_user (id, password, is_superuser, username, first_name, last_name, email, "
+            "is_staff, is_active, date_joined) VALUES (?, '', 0, ?, '', '', '', 0, 1, '2025-01-01 00:00:00')",
+            ((i, f"user{i}") for i in range(start + 1, stop + 1)),
+        )
+
+
+def measure(walk):
+    """
+    (peak MB, seconds, rows) of walk().
+    """
+    tracemalloc.start()
+    started = time.perf_counter()
+    rows = walk()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 2 ** 20, elapsed, rows
+
+
+def count(iterable):
+    return sum(1 for _ in iterable)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--max-instances", type=int, default=100_000,
+                        help="Largest table the model instance baseline is run on (it needs GBs at 1M).")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    sizes = [size for size in (10_000, 100_000, 1_000_000, 10_000_000) if size < args.users] + [args.users]
+    walks = {
+        "instances": lambda: count(User.objects.all()),
+        "values_list": lambda: count(User.objects.values_list("id", flat=True)),
+        "keyset": lambda: count(iter_ids(User.objects.all(), args.chunk_size)),
+        "clear_pages": lambda: clear_pages(FEED_PAGE_KEY),
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "users.sqlite3"
+        build_snapshot(path)
+        connection = connections["default"]
+        connection.close()
+        connection.settings_dict["NAME"] = str(path)
+
+        print(f"chunk size {args.chunk_size}, peak traced memory (MB) / seconds\n")
+        print(f"{'users':>10}  " + "  ".join(f"{name:>20}" for name in walks))
+        loaded = 0
+        for size in sizes:
+            add_users(path, loaded, size)
+            loaded = size
+            cells = []
+            for name, walk in walks.items():
+                if name == "instances" and size > args.max_instances:
+                    cells.append(f"{'-':>20}")
+                    continue
+                peak, elapsed, _ = measure(walk)
+                cells.append(f"{peak:>10.1f} / {elapsed:>7.2f}")
+            print(f"{size:>10}  " + "  ".join(cells))
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
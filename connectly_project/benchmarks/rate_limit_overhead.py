@@ -0,0 +1,90 @@
+"""
+Measures the per-request cost of the rate limiter (posts/throttling.py).
+
+    python benchmarks/rate_limit_overhead.py --iterations 100000
+
+Runs allow_request() for both throttles against the configured cache (LocMemCache by
+default) and against the in-process fallback, and prints microseconds per request.
+DRF's stock UserRateThrottle (timestamp list in the cache) is shown for reference.
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "connectly_project.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth.models import AnonymousUser  # noqa: E402
+from django.core.cache import cache  # noqa: E402
+from rest_framework.request import Request  # noqa: E402
+from rest_framework.test import APIRequestFactory  # noqa: E402
+from rest_framework.throttling import UserRateThrottle  # noqa: E402
+
+from posts.throttling import EndpointRateLimit, UserRateLimit  # noqa: E402
+from singletons.config_manager import ConfigManager  # noqa: E402
+
+
+class FakeUser:
+    is_authenticated = True
+
+    def __init__(self, user_id):
+        self.id = self.pk = user_id
+
+
+class FeedView:
+    throttle_scope = "feed"
+
+
+def make_requests(count):
+    factory = APIRequestFactory()
+    requests = []
+    for i in range(count):
+        request = Request(factory.get("/feed/"))
+        request.user = FakeUser(i) if i % 10 else AnonymousUser()
+        requests.append(request)
+    return requests
+
+
+def measure(throttle, requests, iterations):
+    view = FeedView()
+    started = time.perf_counter()
+    for i in range(iterations):
+        throttle.allow_request(requests[i % len(requests)], view)
+    return (time.perf_counter() - started) / iterations * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=100_000)
+    parser.add_argument("--clients", type=int, default=1000, help="Distinct users/IPs to spread requests over.")
+    args = parser.parse_args()
+
+    # Effectively unlimited, so every call takes the full "allowed" path
+    config = ConfigManager()
+    config.set_setting("RATE_LIMIT", 10 ** 9)
+    config.set_setting("RATE_LIMIT_SCOPES", {"feed": 10 ** 9})
+    UserRateThrottle.rate = "1000000000/min"
+
+    requests = make_requests(args.clients)
+    print(f"{args.iterations} calls over {args.clients} clients, cache backend: {cache.__class__.__name__}\n")
+
+    cache.clear()
+    print(f"UserRateLimit (shared cache)        {measure(UserRateLimit(), requests, args.iterations):8.2f} us/request")
+    print(f"EndpointRateLimit (shared cache)    {measure(EndpointRateLimit(), requests, args.iterations):8.2f} us/request")
+
+    with mock.patch.object(cache, "incr", side_effect=ConnectionError("cache down")):
+        print(f"UserRateLimit (in-process fallback) {measure(UserRateLimit(), requests, args.iterations):8.2f} us/request")
+
+    cache.clear()
+    print(f"DRF UserRateThrottle (reference)    {measure(UserRateThrottle(), requests, args.iterations):8.2f} us/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'connectly_project.settings')
 
 application = get_asgi_application()
+
+# Serving processes reload the runtime config on `kill -HUP <pid>`
+from singletons.config_manager import ConfigManager  # noqa: E402
+
+ConfigManager().install_reload_signal()
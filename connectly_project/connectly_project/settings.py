@@ -73,6 +73,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'posts.middleware.CompressionMiddleware',  # zstd/br/gzip, see COMPRESSION_MIN_SIZE in ConfigManager
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -80,6 +81,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'allauth.account.middleware.AccountMiddleware',
+    'posts.middleware.PrimaryPinMiddleware',  # Read-your-writes for replica reads
 ]
 
 MIDDLEWARE.insert(0, 'corsheaders.middleware.CorsMiddleware')
@@ -115,6 +117,38 @@ DATABASES = {
     }
 }
 
+# Read replicas (optional)
+# Set REPLICA_DATABASE_NAME to a second SQLite file (or configure a Postgres replica here)
+# and the read-heavy views (feed, lists, follower counts) will read from it.
+REPLICA_DATABASE_NAME = os.getenv("REPLICA_DATABASE_NAME")
+if REPLICA_DATABASE_NAME:
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': REPLICA_DATABASE_NAME,
+        'TEST': {'MIRROR': 'default'},
+    }
+
+# Archive of old posts (optional separate database, see posts/archive.py)
+# Set ARCHIVE_DATABASE_NAME to keep the archive tables in their own SQLite file.
+ARCHIVE_DATABASE_NAME = os.getenv("ARCHIVE_DATABASE_NAME")
+ARCHIVE_DATABASE = 'default'
+if ARCHIVE_DATABASE_NAME:
+    DATABASES['archive'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ARCHIVE_DATABASE_NAME,
+    }
+    ARCHIVE_DATABASE = 'archive'
+ARCHIVE_AFTER_DAYS = 365  # Posts older than this are archived by `manage.py archive_posts`
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias not in ('default', ARCHIVE_DATABASE)]
+DATABASE_ROUTERS = ['posts.db_router.ArchiveRouter', 'posts.db_router.PrimaryReplicaRouter']
+REPLICA_PIN_SECONDS = 5  # Keep a user on the primary this long after they write
+
+# Migrated SQLite template that `manage.py reset_db` and the test runner copy instead of
+# running every migration (posts/db_snapshot.py). Rebuilt when migrations are added.
+DB_SNAPSHOT_PATH = BASE_DIR / 'db_snapshot.sqlite3'
+TEST_RUNNER = 'posts.db_snapshot.SnapshotTestRunner'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -162,7 +196,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # List of added commands
 
 # Force HTTPS Redirect
-SECURE_SSL_REDIRECT = True  
+SECURE_SSL_REDIRECT = os.getenv("SECURE_SSL_REDIRECT", "True") == "True"  # Set to False for local plain-HTTP benchmarks
 SESSION_COOKIE_SECURE = True  
 CSRF_COOKIE_SECURE = True  
 SECURE_HSTS_SECONDS = 31536000  # 1 year  
@@ -177,6 +211,15 @@ PASSWORD_HASHERS = [
     'django.contrib.auth.hashers.BCryptPasswordHasher',
 ]
 
+# Pub/sub behind the /events/ stream (posts/realtime.py). LocalBroker reaches only clients
+# connected to the same process; multi-worker deployments need a shared backend.
+REALTIME_BROKER = os.getenv("REALTIME_BROKER", "posts.realtime.LocalBroker")
+
+# Runtime config (singletons/config_manager.py): overrides for its defaults, then CONNECTLY_<KEY>
+# env vars, then this JSON file, which is watched and hot-reloaded (as on SIGHUP)
+CONNECTLY_CONFIG = {}
+CONNECTLY_CONFIG_FILE = os.getenv("CONNECTLY_CONFIG_FILE")
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework.authentication.SessionAuthentication',  # Enables login via API
@@ -185,7 +228,22 @@ REST_FRAMEWORK = {
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',  # Secure all endpoints
-    )
+    ),
+    # orjson-backed when orjson is installed, stdlib json otherwise (posts/renderers.py)
+    'DEFAULT_RENDERER_CLASSES': (
+        'posts.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'posts.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
+    # Limits come from ConfigManager (RATE_LIMIT / RATE_LIMIT_SCOPES), see posts/throttling.py
+    'DEFAULT_THROTTLE_CLASSES': (
+        'posts.throttling.UserRateLimit',
+        'posts.throttling.EndpointRateLimit',
+    ),
 }
 
 AUTHENTICATION_BACKENDS = (
@@ -202,6 +260,30 @@ SIMPLE_JWT = {
     'BLACKLIST_AFTER_ROTATION': False,  # Blacklist the old refresh token after rotation
 }
 
+# Audit log
+# AUDITLOG_BUFFERED: capture entries in memory and write them in batches after commit
+# AUDITLOG_MODEL_POLICY: "always", "skip" or a sample rate (0.0-1.0) per model
+AUDITLOG_BUFFERED = os.getenv("AUDITLOG_BUFFERED", "False") == "True"
+AUDITLOG_BACKGROUND_FLUSH = True
+AUDITLOG_FLUSH_INTERVAL = 2  # Seconds between background flushes
+AUDITLOG_BATCH_SIZE = 500
+AUDITLOG_MAX_PENDING = 10000  # Entries kept for retry while flushes fail; the oldest are dropped past this
+AUDITLOG_MODEL_POLICY = {
+    # 'posts.Like': 0.1,  # Example: keep 1 in 10 like/unlike entries
+}
+AUDITLOG_RETENTION_DAYS = 90  # Used by `manage.py compact_auditlog`
+
+# Domain events (posts/events.py)
+EVENTS_BACKGROUND_DISPATCH = True  # Run background handlers on a worker thread, else inline after commit
+EVENTS_MAX_ATTEMPTS = 5  # `manage.py process_outbox` gives up on an event after this many failures
+EVENTS_RETENTION_DAYS = 7  # Processed outbox rows older than this are deleted by process_outbox
+
+# Cold start budget for `manage.py profile_startup` (django.setup() plus the URLconf)
+STARTUP_IMPORT_BUDGET_MS = 2000
+
+# Stateless JWT authentication (posts/authentication.py): cached user state TTL
+USER_STATE_CACHE_SECONDS = 30
+
 # Media configuration
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
@@ -234,6 +316,11 @@ SOCIALACCOUNT_PROVIDERS = {
     }
 }
 
+# Google token verification (see posts/google_auth.py)
+GOOGLE_USERINFO_URL = "https://www.googleapis.com/oauth2/v2/userinfo"
+GOOGLE_HTTP_TIMEOUT = 5  # Seconds before giving up on Google
+GOOGLE_TOKEN_CACHE_SECONDS = 60  # How long a verified access token is trusted without asking Google again
+
 # Google Drive Directory Access
 GOOGLE_DRIVE_CREDENTIALS = "C:/Users/STUDY MODE/Desktop/apt-api-group11/service_account.json"
 GOOGLE_DRIVE_PARENT_FOLDER_ID = os.getenv("GOOGLE_DRIVE_PARENT_FOLDER_ID")
@@ -24,7 +24,9 @@ from django.conf.urls.static import static
 from django.urls import re_path
 from posts.private_media import ProtectedMediaView
 
-from posts.views import GoogleLogin, ConvertTokenView, UserFeedView, UserProfileView, UploadPhotoView
+from posts import async_views
+from posts.lazy_views import lazy_view
+from posts.views import ConvertTokenView, UserFeedView, UserProfileView, UploadPhotoView, SearchView, ExportView
 
 
 urlpatterns = [
@@ -42,16 +44,27 @@ urlpatterns = [
     re_path(r'^media/(?P<path>.*)$', ProtectedMediaView.as_view(), name='protected_media'),
 
     # Google OAuth
-    path('auth/google/', GoogleLogin.as_view(), name='google_login'),
+    path('auth/google/', lazy_view('posts.social_views.GoogleLogin'), name='google_login'),
     path('auth/convert-token/', ConvertTokenView.as_view(), name='convert_token'),
 
     # Feed endpoint
     path('feed/', UserFeedView.as_view(), name='user-feed'),
 
+    # Full-text search endpoint
+    path('search/', SearchView.as_view(), name='search'),
+
     # Profile endpoint
     path('profile/', UserProfileView.as_view(), name='user-profile'),
     path('upload-photo/', UploadPhotoView.as_view(), name='upload-photo'),
+    path('export/', ExportView.as_view(), name='export'),  # Streamed NDJSON/CSV data export
 
+    # Native async (ASGI) variants of the read-heavy and I/O-bound endpoints
+    path('async/feed/', async_views.async_user_feed, name='async-user-feed'),
+    path('async/posts/<int:pk>/', async_views.async_post_detail, name='async-post-detail'),
+    path('async/users/<int:user_id>/followers/', async_views.async_user_followers, name='async-user-followers'),
+    path('async/auth/convert-token/', async_views.async_convert_token, name='async-convert-token'),
+    path('async/upload-photo/', async_views.async_upload_photo, name='async-upload-photo'),
+    path('events/', async_views.event_stream, name='event-stream'),  # Server-Sent Events push
 ]
 
 if settings.DEBUG:
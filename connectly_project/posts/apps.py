@@ -2,4 +2,16 @@ from django.apps import AppConfig
 
 class PostsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'posts'
\ No newline at end of file
+    name = 'posts'
+
+    def ready(self):
+        # Connect model signal receivers (search index sync)
+        from . import signals  # noqa: F401
+
+        # Subscribe the domain event handlers (posts/events.py)
+        from . import event_handlers  # noqa: F401
+
+        # Hot reload of the runtime config file (singletons/config_manager.py); the
+        # SIGHUP reload is installed by the WSGI/ASGI entry points
+        from singletons.config_manager import ConfigManager
+        ConfigManager().watch_config_file()
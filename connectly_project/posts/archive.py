@@ -0,0 +1,223 @@
+from auditlog.context import disable_auditlog
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+
+from singletons.logger_singleton import LoggerSingleton
+from .db_router import get_archive_alias
+from .iteration import chunked_ids
+from .models import ArchivedComment, ArchivedLike, ArchivedPost, Comment, Like, Post, PostScore
+from .purge import forget_hidden
+from .serializers import count_subquery
+
+logger = LoggerSingleton().get_logger()
+
+# ------------------- ARCHIVAL ----------------------
+# Old posts are moved with their comments and likes into the archive tables, so the live
+# tables that every feed, list and count query scans only hold recent rows. Each archived
+# post and comment keeps its like/comment totals, so counts stay right without the rows.
+#
+# The archive may be another database, so a batch cannot be moved in one transaction: it
+# is first copied (refreshing rows already there), then deleted from the live tables. A run
+# that dies in between leaves rows in both places, and the next run finishes the move.
+#
+# A comment or like can be added between the copy and the delete. The delete removes only
+# the rows that were copied, skips posts whose counts changed since, and rolls the batch
+# back if an unarchived comment or like still points at a deleted row. Skipped posts are
+# copied again (with fresh counts) and moved by the next run.
+#
+# The live rows are deleted in bulk, without the per-row post_delete receivers or audit
+# entries: the batch removes their search rows and trending scores with one statement each,
+# bumps the versions once it commits, and writes a single log line instead.
+POST_COLUMNS = ("id", "author_id", "title", "content", "post_type", "metadata", "image", "video", "privacy",
+                "created_at")
+COMMENT_COLUMNS = ("id", "post_id", "author_id", "content", "comment_type", "metadata", "image", "video",
+                   "created_at")
+LIKE_COLUMNS = ("id", "user_id", "post_id", "comment_id", "created_at")
+DELETE_CHUNK_SIZE = 500
+
+
+def posts_to_archive(cutoff):
+    return Post.objects.filter(created_at__lt=cutoff)
+
+
+class ArchiveConflict(Exception):
+    pass
+
+
+# Live rows pointing at each archived table, as (queryset, field); any left once their
+# target is deleted were not archived
+REFERRERS = {
+    Like: [],
+    Comment: [(Like.objects, "comment_id")],
+    Post: [(Comment.all_objects, "post_id"), (Like.objects, "post_id")],
+}
+
+
+def delete_only(model, ids):
+    """
+    Deletes the model's rows with these ids in bulk, sending no signals. Raises ArchiveConflict
+    (rolling back the surrounding transaction) if rows that were not archived still point at them.
+    """
+    for start in range(0, len(ids), DELETE_CHUNK_SIZE):
+        chunk = ids[start:start + DELETE_CHUNK_SIZE]
+        queryset = model._base_manager.filter(id__in=chunk)
+        queryset._raw_delete(queryset.db)
+        for referrers, field in REFERRERS[model]:
+            left = referrers.filter(**{f"{field}__in": chunk}).count()
+            if left:
+                raise ArchiveConflict(f"{left} {referrers.model._meta.label} rows still point at "
+                                      f"deleted {model._meta.label} rows")
+
+
+def drop_stale_copies(archived, copied):
+    """
+    Deletes the rows of the archived queryset that are not among the rows just copied.
+    """
+    stale = sorted(set(archived.values_list("id", flat=True)) - {row.id for row in copied})
+    for start in range(0, len(stale), DELETE_CHUNK_SIZE):
+        archived.model.objects.filter(id__in=stale[start:start + DELETE_CHUNK_SIZE]).delete()
+
+
+def unchanged_posts(posts, comments):
+    """
+    Ids of the copied posts whose likes, comments and comment likes still add up to what was
+    copied. Locks them until the transaction ends where the database supports it.
+    """
+    comment_likes = {}
+    for comment in comments:
+        comment_likes[comment.post_id] = comment_likes.get(comment.post_id, 0) + comment.like_count
+    current_comment_likes = dict(
+        Like.objects.filter(comment__post_id__in=[post.id for post in posts]).order_by()
+        .values_list("comment__post_id").annotate(total=Count("id"))
+    )
+    current = {
+        post_id: (like_count, comment_count, current_comment_likes.get(post_id, 0))
+        for post_id, like_count, comment_count in Post.objects.select_for_update().filter(
+            id__in=[post.id for post in posts]
+        ).annotate(
+            current_likes=count_subquery(Like, 'post'),
+            current_comments=count_subquery(Comment, 'post'),
+        ).values_list("id", "current_likes", "current_comments")
+    }
+    return {post.id for post in posts
+            if current.get(post.id) == (post.like_count, post.comment_count, comment_likes.get(post.id, 0))}
+
+
+def archive_batch(post_ids):
+    """
+    Moves the posts, their comments and every like on them to the archive.
+    Returns the number of posts moved.
+    """
+    posts = [
+        ArchivedPost(**row) for row in Post.objects.filter(id__in=post_ids).annotate(
+            like_count=count_subquery(Like, 'post'),
+            comment_count=count_subquery(Comment, 'post'),
+        ).values(*POST_COLUMNS, "like_count", "comment_count")
+    ]
+    comments = [
+        ArchivedComment(**row) for row in Comment.objects.filter(post_id__in=post_ids).annotate(
+            like_count=count_subquery(Like, 'comment'),
+        ).values(*COMMENT_COLUMNS, "like_count")
+    ]
+    likes = [
+        ArchivedLike(**row) for row in Like.objects.filter(
+            Q(post_id__in=post_ids) | Q(comment__post_id__in=post_ids)
+        ).values(*LIKE_COLUMNS)
+    ]
+
+    with transaction.atomic(using=get_archive_alias()):
+        # A post copied by an earlier run that did not move it gets its counts refreshed
+        ArchivedPost.objects.bulk_create(posts, update_conflicts=True, unique_fields=["id"],
+                                         update_fields=["like_count", "comment_count"])
+        ArchivedComment.objects.bulk_create(comments, update_conflicts=True, unique_fields=["id"],
+                                            update_fields=["like_count"])
+        ArchivedLike.objects.bulk_create(likes, ignore_conflicts=True)
+        # ...and loses the comments and likes removed since then
+        archived_comments = ArchivedComment.objects.filter(post_id__in=post_ids)
+        drop_stale_copies(ArchivedLike.objects.filter(Q(post_id__in=post_ids)
+                                                      | Q(comment_id__in=archived_comments.values("id"))), likes)
+        drop_stale_copies(archived_comments, comments)
+
+    post_of_comment = {comment.id: comment.post_id for comment in comments}
+    try:
+        with transaction.atomic(), disable_auditlog():
+            movable = unchanged_posts(posts, comments)
+            forget_hidden(Post.all_objects.filter(id__in=movable), Comment.all_objects.filter(post_id__in=movable))
+            PostScore.objects.filter(post_id__in=movable).delete()
+            delete_only(Like, [like.id for like in likes
+                               if (like.post_id or post_of_comment.get(like.comment_id)) in movable])
+            delete_only(Comment, [comment.id for comment in comments if comment.post_id in movable])
+            # Soft-deleted comments are not archived; they go now instead of with their PurgeJob
+            delete_only(Comment, list(Comment.all_objects.filter(post_id__in=movable, deleted_at__isnull=False)
+                                      .values_list("id", flat=True)))
+            delete_only(Post, sorted(movable))
+    except ArchiveConflict as e:
+        logger.warning(f"Archive batch rolled back, its posts are moved by the next run: {e}")
+        return 0
+
+    if len(movable) < len(posts):
+        logger.info(f"{len(posts) - len(movable)} posts changed while being archived, left for the next run.")
+    logger.info(f"Archive batch moved {len(movable)} posts with their comments and likes (not audited per row).")
+    cache.delete_many([f"post_{post_id}" for post_id in movable])
+    return len(movable)
+
+
+def archive_posts(cutoff, batch_size=500):
+    """
+    Archives every post created before cutoff, batch_size posts at a time. Returns how many moved.
+    """
+    archived = 0
+    for post_ids in chunked_ids(posts_to_archive(cutoff), batch_size):
+        archived += archive_batch(post_ids)
+        logger.info(f"Archived {archived} posts so far.")
+
+    if archived:
+        # Archived posts drop out of cached lists and feeds right away
+        from .event_handlers import clear_feed_pages, clear_post_list_pages
+        clear_post_list_pages()
+        clear_feed_pages()
+    return archived
+
+
+# ------------------- READING ----------------------
+def get_archived_post(post_id):
+    return ArchivedPost.objects.filter(id=post_id).first()
+
+
+def archived_post_data(post):
+    """
+    An archived post rendered like PostSerializer renders a live one, plus "archived": true.
+    """
+    comments = list(ArchivedComment.objects.filter(post_id=post.id).order_by("id"))
+    user_ids = {post.author_id, *(comment.author_id for comment in comments)}
+    usernames = dict(User.objects.filter(id__in=user_ids).values_list("id", "username"))
+
+    return {
+        "id": post.id,
+        "title": post.title,
+        "content": post.content,
+        "post_type": post.post_type,
+        "metadata": post.metadata,
+        "image": post.image or None,
+        "video": post.video or None,
+        "author": usernames.get(post.author_id),
+        "created_at": post.created_at,
+        "comments": [{
+            "id": comment.id,
+            "content": comment.content,
+            "comment_type": comment.comment_type,
+            "metadata": comment.metadata,
+            "image": comment.image or None,
+            "video": comment.video or None,
+            "author": usernames.get(comment.author_id),
+            "post": post.id,
+            "created_at": comment.created_at,
+            "like_count": comment.like_count,
+        } for comment in comments],
+        "like_count": post.like_count,
+        "comment_count": post.comment_count,
+        "privacy": post.privacy,
+        "archived": True,
+    }
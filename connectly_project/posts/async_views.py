@@ -0,0 +1,356 @@
+import asyncio
+import json
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from .authentication import TokenUser, aget_user_state
+from .google_auth import afetch_google_user_info, aget_or_create_social_user
+from .google_drive import upload_to_google_drive
+from .archive import archived_post_data
+from .models import ArchivedPost, Post, Follow
+from .realtime import get_broker
+from .renderers import dumps
+from .event_handlers import FEED_PAGE_KEY, FEED_PAGES_FAMILY
+from .response_cache import (
+    acache_response, aget_cached_response, apage_cache_key, canonical_url, encoded_response, page_number
+)
+from .serializers import PostSerializer, UploadPhotoSerializer
+from .versions import aget_versions, build_validators, not_modified_response, set_validators
+from .views import FeedPagination, cache_timeout, UserFeedView, logger
+from .visibility import NOT_AUTHORIZED, can_view
+
+# -------------------- ASYNC (ASGI) VIEWS --------------------
+# Native async variants of the read-heavy and I/O-bound endpoints. They use the async
+# ORM and async cache so a worker is never blocked while waiting on the database,
+# the cache or Google. Run them under an ASGI server (e.g. uvicorn connectly_project.asgi:application).
+#
+# Posts are loaded with every relation the serializers touch prefetched, so
+# serializing them afterwards runs no queries and is safe inside the event loop.
+
+POST_PREFETCH = ('comments__author', 'comments__likes', 'likes')
+
+
+async def aget_jwt_user(request):
+    """
+    The token's user as a TokenUser built from the cached user state, like
+    StatelessJWTAuthentication. Views needing other fields load the User themselves.
+    """
+    header = request.headers.get("Authorization", "")
+    parts = header.split()
+    if len(parts) != 2 or parts[0] != "Bearer":
+        return None
+    try:
+        token = AccessToken(parts[1])
+    except TokenError:
+        return None
+    try:
+        state = await aget_user_state(token[jwt_settings.USER_ID_CLAIM])
+    except KeyError:
+        return None
+    if state is None or not state["is_active"]:
+        return None
+    return TokenUser(state)
+
+
+async def aauthenticate(request, allow_session=True):
+    """
+    Async counterpart of DRF's JWT + session authentication. Returns the user or None.
+    """
+    user = await aget_jwt_user(request)
+    if user is None and allow_session:
+        session_user = await request.auser()
+        if session_user.is_authenticated:
+            user = session_user
+    return user
+
+
+def async_login_required(allow_session=True):
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            user = await aauthenticate(request, allow_session=allow_session)
+            if user is None:
+                return JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+            request.user = user
+            return await view(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def get_page_params(request):
+    """
+    Same page/page_size rules as FeedPagination.
+    """
+    try:
+        page_number = int(request.GET.get("page", 1))
+    except ValueError:
+        page_number = 0
+
+    pagination = FeedPagination()
+    page_size = pagination.page_size
+    requested_size = request.GET.get(pagination.page_size_query_param)
+    if requested_size and requested_size.isdigit() and int(requested_size) > 0:
+        page_size = min(int(requested_size), pagination.max_page_size)
+
+    return page_number, page_size
+
+
+async def apaginate(request, queryset):
+    """
+    Returns (items, payload) shaped like DRF's PageNumberPagination response, or (None, None)
+    for an invalid page.
+    """
+    page_number, page_size = get_page_params(request)
+    count = await queryset.acount()
+    last_page = max((count + page_size - 1) // page_size, 1)
+    if page_number < 1 or page_number > last_page:
+        return None, None
+
+    offset = (page_number - 1) * page_size
+    items = [item async for item in queryset[offset:offset + page_size]]
+
+    url = canonical_url(request)
+    next_url = replace_query_param(url, "page", page_number + 1) if page_number < last_page else None
+    if page_number == 1:
+        previous_url = None
+    elif page_number == 2:
+        previous_url = remove_query_param(url, "page")
+    else:
+        previous_url = replace_query_param(url, "page", page_number - 1)
+
+    return items, {"count": count, "next": next_url, "previous": previous_url}
+
+
+# -------------------- ASYNC FEED --------------------
+@require_GET
+@async_login_required()
+async def async_user_feed(request):
+    """
+    Async version of UserFeedView. Shares its per-user per-page cache, so the
+    same invalidation applies to both.
+    """
+    user_id, number = request.user.id, page_number(request)
+    if number is None:
+        return JsonResponse({"detail": "Invalid page."}, status=404)
+
+    # Same validators as UserFeedView
+    versions = await aget_versions("posts", f"follows_{user_id}")
+    etag, last_modified = build_validators(versions, user_id)
+    not_modified = not_modified_response(request, etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    cache_key = await apage_cache_key(FEED_PAGE_KEY.format(user=user_id, page="{page}"), number,
+                                      family=FEED_PAGES_FAMILY)
+    cached_response = await aget_cached_response(cache_key, request)
+    if cached_response is not None:
+        logger.info(f"[AsyncFeed] Cache hit for user={user_id}, page={number}")
+        return set_validators(cached_response, etag, last_modified)
+
+    logger.info(f"[AsyncFeed] Cache miss for user={user_id}, page={number}")
+    queryset = UserFeedView.feed_queryset(request.user) \
+        .select_related('author').prefetch_related(*POST_PREFETCH)
+    posts, payload = await apaginate(request, queryset)
+    if posts is None:
+        return JsonResponse({"detail": "Invalid page."}, status=404)
+
+    payload["results"] = PostSerializer(posts, many=True, context={"request": request}).data
+    response = await acache_response(cache_key, request, payload, cache_timeout())
+    return set_validators(response, etag, last_modified)
+
+
+# -------------------- ASYNC POST DETAIL --------------------
+@require_GET
+@async_login_required()
+async def async_post_detail(request, pk):
+    # Same validators as PostRetrieveUpdateDestroy
+    versions = await aget_versions(f"post_{pk}")
+    etag, last_modified = build_validators(versions, request.user.id)
+    not_modified = not_modified_response(request, etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    try:
+        post = await Post.objects.select_related('author').prefetch_related(*POST_PREFETCH).aget(id=pk)
+    except Post.DoesNotExist:
+        response = await async_archived_post_detail(request, pk)
+    else:
+        if not can_view(request.user.id, post.privacy, post.author_id):
+            return JsonResponse([NOT_AUTHORIZED], status=400, safe=False)
+        response = encoded_response(dumps(PostSerializer(post, context={"request": request}).data))
+    return set_validators(response, etag, last_modified)
+
+
+async def async_archived_post_detail(request, pk):
+    post = await ArchivedPost.objects.filter(id=pk).afirst()
+    if post is None:
+        return JsonResponse({"detail": "No Post matches the given query."}, status=404)
+    if not can_view(request.user.id, post.privacy, post.author_id):
+        return JsonResponse([NOT_AUTHORIZED], status=400, safe=False)
+    return encoded_response(dumps(await sync_to_async(archived_post_data)(post)))
+
+
+# -------------------- ASYNC FOLLOWER COUNTS --------------------
+@require_GET
+@async_login_required()
+async def async_user_followers(request, user_id):
+    cache_key = f"user_followers_{user_id}"
+    cached_data = await cache.aget(cache_key)
+    if cached_data:
+        return JsonResponse(cached_data)
+
+    try:
+        user = await User.objects.only('id', 'username').aget(id=user_id)
+    except User.DoesNotExist:
+        return JsonResponse({"detail": "No User matches the given query."}, status=404)
+
+    response_data = {
+        "user": user.username,
+        "followers_count": await Follow.objects.filter(following_id=user.id).acount(),
+        "following_count": await Follow.objects.filter(follower_id=user.id).acount(),
+    }
+    await cache.aset(cache_key, response_data, timeout=cache_timeout())
+    return JsonResponse(response_data)
+
+
+# -------------------- ASYNC GOOGLE TOKEN CONVERSION --------------------
+@csrf_exempt
+@require_POST
+async def async_convert_token(request):
+    """
+    Async version of ConvertTokenView: verifies the Google token over a pooled
+    async HTTP client with a timeout (cached briefly), then returns our JWT pair.
+    """
+    try:
+        body = json.loads(request.body or b"{}")
+    except ValueError:
+        body = {}
+    if not isinstance(body, dict):
+        body = {}
+    access_token = body.get("access_token") or request.POST.get("access_token")
+    if not access_token:
+        return JsonResponse({"error": "Missing access token"}, status=400)
+
+    user_info = await afetch_google_user_info(access_token)
+    if user_info is None:
+        return JsonResponse({"error": "Invalid Google token"}, status=400)
+
+    email = user_info.get("email")
+    if not email:
+        return JsonResponse({"error": "Unable to fetch email from Google"}, status=400)
+
+    user, created = await aget_or_create_social_user(email)
+
+    # for_user() records an OutstandingToken row (token_blacklist), which is a sync ORM write
+    refresh = await sync_to_async(RefreshToken.for_user)(user)
+    return JsonResponse({
+        "refresh": str(refresh),
+        "access": str(refresh.access_token),
+        "email": email,
+    })
+
+
+# -------------------- ASYNC UPLOAD PHOTO --------------------
+@csrf_exempt
+@require_POST
+@async_login_required(allow_session=False)  # JWT only, the view is CSRF exempt
+async def async_upload_photo(request):
+    serializer = UploadPhotoSerializer(data=request.FILES)
+    if not serializer.is_valid():
+        logger.error(f"Photo upload failed: {serializer.errors}")
+        return JsonResponse(serializer.errors, status=400)
+
+    # The Drive client is blocking, run it in a worker thread instead of the event loop
+    drive_url = await sync_to_async(upload_to_google_drive, thread_sensitive=False)(
+        serializer.validated_data['photo'], request.user.username
+    )
+
+    # request.user is a TokenUser; saving needs the full row
+    user = await User.objects.aget(id=request.user.id)
+    user.profile_photo = drive_url
+    await user.asave(update_fields=["profile_photo"])
+
+    cache_key = f"profile_photo_{request.user.id}"
+    await cache.aset(cache_key, drive_url, timeout=600)
+    logger.info(f"Cache updated: Profile photo for user {request.user.id}.")
+
+    return JsonResponse({"message": "Profile photo updated", "drive_url": drive_url}, status=201)
+
+
+# -------------------- REAL-TIME EVENTS (SSE) --------------------
+SSE_HEARTBEAT_SECONDS = 15
+SSE_MAX_WATCHED_POSTS = 50
+
+
+async def stream_channels(user_id, post_ids):
+    following = [
+        following_id async for following_id in
+        Follow.objects.filter(follower_id=user_id).values_list("following_id", flat=True)
+    ]
+    return {
+        f"notify_{user_id}", f"user_{user_id}",
+        *(f"author_{following_id}" for following_id in following),
+        *(f"post_{post_id}" for post_id in post_ids),
+    }
+
+
+def format_sse(event):
+    return f"id: {event.get('id', '')}\nevent: {event['type']}\ndata: {dumps(event).decode()}\n\n"
+
+
+async def sse_events(broker, subscription, user_id, post_ids):
+    try:
+        yield "retry: 5000\n\n"  # Client reconnect delay, in ms
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.get(), timeout=SSE_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                # Keeps proxies from closing an idle connection
+                yield ": keep-alive\n\n"
+                continue
+
+            if subscription.overflowed:
+                subscription.overflowed = False
+                yield format_sse({"type": "resync"})  # Events were dropped, refetch the feed
+
+            if event["type"] in ("user_followed", "user_unfollowed") and event["follower"] == user_id:
+                broker.resubscribe(subscription, await stream_channels(user_id, post_ids))
+            yield format_sse(event)
+    finally:
+        broker.unsubscribe(subscription)
+
+
+@require_GET
+@async_login_required()
+async def event_stream(request):
+    """
+    Server-Sent Events instead of polling /feed/ and post details. Streams:
+      - post_created     a user you follow published a public post
+      - post_liked, comment_created   activity on your posts (and on ?posts=1,2 if given)
+      - user_followed    someone followed you
+      - resync           events were dropped because the client fell behind; refetch
+    Needs an ASGI server: every open stream is a coroutine, not a worker thread.
+    """
+    post_ids = [
+        int(post_id) for post_id in request.GET.get("posts", "").split(",") if post_id.strip().isdigit()
+    ][:SSE_MAX_WATCHED_POSTS]
+
+    broker = get_broker()
+    subscription = broker.subscribe(await stream_channels(request.user.id, post_ids))
+
+    response = StreamingHttpResponse(
+        sse_events(broker, subscription, request.user.id, post_ids), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # Stop nginx from buffering the stream
+    return response
@@ -0,0 +1,157 @@
+import random
+from contextvars import ContextVar
+
+from auditlog import get_logentry_model
+from auditlog.cid import get_cid
+from auditlog.context import auditlog_disabled
+from auditlog.diff import model_instance_diff
+from auditlog.models import _get_manager_from_settings
+from auditlog.receivers import check_disable
+from auditlog.registry import auditlog
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.utils.encoding import smart_str
+
+from singletons.audit_log_buffer import AuditLogBuffer
+
+# ------------------- AUDIT LOG POLICY ----------------------
+# settings.AUDITLOG_MODEL_POLICY maps "app_label.Model" to one of:
+#   "always"  - log every change (default)
+#   "skip"    - never log this model
+#   0.0-1.0   - log only this fraction of changes (sampling)
+
+
+def get_model_policy(model):
+    policy = getattr(settings, "AUDITLOG_MODEL_POLICY", {})
+    return policy.get(model._meta.label, "always")
+
+
+def should_log(model):
+    policy = get_model_policy(model)
+    if policy == "always":
+        return True
+    if policy == "skip":
+        return False
+    return random.random() < float(policy)
+
+
+def is_buffered():
+    return getattr(settings, "AUDITLOG_BUFFERED", False)
+
+
+# ------------------- BUFFERED CAPTURE ----------------------
+def capture_log_entry(action, instance, old, new, fields_to_check=None):
+    """
+    Builds the LogEntry in memory (the diff must be taken now, while old/new still differ)
+    and hands it to the AuditLogBuffer once the surrounding transaction commits.
+    """
+    changes = model_instance_diff(
+        old, new,
+        fields_to_check=fields_to_check,
+        use_json_for_changes=settings.AUDITLOG_STORE_JSON_CHANGES,
+    )
+    if not changes:
+        return
+
+    LogEntry = get_logentry_model()
+    pk = instance.pk
+    entry = LogEntry(
+        content_type=ContentType.objects.get_for_model(instance),
+        object_pk=smart_str(pk),
+        object_id=pk if isinstance(pk, int) else None,
+        object_repr=smart_str(instance),
+        serialized_data=LogEntry.objects._get_serialized_data_or_none(instance),
+        action=action,
+        changes=changes,
+        cid=get_cid(),
+    )
+
+    # bulk_create skips pre_save, so let auditlog's set_actor() context fill in
+    # actor/remote_addr now, while we are still inside the request
+    pre_save.send(sender=LogEntry, instance=entry, raw=False, using=None, update_fields=None)
+
+    transaction.on_commit(lambda: AuditLogBuffer().add(entry))
+
+
+# ------------------- SIGNAL RECEIVERS ----------------------
+# register() connects a policy receiver to each of auditlog's signals before auditlog's own
+# receiver (stock auditlog.register()) and a release receiver after it. Changes the policy
+# logs synchronously are left to auditlog. Otherwise the policy receiver does the work (one
+# SELECT of the stored row for an update, diffed on the saved update_fields) and holds
+# auditlog off, through its public auditlog_disabled flag, until the release receiver runs
+# in the same dispatch, so auditlog neither reads the row again nor writes the entry.
+_held = ContextVar("audit_policy_held", default=None)
+
+
+def hold_auditlog():
+    _held.set(auditlog_disabled.set(True))
+
+
+def release_auditlog(sender, **kwargs):
+    token = _held.get()
+    if token is not None:
+        _held.set(None)
+        auditlog_disabled.reset(token)
+
+
+def policy_decision(sender):
+    """
+    "auditlog" when the change is left to auditlog, otherwise "skip" (sampled out) or "buffer".
+    """
+    if not should_log(sender):
+        return "skip"
+    return "buffer" if is_buffered() else "auditlog"
+
+
+# Each receiver holds auditlog off only once its own work succeeded, so an error leaves
+# auditlog to log the change and nothing is held past this dispatch.
+@check_disable
+def policy_log_create(sender, instance, created, **kwargs):
+    if not created:
+        return
+    decision = policy_decision(sender)
+    if decision == "buffer":
+        capture_log_entry(get_logentry_model().Action.CREATE, instance, None, instance)
+    if decision != "auditlog":
+        hold_auditlog()
+
+
+@check_disable
+def policy_log_update(sender, instance, update_fields=None, **kwargs):
+    if instance._state.adding or instance.pk is None:
+        return
+    decision = policy_decision(sender)
+    if decision == "buffer":
+        # Sent from pre_save, so the stored row still holds the old values
+        old = _get_manager_from_settings(sender).filter(pk=instance.pk).first()
+        capture_log_entry(get_logentry_model().Action.UPDATE, instance, old, instance, fields_to_check=update_fields)
+    if decision != "auditlog":
+        hold_auditlog()
+
+
+@check_disable
+def policy_log_delete(sender, instance, **kwargs):
+    if instance.pk is None:
+        return
+    decision = policy_decision(sender)
+    if decision == "buffer":
+        capture_log_entry(get_logentry_model().Action.DELETE, instance, instance, None)
+    if decision != "auditlog":
+        hold_auditlog()
+
+
+POLICY_RECEIVERS = {post_save: policy_log_create, pre_save: policy_log_update, post_delete: policy_log_delete}
+
+
+def register(model, **options):
+    """
+    auditlog.register(model, **options) with the policy receivers around auditlog's own.
+    """
+    label = model._meta.label
+    for signal, policy_receiver in POLICY_RECEIVERS.items():
+        signal.connect(policy_receiver, sender=model, dispatch_uid=f"audit_policy_{label}")
+    auditlog.register(model, **options)
+    for signal in POLICY_RECEIVERS:
+        signal.connect(release_auditlog, sender=model, dispatch_uid=f"audit_release_{label}")
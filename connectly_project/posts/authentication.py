@@ -0,0 +1,108 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject
+from rest_framework.authentication import SessionAuthentication
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+# ------------------- USER STATE CACHE ----------------------
+# The few fields authentication and permissions need, cached for a short TTL.
+# Saving or deleting a user drops the entry (posts/signals.py), so deactivating
+# someone or changing is_staff takes effect on their next request.
+USER_STATE_CACHE_KEY = "user_state_{}"
+USER_STATE_FIELDS = ("id", "username", "is_active", "is_staff", "is_superuser")
+
+
+def get_user_state(user_id):
+    cache_key = USER_STATE_CACHE_KEY.format(user_id)
+    state = cache.get(cache_key)
+    if state is None:
+        state = User.objects.filter(pk=user_id).values(*USER_STATE_FIELDS).first()
+        if state is None:
+            return None
+        cache.set(cache_key, state, getattr(settings, "USER_STATE_CACHE_SECONDS", 30))
+    return state
+
+
+async def aget_user_state(user_id):
+    cache_key = USER_STATE_CACHE_KEY.format(user_id)
+    state = await cache.aget(cache_key)
+    if state is None:
+        state = await User.objects.filter(pk=user_id).values(*USER_STATE_FIELDS).afirst()
+        if state is None:
+            return None
+        await cache.aset(cache_key, state, getattr(settings, "USER_STATE_CACHE_SECONDS", 30))
+    return state
+
+
+def invalidate_user_state(user_id):
+    cache.delete(USER_STATE_CACHE_KEY.format(user_id))
+
+
+# ------------------- LAZY TOKEN USER ----------------------
+class TokenUser(SimpleLazyObject):
+    """
+    Stand-in for request.user built from the token and the cached user state.
+    id, username, is_active, is_staff and is_superuser are answered without touching
+    the database; anything else (email, save(), ...) loads the full User on first use.
+
+    Compare users by id (post.author_id == request.user.id) on hot paths:
+    Django's own isinstance() checks on model instances will load the full user.
+    """
+
+    def __init__(self, state):
+        user_id = state["id"]
+        super().__init__(lambda: User.objects.get(pk=user_id))
+        # Write straight into __dict__, LazyObject.__setattr__ would load the user
+        self.__dict__.update(state)
+        self.__dict__["pk"] = user_id
+
+    @property
+    def is_authenticated(self):
+        return True
+
+    @property
+    def is_anonymous(self):
+        return False
+
+    def __bool__(self):
+        return True
+
+    def __eq__(self, other):
+        if isinstance(other, (TokenUser, User)):
+            return self.pk == other.pk
+        return super().__eq__(other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.pk)
+
+
+# ------------------- AUTHENTICATION CLASSES ----------------------
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication without the per-request User query: the user is built from the
+    token's user id plus the cached user state, and only loaded in full if a view needs it.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        state = get_user_state(user_id)
+        if state is None:
+            raise AuthenticationFailed("User not found", code="user_not_found")
+        if not state["is_active"]:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+
+        return TokenUser(state)
+
+
+# For read-heavy endpoints: try the token first, so API clients never touch the session store
+FAST_AUTHENTICATION_CLASSES = [StatelessJWTAuthentication, SessionAuthentication]
@@ -0,0 +1,58 @@
+from django.core.cache import cache
+from rest_framework import serializers
+
+from .db_router import primary_reads
+
+# ------------------- MULTI-GET ----------------------
+# Batch endpoints (GET /posts/batch/?ids=3,1,2) answer many ids in one request: every id
+# is looked up with one cache get_many, the misses are loaded with one IN query and cached
+# for the next request, and the results come back in the requested order.
+MAX_BATCH_IDS = 100
+
+
+def parse_ids(request):
+    """
+    The ?ids= list in request order without duplicates. Raises ValidationError when it
+    is missing, malformed or longer than MAX_BATCH_IDS.
+    """
+    raw = request.query_params.get("ids", "")
+    try:
+        ids = [int(value) for value in raw.split(",") if value.strip()]
+    except ValueError:
+        raise serializers.ValidationError({"ids": "Expected a comma separated list of ids."})
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        raise serializers.ValidationError({"ids": "This query parameter is required."})
+    if len(ids) > MAX_BATCH_IDS:
+        raise serializers.ValidationError({"ids": f"At most {MAX_BATCH_IDS} ids per request."})
+    return ids
+
+
+def get_many_cached(ids, key_format, load_missing, timeout):
+    """
+    Returns {id: entry} for the ids that exist. Entries come from the cache keys
+    key_format.format(id) when present; load_missing(missing_ids) returns {id: entry}
+    for the rest, which are then cached.
+    """
+    keys = {key_format.format(object_id): object_id for object_id in ids}
+    entries = {keys[key]: entry for key, entry in cache.get_many(list(keys)).items()}
+
+    missing = [object_id for object_id in ids if object_id not in entries]
+    if missing:
+        with primary_reads():  # Cached for every reader (posts/db_router.py)
+            loaded = load_missing(missing)
+        if loaded:
+            cache.set_many({key_format.format(object_id): entry for object_id, entry in loaded.items()}, timeout)
+        entries.update(loaded)
+    return entries
+
+
+def ordered_results(ids, entries):
+    """
+    Builds the batch response body: results in request order, and the ids that were
+    not found (or may not be seen) under "missing".
+    """
+    return {
+        "results": [entries[object_id] for object_id in ids if object_id in entries],
+        "missing": [object_id for object_id in ids if object_id not in entries],
+    }
@@ -0,0 +1,156 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Alias that reads should go to for the current request (None = default database)
+_read_alias = ContextVar("posts_read_alias", default=None)
+
+PRIMARY_PIN_CACHE_KEY = "db_primary_pin_user_{}"
+
+
+def get_replica_aliases():
+    return list(getattr(settings, "DATABASE_REPLICAS", []))
+
+
+def choose_replica():
+    """
+    Picks one of the configured replicas at random, or None if there are none.
+    """
+    replicas = get_replica_aliases()
+    if not replicas:
+        return None
+    return random.choice(replicas)
+
+
+def pin_user_to_primary(user_id):
+    """
+    Sends every read of this user to the primary for a short window after a write,
+    so they always see their own new post, like or follow (read-your-writes).
+    """
+    timeout = getattr(settings, "REPLICA_PIN_SECONDS", 5)
+    cache.set(PRIMARY_PIN_CACHE_KEY.format(user_id), True, timeout)
+
+
+async def apin_user_to_primary(user_id):
+    timeout = getattr(settings, "REPLICA_PIN_SECONDS", 5)
+    await cache.aset(PRIMARY_PIN_CACHE_KEY.format(user_id), True, timeout)
+
+
+def is_pinned_to_primary(user_id):
+    if user_id is None:
+        return False
+    return bool(cache.get(PRIMARY_PIN_CACHE_KEY.format(user_id)))
+
+
+def route_reads_to(alias):
+    return _read_alias.set(alias)
+
+
+def reset_read_route(token):
+    _read_alias.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """
+    Writes always go to the primary ('default').
+    Reads go to a replica only while a view has opted in through ReplicaReadMixin,
+    everything else keeps reading from the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary, so relations across them are fine
+        databases = {"default", *get_replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return None
+
+
+class ReplicaReadMixin:
+    """
+    Routes the safe (GET/HEAD/OPTIONS) requests of a read-heavy view to a replica,
+    unless the requesting user wrote something in the last REPLICA_PIN_SECONDS.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self._read_route_token = None
+
+        if request.method not in ("GET", "HEAD", "OPTIONS"):
+            return
+        if is_pinned_to_primary(request.user.id):
+            return
+
+        alias = choose_replica()
+        if alias:
+            self._read_route_token = route_reads_to(alias)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, "_read_route_token", None)
+        if token is not None:
+            reset_read_route(token)
+            self._read_route_token = None
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+@contextmanager
+def primary_reads():
+    """
+    Sends the reads inside to the primary, whatever the request's route. For results cached
+    past the request (pages, profile counts, user_<id>/post_<id> entries): a read from a
+    replica lagging behind another user's write would otherwise be cached, and served to
+    everyone, for the whole CACHE_TIMEOUT, long after the replica caught up.
+    """
+    token = _read_alias.set(None)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+# ------------------- ARCHIVE ----------------------
+ARCHIVE_MODELS = {"archivedpost", "archivedcomment", "archivedlike"}
+
+
+def get_archive_alias():
+    return getattr(settings, "ARCHIVE_DATABASE", "default")
+
+
+class ArchiveRouter:
+    """
+    Sends the archive tables (posts/archive.py) to settings.ARCHIVE_DATABASE, and keeps
+    every other model out of that database when it is not the primary.
+    """
+
+    def is_archive(self, app_label, model_name):
+        return app_label == "posts" and model_name in ARCHIVE_MODELS
+
+    def db_for_read(self, model, **hints):
+        if self.is_archive(model._meta.app_label, model._meta.model_name):
+            return get_archive_alias()
+        return None
+
+    def db_for_write(self, model, **hints):
+        return self.db_for_read(model, **hints)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        alias = get_archive_alias()
+        if alias == "default":
+            return None
+        if model_name is not None and self.is_archive(app_label, model_name):
+            return db == alias
+        return False if db == alias else None
@@ -0,0 +1,151 @@
+import os
+import sqlite3
+import tempfile
+from contextlib import closing
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connections
+from django.db.backends.sqlite3.creation import DatabaseCreation
+from django.db.migrations.loader import MigrationLoader
+from django.test.runner import DiscoverRunner
+
+from singletons.logger_singleton import LoggerSingleton
+
+logger = LoggerSingleton().get_logger()
+
+# ------------------- DATABASE SNAPSHOT ----------------------
+# Migrating an empty database takes seconds; copying one that is already migrated takes
+# milliseconds. The snapshot is an SQLite file with every migration applied (and what
+# post_migrate creates: content types, permissions). `manage.py reset_db` restores the
+# development database from it, and SnapshotTestRunner creates the test database from it.
+#
+# The snapshot is rebuilt whenever a migration on disk is missing from it. Model changes
+# without a migration are not detected, the same as with `migrate`.
+SNAPSHOT_ALIAS = "snapshot"
+
+
+def snapshot_path():
+    return Path(getattr(settings, "DB_SNAPSHOT_PATH", settings.BASE_DIR / "db_snapshot.sqlite3"))
+
+
+def is_sqlite(alias="default"):
+    return connections[alias].vendor == "sqlite"
+
+
+def applied_migrations(path):
+    """
+    {(app, name)} recorded in the snapshot at path, empty when it is missing or unreadable.
+    """
+    if not Path(path).exists():
+        return set()
+    try:
+        with closing(sqlite3.connect(path)) as db:
+            return set(db.execute("SELECT app, name FROM django_migrations"))
+    except sqlite3.DatabaseError:
+        return set()
+
+
+def snapshot_is_current(path):
+    loader = MigrationLoader(None, ignore_no_migrations=True)
+    return set(loader.graph.nodes) <= applied_migrations(path)
+
+
+def build_snapshot(path, alias="default", verbosity=0):
+    """
+    Migrates a new SQLite file laid out like `alias` and moves it to path.
+    The database of `alias` itself is not touched.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(suffix=".sqlite3", dir=path.parent)
+    os.close(fd)
+
+    connections.settings[SNAPSHOT_ALIAS] = {**connections[alias].settings_dict, "NAME": tmp}
+    try:
+        call_command("migrate", database=SNAPSHOT_ALIAS, interactive=False, verbosity=verbosity)
+        connections[SNAPSHOT_ALIAS].close()
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)  # Atomic, so concurrent runs never see half a snapshot
+    finally:
+        connections[SNAPSHOT_ALIAS].close()
+        del connections[SNAPSHOT_ALIAS]
+        del connections.settings[SNAPSHOT_ALIAS]
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    logger.info(f"Database snapshot built: {path}")
+    return path
+
+
+def ensure_snapshot(path=None, alias="default", verbosity=0):
+    """
+    The snapshot's path, after rebuilding it if migrations were added since it was built.
+    """
+    path = Path(path or snapshot_path())
+    if not snapshot_is_current(path):
+        build_snapshot(path, alias=alias, verbosity=verbosity)
+    return path
+
+
+def restore_snapshot(path, target):
+    """
+    Copies the snapshot into target (a database path, or an open sqlite3 connection)
+    with SQLite's backup API, replacing whatever target held.
+    """
+    source = sqlite3.connect(path)
+    try:
+        if isinstance(target, sqlite3.Connection):
+            source.backup(target)
+        else:
+            destination = sqlite3.connect(target)
+            try:
+                source.backup(destination)
+            finally:
+                destination.close()
+    finally:
+        source.close()
+
+
+# ------------------- TEST DATABASE ----------------------
+class SnapshotDatabaseCreation(DatabaseCreation):
+    """
+    SQLite test database creation that restores the snapshot instead of migrating.
+    Parallel workers get their copies from it through Django's usual cloning.
+    """
+
+    def __init__(self, connection, snapshot):
+        super().__init__(connection)
+        self.snapshot = snapshot
+
+    def create_test_db(self, verbosity=1, autoclobber=False, serialize=True, keepdb=False):
+        test_database_name = self._get_test_db_name()
+        if verbosity >= 1:
+            self.log(f"Restoring test database for alias "
+                     f"{self._get_database_display_str(verbosity, test_database_name)} from {self.snapshot}...")
+        self._create_test_db(verbosity, autoclobber, keepdb)
+
+        self.connection.close()
+        settings.DATABASES[self.connection.alias]["NAME"] = test_database_name
+        self.connection.settings_dict["NAME"] = test_database_name
+        self.connection.ensure_connection()
+        restore_snapshot(self.snapshot, self.connection.connection)
+
+        if serialize:
+            self.connection._test_serialized_contents = self.serialize_db_to_string()
+        call_command("createcachetable", database=self.connection.alias)
+        return test_database_name
+
+
+class SnapshotTestRunner(DiscoverRunner):
+    """
+    The default test runner, with the SQLite test database restored from the snapshot
+    (settings.TEST_RUNNER). --keepdb and other databases keep Django's usual setup.
+    """
+
+    def setup_databases(self, **kwargs):
+        if not self.keepdb and is_sqlite():
+            snapshot = ensure_snapshot(verbosity=max(self.verbosity - 1, 0))
+            connection = connections["default"]
+            connection.creation = SnapshotDatabaseCreation(connection, snapshot)
+        return super().setup_databases(**kwargs)
@@ -0,0 +1,146 @@
+from django.core.cache import cache
+
+from singletons.logger_singleton import LoggerSingleton
+from .events import EVENT_NAMES, subscribe
+from .response_cache import invalidate_pages, invalidate_pages_many, page_cache_key
+
+logger = LoggerSingleton().get_logger()
+
+# ------------------- CACHE KEYS ----------------------
+PUBLIC_POST_PAGE_KEY = "posts_list_public_page_{page}"  # Shared by every user (posts/visibility.py)
+PRIVATE_POST_PAGE_KEY = "posts_list_private_user_{user}_page_{page}"
+POST_LIST_PAGE_KEY = "posts_list_user_{user}_page_{page}"  # Searched, filtered or reordered lists
+FEED_PAGE_KEY = "user_feed_page_{user}_{page}"
+USER_LIST_PAGE_KEY = "users_list_page_{page}"
+ALL_USERS_FOLLOWERS_PAGE_KEY = "all_users_followers_page_{page}"
+COMMENT_LIST_PAGE_KEY = "comments_list_page_{page}"
+PROFILE_COUNTS_KEY = "user_profile_counts_{user}"
+
+# Families of the per-user pages: one generation each invalidates every user's pages
+# (see posts/response_cache.py)
+POST_PAGES_FAMILY = "posts_list_{page}"  # posts_list_generation
+FEED_PAGES_FAMILY = "feed_{page}"  # feed_generation
+PAGE_FAMILIES = {
+    PRIVATE_POST_PAGE_KEY: POST_PAGES_FAMILY,
+    POST_LIST_PAGE_KEY: POST_PAGES_FAMILY,
+    FEED_PAGE_KEY: FEED_PAGES_FAMILY,
+}
+
+POST_EVENTS = ("post_created", "post_updated", "post_deleted")
+COMMENT_EVENTS = ("comment_created", "comment_updated", "comment_deleted")
+LIKE_EVENTS = ("post_liked", "post_unliked", "comment_liked", "comment_unliked")
+FOLLOW_EVENTS = ("user_followed", "user_unfollowed")
+
+
+def clear_numbered_pages(key_format):
+    """
+    Invalidates every cached page of key_format.
+    """
+    if invalidate_pages(key_format):
+        logger.info(f"Cache invalidated: {key_format}")
+
+
+def user_page_key(key_format, user_id, page):
+    """
+    The cache key of page of user_id's pages of key_format, in the current generations.
+    """
+    return page_cache_key(key_format.format(user=user_id, page="{page}"), page, family=PAGE_FAMILIES[key_format])
+
+
+def clear_user_pages(key_format, user_ids):
+    formats = [key_format.format(user=user_id, page="{page}") for user_id in user_ids]
+    for invalidated in invalidate_pages_many(formats):
+        logger.info(f"Cache invalidated: {invalidated}")
+
+
+def clear_pages(key_format, user_ids=None):
+    """
+    Invalidates the cached pages of the given users, or of every user (one increment of
+    the family's generation).
+    """
+    if user_ids is None:
+        clear_numbered_pages(PAGE_FAMILIES[key_format])
+    else:
+        clear_user_pages(key_format, user_ids)
+
+
+def clear_post_list_pages(user_ids=None):
+    """
+    Drops the shared public post list and the given users' (or every user's) private posts
+    and list pages.
+    """
+    clear_numbered_pages(PUBLIC_POST_PAGE_KEY)
+    if user_ids is None:
+        clear_numbered_pages(POST_PAGES_FAMILY)
+    else:
+        clear_user_pages(PRIVATE_POST_PAGE_KEY, user_ids)
+        clear_user_pages(POST_LIST_PAGE_KEY, user_ids)
+
+
+def clear_feed_pages(user_ids=None):
+    clear_pages(FEED_PAGE_KEY, user_ids)
+
+
+# ------------------- ON COMMIT ----------------------
+# Cheap, targeted deletes that the next request of the same user depends on
+@subscribe(*POST_EVENTS, *COMMENT_EVENTS, *LIKE_EVENTS, background=False)
+def drop_post_caches(name, post, user, **payload):
+    cache.delete(f"post_{post}")
+    # The acting user sees their own write on their next page load
+    clear_post_list_pages([user])
+    clear_feed_pages([user])
+
+
+@subscribe(*COMMENT_EVENTS, "comment_liked", "comment_unliked", "post_deleted", "user_deleted", background=False)
+def drop_comment_caches(name, comment=None, **payload):
+    # Deleted posts and users take their comments with them
+    if comment is not None:
+        cache.delete(f"comment_{comment}")
+    clear_numbered_pages(COMMENT_LIST_PAGE_KEY)
+
+
+@subscribe("post_created", "post_deleted", "comment_created", "comment_deleted", background=False)
+def drop_profile_counts(name, user, author=None, **payload):
+    # Deletes carry the author, who may not be the acting user (e.g. an admin)
+    cache.delete(PROFILE_COUNTS_KEY.format(user=author or user))
+
+
+@subscribe(*FOLLOW_EVENTS, background=False)
+def drop_follow_caches(name, follower, following, **payload):
+    cache.delete(f"user_followers_{following}")
+    cache.delete(f"user_profile_{following}")
+    cache.delete_many([PROFILE_COUNTS_KEY.format(user=follower), PROFILE_COUNTS_KEY.format(user=following)])
+    clear_numbered_pages(ALL_USERS_FOLLOWERS_PAGE_KEY)
+    clear_feed_pages([follower])
+    logger.info(f"Cache invalidated: followers of user {following} after {name}.")
+
+
+@subscribe(*EVENT_NAMES, background=False)
+def log_event(name, **payload):
+    logger.info(f"Event {name}: {payload}")
+
+
+@subscribe("user_deleted", background=False)
+def drop_user_caches(name, deleted_user, **payload):
+    cache.delete_many([f"user_{deleted_user}", f"user_profile_{deleted_user}",
+                       PROFILE_COUNTS_KEY.format(user=deleted_user)])
+    clear_numbered_pages(USER_LIST_PAGE_KEY)
+    clear_numbered_pages(ALL_USERS_FOLLOWERS_PAGE_KEY)
+
+
+# ------------------- BACKGROUND ----------------------
+# Every user's cached pages, through their families' generations (cache work only, so
+# outbox=False, see posts/events.py)
+@subscribe(*POST_EVENTS, *COMMENT_EVENTS, *LIKE_EVENTS, "user_deleted", outbox=False)
+def drop_all_post_pages(name, **payload):
+    clear_post_list_pages()
+    clear_feed_pages()
+    logger.info(f"Cache invalidated: post list and feed pages of all users after {name}.")
+
+
+@subscribe("post_deleted", "user_deleted")
+def run_purge_job(name, job=None, **payload):
+    # Soft-deleted rows are removed in chunks (posts/purge.py); a failed job is retried with its event
+    if job is not None:
+        from .purge import run_purge
+        run_purge(job)
@@ -0,0 +1,61 @@
+from django.db import transaction
+
+from singletons.event_dispatcher import EventDispatcher
+from .models import OutboxEvent
+
+# ------------------- DOMAIN EVENTS ----------------------
+# Write views do only the core write and emit() an event describing it. Everything that
+# follows from the write (cache invalidation, logging, ...) is a handler subscribed to the
+# event (posts/event_handlers.py), run once the transaction commits:
+#   background=False   runs right after the commit, in the request; keep these cheap
+#   background=True    runs on the dispatcher's worker thread, off the request path
+#
+# Events with outbox handlers are also written to the outbox table in the same transaction
+# as the write, so they are not lost if the process dies before the worker gets to them:
+# `manage.py process_outbox` retries whatever is left unprocessed. Handlers may run more
+# than once for the same event and must be idempotent.
+#
+# process_outbox runs in its own process, with its own cache when the cache is per process
+# (the default LocMemCache), so a retried handler can only fix what every process sees:
+# the database, files. Background handlers that only drop cache entries are subscribed with
+# outbox=False: they run from memory, an event that has no other ones writes no outbox row,
+# and if the process dies first the entries they would have dropped expire on their own.
+EVENT_NAMES = (
+    "post_created", "post_updated", "post_deleted",
+    "post_liked", "post_unliked",
+    "comment_created", "comment_updated", "comment_deleted",
+    "comment_liked", "comment_unliked",
+    "user_followed", "user_unfollowed",
+    "user_deleted",
+)
+
+
+def subscribe(*names, background=True, outbox=True):
+    """
+    Registers the decorated function as a handler of the named events.
+    Handlers are called as handler(name, **payload).
+    """
+    unknown = set(names) - set(EVENT_NAMES)
+    if unknown:
+        raise ValueError(f"Unknown events: {', '.join(sorted(unknown))}")
+
+    def decorator(handler):
+        for name in names:
+            EventDispatcher().register(name, handler, background=background, outbox=outbox)
+        return handler
+    return decorator
+
+
+def emit(name, **payload):
+    """
+    Publishes an event once the current transaction commits (immediately outside one).
+    The payload must be JSON serializable, e.g. ids rather than model instances.
+    """
+    if name not in EVENT_NAMES:
+        raise ValueError(f"Unknown event: {name}")
+
+    dispatcher = EventDispatcher()
+    event_id = None
+    if dispatcher.has_outbox_handlers(name):
+        event_id = OutboxEvent.objects.create(name=name, payload=payload).id
+    transaction.on_commit(lambda: dispatcher.dispatch(name, payload, event_id))
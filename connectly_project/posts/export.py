@@ -0,0 +1,129 @@
+import csv
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+
+from .models import Comment, Follow, Like, Post
+from .renderers import dumps
+
+# ------------------- DATA EXPORT ----------------------
+# Streams a user's (or everyone's) posts, comments, likes and follows as NDJSON or CSV.
+# Rows are read in primary key order with .iterator(), so memory stays flat however much
+# there is, and every row carries a cursor ("comments:1234"): passing the last cursor a
+# client received resumes the export right after that row.
+#
+# Under ASGI, Django buffers a sync iterator given to StreamingHttpResponse into one list
+# before sending anything, so the view streams aexport_stream() there instead.
+EXPORT_KINDS = {
+    # kind: (model, owner field, exported columns)
+    "posts": (Post, "author_id",
+              ("id", "author_id", "title", "content", "post_type", "metadata", "image", "video", "privacy",
+               "created_at")),
+    "comments": (Comment, "author_id",
+                 ("id", "author_id", "post_id", "content", "comment_type", "metadata", "image", "video",
+                  "created_at")),
+    "likes": (Like, "user_id", ("id", "user_id", "post_id", "comment_id", "created_at")),
+    "follows": (Follow, "follower_id", ("id", "follower_id", "following_id", "created_at")),
+}
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+CHUNK_SIZE = 2000  # Rows fetched per round trip
+LINES_PER_SEND = 500  # Lines pulled from the database thread per ASGI send
+
+
+def csv_columns():
+    """
+    One CSV for every kind: "type", "cursor" and the union of the kinds' columns.
+    """
+    columns = ["type", "cursor"]
+    for _, _, fields in EXPORT_KINDS.values():
+        columns.extend(field for field in fields if field not in columns)
+    return columns
+
+
+def parse_kinds(value):
+    kinds = [kind.strip() for kind in value.split(",") if kind.strip()] if value else list(EXPORT_KINDS)
+    unknown = set(kinds) - set(EXPORT_KINDS)
+    if unknown:
+        raise ValueError(f"Unknown export kinds: {', '.join(sorted(unknown))}")
+    # Always in EXPORT_KINDS order so a cursor means the same thing on every request
+    return [kind for kind in EXPORT_KINDS if kind in kinds]
+
+
+def parse_cursor(value):
+    """
+    "comments:1234" -> ("comments", 1234), or None when not resuming.
+    """
+    if not value:
+        return None
+    kind, _, last_id = value.partition(":")
+    if kind not in EXPORT_KINDS or not last_id.isdigit():
+        raise ValueError(f"Invalid export cursor: {value}")
+    return kind, int(last_id)
+
+
+def export_rows(kinds, user_id=None, cursor=None, chunk_size=CHUNK_SIZE):
+    """
+    Yields (kind, row) for every exported row, kind by kind in id order, starting after cursor.
+    """
+    order = list(EXPORT_KINDS)
+    resume_kind, last_id = cursor or (None, 0)
+    for kind in kinds:
+        if resume_kind is not None and order.index(kind) < order.index(resume_kind):
+            continue  # Finished before the cursor
+        model, owner_field, fields = EXPORT_KINDS[kind]
+        queryset = model.objects.all()
+        if user_id is not None:
+            queryset = queryset.filter(**{owner_field: user_id})
+        if kind == resume_kind:
+            queryset = queryset.filter(id__gt=last_id)
+        for row in queryset.order_by("id").values(*fields).iterator(chunk_size=chunk_size):
+            yield kind, row
+
+
+def ndjson_lines(rows):
+    for kind, row in rows:
+        yield dumps({"type": kind, "cursor": f"{kind}:{row['id']}", **row}) + b"\n"
+
+
+class _Echo:
+    # csv.writer target that hands back each line instead of buffering it
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    columns = csv_columns()
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for kind, row in rows:
+        values = {"type": kind, "cursor": f"{kind}:{row['id']}", **row}
+        if "metadata" in values:
+            values["metadata"] = dumps(values["metadata"]).decode()
+        yield writer.writerow([values.get(column, "") for column in columns])
+
+
+def export_stream(output, kinds, user_id=None, cursor=None, chunk_size=CHUNK_SIZE):
+    """
+    The export as an iterator of encoded lines, for a StreamingHttpResponse or a file.
+    """
+    rows = export_rows(kinds, user_id=user_id, cursor=cursor, chunk_size=chunk_size)
+    return ndjson_lines(rows) if output == "ndjson" else csv_lines(rows)
+
+
+async def aexport_stream(output, kinds, user_id=None, cursor=None, chunk_size=CHUNK_SIZE,
+                         lines_per_send=LINES_PER_SEND):
+    """
+    export_stream() as an async iterator of byte chunks, for a StreamingHttpResponse under
+    ASGI. Lines are read lines_per_send at a time on the thread that owns the database
+    connection, so memory holds one batch and the event loop never waits on a query.
+    """
+    lines = export_stream(output, kinds, user_id=user_id, cursor=cursor, chunk_size=chunk_size)
+
+    def next_batch():
+        return [line if isinstance(line, bytes) else line.encode() for line in islice(lines, lines_per_send)]
+
+    while True:
+        batch = await sync_to_async(next_batch)()
+        if not batch:
+            return
+        yield b"".join(batch)
@@ -0,0 +1,185 @@
+import asyncio
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.cache import cache
+
+# ------------------ GOOGLE USER INFO -------------------------
+# Access tokens are verified by asking Google's userinfo endpoint. Both the sync and the
+# async paths reuse pooled connections, time out instead of hanging a worker, and cache
+# verified tokens for a short while so repeated conversions skip the round trip.
+GOOGLE_USERINFO_URL = "https://www.googleapis.com/oauth2/v2/userinfo"
+GOOGLE_TOKEN_CACHE_KEY = "google_token_{}"
+
+
+def get_userinfo_url():
+    return getattr(settings, "GOOGLE_USERINFO_URL", GOOGLE_USERINFO_URL)
+
+
+def get_timeout():
+    return getattr(settings, "GOOGLE_HTTP_TIMEOUT", 5)
+
+
+def token_cache_key(access_token):
+    # Never use the raw token as a cache key
+    return GOOGLE_TOKEN_CACHE_KEY.format(hashlib.sha256(access_token.encode()).hexdigest())
+
+
+def get_token_cache_timeout():
+    return getattr(settings, "GOOGLE_TOKEN_CACHE_SECONDS", 60)
+
+
+def parse_user_info(response):
+    """
+    The user info of a 200 answer, or None unless it is a JSON object with the email the
+    login reads and the account id ("sub", or "id" from the v2 endpoint). Checked before
+    caching, so a proxy or captive portal page is never cached as a verified token.
+    """
+    try:
+        user_info = response.json()
+    except ValueError:
+        return None
+    if not isinstance(user_info, dict) or not isinstance(user_info.get("email"), str) or not user_info["email"]:
+        return None
+    if not (user_info.get("sub") or user_info.get("id")):
+        return None
+    return user_info
+
+
+# ------------------ SYNC (requests) -------------------------
+_session = None
+
+
+def get_http_session():
+    """
+    Shared requests.Session with a connection pool and retries on transient upstream errors.
+    """
+    global _session
+    if _session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        retries = Retry(
+            total=2, backoff_factor=0.2,
+            status_forcelist=(502, 503, 504), allowed_methods=("GET",),
+        )
+        session = requests.Session()
+        session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=20, max_retries=retries))
+        session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=20, max_retries=retries))
+        _session = session
+    return _session
+
+
+def fetch_google_user_info(access_token):
+    """
+    Verifies a Google access token by asking the userinfo endpoint.
+    Returns the user info dict, or None if Google rejected the token, did not answer in time
+    or answered with something other than a user (see parse_user_info).
+    """
+    import requests
+
+    cache_key = token_cache_key(access_token)
+    user_info = cache.get(cache_key)
+    if user_info is not None:
+        return user_info
+
+    try:
+        response = get_http_session().get(
+            get_userinfo_url(),
+            headers={"Authorization": f"Bearer {access_token}"},
+            timeout=get_timeout(),
+        )
+    except requests.RequestException:
+        return None
+
+    if response.status_code != 200:
+        return None
+
+    user_info = parse_user_info(response)
+    if user_info is None:
+        return None
+    cache.set(cache_key, user_info, get_token_cache_timeout())
+    return user_info
+
+
+# ------------------ ASYNC (httpx) -------------------------
+# One pooled async client per event loop (a client cannot be shared across loops). Each
+# client is closed when its loop shuts down: an async generator started with it is
+# finalized by loop.shutdown_asyncgens(), which asyncio.run() and ASGI servers call on exit.
+_async_clients = {}  # loop: (client, its lifetime generator, which the loop only holds weakly)
+
+
+async def client_lifetime(loop, client):
+    try:
+        yield
+    finally:
+        _async_clients.pop(loop, None)
+        await client.aclose()
+
+
+async def get_async_client():
+    import httpx
+
+    loop = asyncio.get_running_loop()
+    if loop not in _async_clients:
+        # A loop closed without shutting down its async generators cannot close its client;
+        # forget it, so neither the loop nor the connection pool stays referenced here
+        for stale in [other for other in _async_clients if other.is_closed()]:
+            del _async_clients[stale]
+
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(get_timeout()),
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            transport=httpx.AsyncHTTPTransport(retries=2),
+        )
+        lifetime = client_lifetime(loop, client)
+        _async_clients[loop] = (client, lifetime)
+        await anext(lifetime)  # Started, so the loop finalizes it on shutdown
+    return _async_clients[loop][0]
+
+
+async def afetch_google_user_info(access_token):
+    """
+    Async counterpart of fetch_google_user_info, sharing the same token cache.
+    """
+    import httpx
+
+    cache_key = token_cache_key(access_token)
+    user_info = await cache.aget(cache_key)
+    if user_info is not None:
+        return user_info
+
+    client = await get_async_client()
+    try:
+        response = await client.get(
+            get_userinfo_url(), headers={"Authorization": f"Bearer {access_token}"}
+        )
+    except httpx.HTTPError:
+        return None
+
+    if response.status_code != 200:
+        return None
+
+    user_info = parse_user_info(response)
+    if user_info is None:
+        return None
+    await cache.aset(cache_key, user_info, get_token_cache_timeout())
+    return user_info
+
+
+# ------------------ SOCIAL USERS -------------------------
+def social_user_defaults(email):
+    # Social-only accounts sign in through Google, so they get an unusable password
+    # (no expensive hashing on sign-up)
+    return {"username": email.split("@")[0], "password": make_password(None)}
+
+
+def get_or_create_social_user(email):
+    return User.objects.get_or_create(email=email, defaults=social_user_defaults(email))
+
+
+async def aget_or_create_social_user(email):
+    return await User.objects.aget_or_create(email=email, defaults=social_user_defaults(email))
@@ -0,0 +1,63 @@
+import json
+import tempfile
+from datetime import datetime
+
+from django.conf import settings
+
+# ------------------ GOOGLE DRIVE API -------------------------
+# The Google API client takes tens of milliseconds to import, so it is imported on the
+# first upload rather than by every worker and management command at startup.
+DRIVE_SCOPES = ['https://www.googleapis.com/auth/drive']
+
+
+# Authenticate with Google Drive
+def authenticate_google_drive():
+    from google.oauth2 import service_account
+    from googleapiclient.discovery import build
+
+    credentials_path = getattr(settings, "GOOGLE_DRIVE_CREDENTIALS", None)
+    if not credentials_path:
+        raise Exception("Google Drive credentials not found")
+
+    try:
+        with open(credentials_path, "r", encoding="utf-8") as f:
+            creds_dict = json.load(f)
+    except json.JSONDecodeError as e:
+        raise Exception(f"Error loading Google Drive credentials: {e}")
+
+    creds = service_account.Credentials.from_service_account_info(creds_dict, scopes=DRIVE_SCOPES)
+    return build('drive', 'v3', credentials=creds)
+
+
+# Upload file to Google Drive
+def upload_to_google_drive(file_obj, username):
+    from googleapiclient.http import MediaFileUpload
+
+    drive_service = authenticate_google_drive()
+
+    # Get file extension
+    file_extension = file_obj.name.split('.')[-1]
+
+    # Generate a unique filename: username-profile-photo-YYYYMMDD-HHMMSS.ext
+    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    new_filename = f"{username}-profile-photo-{timestamp}.{file_extension}"
+
+    # Save in-memory file to a temporary file
+    with tempfile.NamedTemporaryFile(delete=False, suffix=f".{file_extension}") as temp_file:
+        for chunk in file_obj.chunks():
+            temp_file.write(chunk)
+        temp_file_path = temp_file.name
+
+    file_metadata = {
+        'name': new_filename,  # Set new filename
+        'parents': [getattr(settings, "GOOGLE_DRIVE_PARENT_FOLDER_ID", None)]
+    }
+
+    media = MediaFileUpload(temp_file_path, mimetype=file_obj.content_type, resumable=True)
+    file = drive_service.files().create(
+        body=file_metadata,
+        media_body=media,
+        fields="id"
+    ).execute()
+
+    return f"https://drive.google.com/file/d/{file['id']}/view"
@@ -0,0 +1,49 @@
+# ------------------- KEYSET ITERATION ----------------------
+# Walking a whole table (every user, every post) must not load it: iterating a QuerySet
+# keeps every row in its result cache, and OFFSET pagination gets slower the deeper it
+# goes. These helpers read in primary key order, chunk_size rows per query, each query
+# starting after the last key seen (WHERE pk > last ORDER BY pk LIMIT chunk_size), so
+# memory holds one chunk however big the table and every query is an index range scan.
+# Rows added or removed while iterating are seen or skipped, never repeated.
+CHUNK_SIZE = 2000
+
+
+def chunked_ids(queryset, chunk_size=CHUNK_SIZE):
+    """
+    Yields the primary keys of queryset as lists of at most chunk_size, in order.
+    """
+    last_pk = None
+    while True:
+        page = queryset.order_by("pk")
+        if last_pk is not None:
+            page = page.filter(pk__gt=last_pk)
+        ids = list(page.values_list("pk", flat=True)[:chunk_size])
+        if not ids:
+            return
+        yield ids
+        last_pk = ids[-1]
+
+
+def iter_ids(queryset, chunk_size=CHUNK_SIZE):
+    """
+    The primary keys of queryset one by one, chunk_size per query.
+    """
+    for ids in chunked_ids(queryset, chunk_size):
+        yield from ids
+
+
+def keyset_iterator(queryset, chunk_size=CHUNK_SIZE):
+    """
+    The rows of queryset one by one, chunk_size per query. Narrow the columns with
+    .only() first when only a few are needed.
+    """
+    last_pk = None
+    while True:
+        page = queryset.order_by("pk")
+        if last_pk is not None:
+            page = page.filter(pk__gt=last_pk)
+        rows = list(page[:chunk_size])
+        if not rows:
+            return
+        yield from rows
+        last_pk = rows[-1].pk
@@ -0,0 +1,30 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from posts.archive import archive_posts, posts_to_archive
+
+
+class Command(BaseCommand):
+    help = (
+        "Moves posts older than the archive horizon, with their comments and likes, to the "
+        "archive tables. Archived posts stay readable through the post detail endpoints."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=getattr(settings, "ARCHIVE_AFTER_DAYS", 365),
+                            help="Archive posts older than this many days.")
+        parser.add_argument("--batch-size", type=int, default=500, help="Posts moved per batch.")
+        parser.add_argument("--dry-run", action="store_true", help="Only report how many posts would move.")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options["days"])
+        if options["dry_run"]:
+            self.stdout.write(f"Posts older than {options['days']} days: {posts_to_archive(cutoff).count()}")
+            return
+
+        archived = archive_posts(cutoff, batch_size=options["batch_size"])
+        self.stdout.write(f"Posts archived: {archived}")
+        self.stdout.write(self.style.SUCCESS("Archival finished."))
@@ -0,0 +1,52 @@
+from datetime import timedelta
+
+from auditlog import get_logentry_model
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand
+from django.apps import apps
+from django.utils import timezone
+
+from posts.audit import get_model_policy
+from posts.iteration import chunked_ids
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes audit log entries older than the retention window, and entries of models "
+        "whose AUDITLOG_MODEL_POLICY is 'skip', in small batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=getattr(settings, "AUDITLOG_RETENTION_DAYS", 90),
+                            help="Keep entries newer than this many days.")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows deleted per statement.")
+        parser.add_argument("--dry-run", action="store_true", help="Only report how many entries would go.")
+
+    def handle(self, *args, **options):
+        LogEntry = get_logentry_model()
+        cutoff = timezone.now() - timedelta(days=options["days"])
+
+        expired = LogEntry.objects.filter(timestamp__lt=cutoff)
+        self.stdout.write(f"Entries older than {options['days']} days: {self.purge(expired, options)}")
+
+        skipped_types = [
+            ContentType.objects.get_for_model(model)
+            for model in apps.get_models()
+            if get_model_policy(model) == "skip"
+        ]
+        if skipped_types:
+            skipped = LogEntry.objects.filter(content_type__in=skipped_types)
+            self.stdout.write(f"Entries of skipped models: {self.purge(skipped, options)}")
+
+        self.stdout.write(self.style.SUCCESS("Audit log compaction finished."))
+
+    def purge(self, queryset, options):
+        if options["dry_run"]:
+            return queryset.count()
+
+        # Delete by primary key batches so no single statement holds the write lock for long
+        deleted = 0
+        for ids in chunked_ids(queryset, options["batch_size"]):
+            deleted += queryset.model.objects.filter(pk__in=ids).delete()[0]
+        return deleted
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from posts import trending
+
+
+class Command(BaseCommand):
+    help = (
+        "Drops trending scores that have decayed below --min-score. Run it periodically "
+        "(e.g. hourly from cron); --rebuild recomputes every score from likes and comments."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--min-score", type=float, default=trending.MIN_SCORE,
+                            help="Decayed score below which a post stops trending.")
+        parser.add_argument("--rebuild", action="store_true",
+                            help="Recompute all scores, e.g. after changing the weights or half-life.")
+
+    def handle(self, *args, **options):
+        if options["rebuild"]:
+            self.stdout.write(f"Rebuilt scores for {trending.rebuild()} posts.")
+
+        removed = trending.compact(options["min_score"])
+        self.stdout.write(self.style.SUCCESS(f"Removed {removed} decayed trending scores."))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.export import CHUNK_SIZE, EXPORT_FORMATS, EXPORT_KINDS, export_stream, parse_cursor, parse_kinds
+
+
+class Command(BaseCommand):
+    help = (
+        "Streams posts, comments, likes and follows as NDJSON or CSV, for one user or everyone. "
+        "Memory use does not grow with the amount of data; --cursor resumes an interrupted export."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", type=int, help="Only this user's data (default: every user).")
+        parser.add_argument("--kinds", default="", help=f"Comma separated, any of: {', '.join(EXPORT_KINDS)}.")
+        parser.add_argument("--format", choices=list(EXPORT_FORMATS), default="ndjson")
+        parser.add_argument("--cursor", help="Resume after this row, e.g. comments:1234.")
+        parser.add_argument("--output", help="Write to this file instead of stdout.")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Rows fetched per query.")
+
+    def handle(self, *args, **options):
+        try:
+            kinds = parse_kinds(options["kinds"])
+            cursor = parse_cursor(options["cursor"])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        lines = export_stream(options["format"], kinds, user_id=options["user"], cursor=cursor,
+                              chunk_size=options["chunk_size"])
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8", newline="") as f:
+                self.write_lines(lines, f.write)
+            self.stderr.write(self.style.SUCCESS(f"Export written to {options['output']}."))
+        else:
+            self.write_lines(lines, lambda line: self.stdout.write(line, ending=""))
+
+    def write_lines(self, lines, write):
+        for line in lines:
+            write(line.decode() if isinstance(line, bytes) else line)
@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from posts.iteration import chunked_ids
+from posts.models import OutboxEvent
+from singletons.event_dispatcher import EventDispatcher
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs the outbox handlers of events that were never processed (worker restarted, "
+        "handler failed), then deletes processed events past the retention window. Handlers "
+        "that only drop cache entries have no outbox row and are not retried here."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--older-than", type=int, default=60,
+                            help="Only retry events at least this many seconds old, newer ones "
+                                 "may still be queued on a worker.")
+        parser.add_argument("--max-attempts", type=int, default=getattr(settings, "EVENTS_MAX_ATTEMPTS", 5),
+                            help="Skip events that already failed this many times.")
+        parser.add_argument("--days", type=int, default=getattr(settings, "EVENTS_RETENTION_DAYS", 7),
+                            help="Keep processed events newer than this many days.")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Rows deleted per statement.")
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        pending = OutboxEvent.objects.filter(
+            processed_at__isnull=True,
+            created_at__lte=now - timedelta(seconds=options["older_than"]),
+            attempts__lt=options["max_attempts"],
+        ).order_by("id")
+
+        dispatcher = EventDispatcher()
+        processed = failed = 0
+        for event_id in pending.values_list("id", flat=True).iterator():
+            if dispatcher.process(event_id):
+                processed += 1
+            else:
+                failed += 1
+        self.stdout.write(f"Events processed: {processed}, failed: {failed}")
+
+        expired = OutboxEvent.objects.filter(processed_at__lt=now - timedelta(days=options["days"]))
+        self.stdout.write(f"Processed events older than {options['days']} days deleted: "
+                          f"{self.purge(expired, options['batch_size'])}")
+
+        given_up = OutboxEvent.objects.filter(processed_at__isnull=True, attempts__gte=options["max_attempts"])
+        if given_up.exists():
+            self.stdout.write(self.style.WARNING(f"Events that exhausted their attempts: {given_up.count()}"))
+
+        self.stdout.write(self.style.SUCCESS("Outbox processing finished."))
+
+    def purge(self, queryset, batch_size):
+        # Delete by primary key batches so no single statement holds the write lock for long
+        deleted = 0
+        for ids in chunked_ids(queryset, batch_size):
+            deleted += OutboxEvent.objects.filter(pk__in=ids).delete()[0]
+        return deleted
@@ -0,0 +1,77 @@
+import os
+import re
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# What a fresh worker runs before it can serve a request
+STARTUP_CODE = (
+    "import importlib, time\n"
+    "started = time.perf_counter()\n"
+    "import django\n"
+    "django.setup()\n"
+    "from django.conf import settings\n"
+    "importlib.import_module(settings.ROOT_URLCONF)\n"
+    "print(f'{(time.perf_counter() - started) * 1000:.1f}')\n"
+)
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+# Integrations that only some endpoints use; they must stay out of the startup path
+LAZY_MODULES = (
+    "googleapiclient.discovery",
+    "google.oauth2.service_account",
+    "dj_rest_auth.registration.views",
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures a cold start (django.setup() plus the URLconf) in a fresh interpreter, "
+        "lists the slowest imports, and fails if the start is over budget or loads a module "
+        "that is meant to be imported lazily."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--budget-ms", type=float,
+                            default=getattr(settings, "STARTUP_IMPORT_BUDGET_MS", 2000),
+                            help="Fail if a cold start takes longer than this.")
+        parser.add_argument("--top", type=int, default=15, help="How many of the slowest imports to list.")
+
+    def handle(self, *args, **options):
+        elapsed_ms, imports = self.profile()
+
+        self.stdout.write(f"Cold start: {elapsed_ms:.1f} ms (budget {options['budget_ms']:.0f} ms), "
+                          f"{len(imports)} modules imported")
+        self.stdout.write("Slowest imports (self time):")
+        for name, self_us, cumulative_us in sorted(imports, key=lambda row: -row[1])[:options["top"]]:
+            self.stdout.write(f"  {self_us / 1000:8.1f} ms  {cumulative_us / 1000:8.1f} ms cumulative  {name}")
+
+        loaded = {name for name, _, _ in imports}
+        eager = [name for name in LAZY_MODULES if name in loaded]
+        if eager:
+            raise CommandError(f"Imported at startup but meant to load lazily: {', '.join(eager)}")
+        if elapsed_ms > options["budget_ms"]:
+            raise CommandError(f"Cold start took {elapsed_ms:.1f} ms, over the {options['budget_ms']:.0f} ms budget.")
+
+        self.stdout.write(self.style.SUCCESS("Startup is within budget."))
+
+    def profile(self):
+        """
+        Returns (elapsed_ms, [(module, self_us, cumulative_us), ...]) for one cold start.
+        """
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": settings.SETTINGS_MODULE}
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", STARTUP_CODE],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, timeout=120,
+        )
+        if result.returncode != 0:
+            raise CommandError(f"Startup failed:\n{result.stderr[-2000:]}")
+
+        imports = []
+        for line in result.stderr.splitlines():
+            match = IMPORTTIME_LINE.match(line)
+            if match:
+                imports.append((match.group(4), int(match.group(1)), int(match.group(2))))
+        return float(result.stdout.strip().splitlines()[-1]), imports
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from posts.models import PurgeJob
+from posts.purge import PURGE_CHUNK_SIZE, run_purge
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs the purge jobs of deleted users and posts that have not finished: pending ones, "
+        "failed ones and ones interrupted while running. Jobs resume where they stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=PURGE_CHUNK_SIZE, help="Rows deleted per transaction.")
+        parser.add_argument("--job", type=int, help="Run only this job.")
+
+    def handle(self, *args, **options):
+        jobs = PurgeJob.objects.exclude(status='done').order_by("id")
+        if options["job"]:
+            jobs = jobs.filter(id=options["job"])
+
+        def progress(job):
+            self.stdout.write(f"  job {job.id}: {job.step}, {job.deleted_rows} rows deleted")
+
+        failed = 0
+        for job_id in list(jobs.values_list("id", flat=True)):
+            try:
+                job = run_purge(job_id, chunk_size=options["chunk_size"], progress=progress)
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f"Purge job {job_id} failed: {e}")
+                continue
+            self.stdout.write(f"Purge job {job.id} done: {job.deleted_rows} rows, {job.deleted_files} files.")
+
+        if failed:
+            self.stdout.write(self.style.WARNING(f"{failed} purge jobs failed; run the command again to resume them."))
+        else:
+            self.stdout.write(self.style.SUCCESS("Purge finished."))
@@ -0,0 +1,57 @@
+import os
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from posts.db_snapshot import build_snapshot, ensure_snapshot, is_sqlite, restore_snapshot, snapshot_path
+
+
+class Command(BaseCommand):
+    help = (
+        "Resets the SQLite database to a freshly migrated one by copying the migrated snapshot "
+        "(built on first use and whenever migrations are added), then creates the superuser and "
+        "loads the given fixtures. Replaces database_cleanup.bat on every platform."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--snapshot", default=None, help="Snapshot file (default: settings.DB_SNAPSHOT_PATH).")
+        parser.add_argument("--rebuild", action="store_true", help="Rebuild the snapshot even if it is current.")
+        parser.add_argument("--fixture", action="append", default=[], help="Fixture to load after the reset.")
+        parser.add_argument("--no-superuser", action="store_true", help="Do not create the superuser.")
+        parser.add_argument("--noinput", "--no-input", action="store_false", dest="interactive",
+                            help="Do not ask for confirmation.")
+
+    def handle(self, *args, **options):
+        if not is_sqlite():
+            raise CommandError("reset_db only works with an SQLite default database.")
+        target = connections["default"].settings_dict["NAME"]
+        if options["interactive"]:
+            answer = input(f"This deletes everything in {target}. Type 'yes' to continue: ")
+            if answer != "yes":
+                raise CommandError("Reset cancelled.")
+
+        path = options["snapshot"] or snapshot_path()
+        if options["rebuild"]:
+            build_snapshot(path)
+        else:
+            ensure_snapshot(path)
+
+        connections["default"].close()
+        restore_snapshot(path, target)
+        self.stdout.write(f"Database restored from {path}.")
+
+        if not options["no_superuser"]:
+            username = os.getenv("DJANGO_SUPERUSER_USERNAME", "admin")
+            User.objects.create_superuser(
+                username,
+                os.getenv("DJANGO_SUPERUSER_EMAIL", "admin@connectly.com"),
+                os.getenv("DJANGO_SUPERUSER_PASSWORD", "mmdc2025"),
+            )
+            self.stdout.write(f"Superuser created: {username}")
+        for fixture in options["fixture"]:
+            call_command("loaddata", fixture, verbosity=0)
+            self.stdout.write(f"Fixture loaded: {fixture}")
+
+        self.stdout.write(self.style.SUCCESS("Database reset."))
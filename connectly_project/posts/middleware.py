@@ -0,0 +1,205 @@
+from gzip import GzipFile
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.utils.cache import patch_vary_headers
+from django.utils.decorators import sync_and_async_middleware
+from django.utils.functional import SimpleLazyObject
+from django.utils.text import StreamingBuffer, compress_sequence, compress_string
+
+from singletons.config_manager import ConfigManager
+from .db_router import apin_user_to_primary, pin_user_to_primary
+
+try:
+    import brotli
+except ImportError:  # Optional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # Optional
+    zstandard = None
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+@sync_and_async_middleware
+class PrimaryPinMiddleware:
+    """
+    After a successful write (POST/PUT/PATCH/DELETE) by an authenticated user,
+    pins that user to the primary database so their next reads see the change.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+
+        if self.is_write(request, response):
+            # DRF copies the authenticated user (JWT or session) back onto the Django request
+            user = getattr(request, "user", None)
+            if user is not None and user.is_authenticated:
+                pin_user_to_primary(user.id)
+
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+
+        if self.is_write(request, response):
+            user = getattr(request, "user", None)
+            if isinstance(user, SimpleLazyObject) and hasattr(request, "auser"):
+                # Not replaced by DRF: resolve the session user without blocking the event loop
+                user = await request.auser()
+            if user is not None and user.is_authenticated:
+                await apin_user_to_primary(user.id)
+
+        return response
+
+    @staticmethod
+    def is_write(request, response):
+        return request.method not in SAFE_METHODS and response.status_code < 400
+
+
+# ------------------- COMPRESSION ----------------------
+# gzip is always available; brotli and zstd are used when their packages are installed.
+COMPRESSORS = {"gzip": compress_string}
+if brotli is not None:
+    COMPRESSORS["br"] = lambda body: brotli.compress(body, quality=5)
+if zstandard is not None:
+    # Compressor objects are not thread-safe, so one per response
+    COMPRESSORS["zstd"] = lambda body: zstandard.ZstdCompressor(level=3).compress(body)
+
+# Server preference when the client accepts several with the same q-value
+ENCODING_PREFERENCE = ("zstd", "br", "gzip")
+COMPRESSIBLE_TYPES = ("application/json", "application/javascript", "application/xml", "text/", "image/svg+xml")
+
+
+async def acompress_sequence(sequence):
+    """
+    compress_sequence for async iterators. Every chunk is flushed as it arrives, so
+    long-lived streams (the /events/ SSE stream) reach the client without delay.
+    """
+    buf = StreamingBuffer()
+    with GzipFile(mode="wb", compresslevel=6, fileobj=buf, mtime=0) as zfile:
+        yield buf.read()
+        async for item in sequence:
+            zfile.write(item)
+            zfile.flush()
+            data = buf.read()
+            if data:
+                yield data
+    yield buf.read()
+
+
+def parse_accept_encoding(header):
+    """
+    {coding: q-value} from an Accept-Encoding header.
+    """
+    accepted = {}
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    return accepted
+
+
+def choose_encoding(header, available=None):
+    """
+    The best content-coding both sides support, or None for identity.
+    """
+    available = COMPRESSORS if available is None else available
+    accepted = parse_accept_encoding(header)
+    best, best_q = None, 0.0
+    for coding in ENCODING_PREFERENCE:
+        if coding not in available:
+            continue
+        q = accepted.get(coding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+@sync_and_async_middleware
+class CompressionMiddleware:
+    """
+    Compresses responses with the best encoding the client accepts (zstd, br or gzip)
+    once they reach COMPRESSION_MIN_SIZE bytes (ConfigManager).
+
+    Only GET/HEAD responses are compressed: responses to writes can echo back secrets
+    (tokens from /auth/convert-token/), which compression would expose to BREACH-style attacks.
+    Responses that are already encoded (the pre-gzipped cached pages) are left alone.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.compress(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.compress(request, await self.get_response(request))
+
+    def compress(self, request, response):
+        if request.method not in ("GET", "HEAD") or not self.is_compressible(response):
+            return response
+
+        if response.streaming:
+            # Streaming bodies have no length up front; gzip them chunk by chunk
+            patch_vary_headers(response, ("Accept-Encoding",))
+            if "gzip" not in parse_accept_encoding(request.META.get("HTTP_ACCEPT_ENCODING", "")):
+                return response
+            if response.is_async:
+                response.streaming_content = acompress_sequence(response.streaming_content)
+            else:
+                response.streaming_content = compress_sequence(response.streaming_content)
+            del response.headers["Content-Length"]
+            return self.mark_encoded(response, "gzip")
+
+        if len(response.content) < ConfigManager().get_setting("COMPRESSION_MIN_SIZE"):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        coding = choose_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if coding is None:
+            return response
+
+        compressed = COMPRESSORS[coding](response.content)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response["Content-Length"] = str(len(compressed))
+        return self.mark_encoded(response, coding)
+
+    @staticmethod
+    def is_compressible(response):
+        if response.status_code in (204, 304) or response.has_header("Content-Encoding"):
+            return False
+        if "no-transform" in response.get("Cache-Control", ""):
+            return False
+        return response.get("Content-Type", "").startswith(COMPRESSIBLE_TYPES)
+
+    @staticmethod
+    def mark_encoded(response, coding):
+        response["Content-Encoding"] = coding
+        # The encoded body is no longer byte-for-byte the one a strong ETag promised
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        return response
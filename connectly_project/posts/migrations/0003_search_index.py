@@ -0,0 +1,30 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    # Postgres computes tsvectors on the fly, only SQLite needs the FTS5 table
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS posts_search_index USING fts5("
+        "title, content, author, "
+        "kind UNINDEXED, object_id UNINDEXED, privacy UNINDEXED, owner_id UNINDEXED, "
+        "tokenize = 'unicode61 remove_diacritics 2')"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS posts_search_index")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0002_post_privacy'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0005_outbox_event'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedComment',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('post_id', models.BigIntegerField(db_index=True)),
+                ('author_id', models.IntegerField(db_index=True)),
+                ('content', models.TextField()),
+                ('comment_type', models.CharField(max_length=10)),
+                ('metadata', models.JSONField(blank=True, default=dict)),
+                ('image', models.CharField(blank=True, max_length=100, null=True)),
+                ('video', models.CharField(blank=True, max_length=100, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('like_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedLike',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('user_id', models.IntegerField(db_index=True)),
+                ('post_id', models.BigIntegerField(blank=True, db_index=True, null=True)),
+                ('comment_id', models.BigIntegerField(blank=True, db_index=True, null=True)),
+                ('created_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedPost',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('author_id', models.IntegerField(db_index=True)),
+                ('title', models.CharField(max_length=255)),
+                ('content', models.TextField()),
+                ('post_type', models.CharField(max_length=10)),
+                ('metadata', models.JSONField(blank=True, default=dict)),
+                ('image', models.CharField(blank=True, max_length=100, null=True)),
+                ('video', models.CharField(blank=True, max_length=100, null=True)),
+                ('privacy', models.CharField(max_length=10)),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('like_count', models.PositiveIntegerField(default=0)),
+                ('comment_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -1,6 +1,14 @@
 from django.db import models
 from django.contrib.auth.models import User
-from auditlog.registry import auditlog
+from . import audit
+
+
+class LiveManager(models.Manager):
+    """
+    Hides soft-deleted rows (deleted_at set) until their PurgeJob removes them (posts/purge.py).
+    """
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
 
 
 class Post(models.Model):
@@ -24,6 +32,10 @@ class Post(models.Model):
     author = models.ForeignKey(User, related_name='posts', on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
     privacy = models.CharField(max_length=10, choices=PRIVACY_CHOICES, default='public')
+    deleted_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    objects = LiveManager()
+    all_objects = models.Manager()
 
     def like_count(self):
         return self.likes.count()
@@ -49,6 +61,10 @@ class Comment(models.Model):
     author = models.ForeignKey(User, related_name='comments', on_delete=models.CASCADE)
     post = models.ForeignKey(Post, related_name='comments', on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
+    deleted_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    objects = LiveManager()
+    all_objects = models.Manager()
 
     def like_count(self):
         return self.likes.count()
@@ -82,10 +98,118 @@ class Follow(models.Model):
     def __str__(self):
         return f"{self.follower.username} follows {self.following.username}"
 
-auditlog.register(Post)
-auditlog.register(Comment)
-auditlog.register(Like)
-auditlog.register(Follow)
+class PostScore(models.Model):
+    """
+    Time-decayed engagement score of a post, updated on every like and comment (posts/trending.py).
+    """
+    post = models.OneToOneField(Post, related_name='score', on_delete=models.CASCADE, primary_key=True)
+    hot = models.FloatField(db_index=True)  # log2 of the score scaled to a fixed epoch, see posts/trending.py
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Score {self.hot:.3f} for post {self.post_id}"
+
+class OutboxEvent(models.Model):
+    """
+    A domain event saved in the same transaction as the write it describes, so its
+    background handlers run even if the process dies right after the commit (posts/events.py).
+    """
+    name = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    def __str__(self):
+        return f"{self.name} #{self.id}"
+
+class PurgeJob(models.Model):
+    """
+    Background removal of a soft-deleted user or post and everything that hangs off it,
+    in small chunks (posts/purge.py). Progress is kept on the row.
+    """
+    KINDS = [
+        ('user', 'User'),
+        ('post', 'Post'),
+    ]
+    STATUSES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KINDS)
+    target_id = models.BigIntegerField()
+    requested_by_id = models.IntegerField(null=True, blank=True)
+    status = models.CharField(max_length=10, choices=STATUSES, default='pending', db_index=True)
+    step = models.CharField(max_length=50, blank=True)
+    deleted_rows = models.PositiveIntegerField(default=0)
+    deleted_files = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Purge of {self.kind} {self.target_id} ({self.status})"
+
+# ------------------- ARCHIVE ----------------------
+# Posts older than ARCHIVE_AFTER_DAYS are moved here with their comments and likes by
+# `manage.py archive_posts` (posts/archive.py). The ids are the original ones, and users
+# and posts are referenced by plain id columns so the tables can live in another
+# database (settings.ARCHIVE_DATABASE). Like and comment totals are stored with the rows.
+class ArchivedPost(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    author_id = models.IntegerField(db_index=True)
+    title = models.CharField(max_length=255)
+    content = models.TextField()
+    post_type = models.CharField(max_length=10)
+    metadata = models.JSONField(blank=True, default=dict)
+    image = models.CharField(max_length=100, blank=True, null=True)
+    video = models.CharField(max_length=100, blank=True, null=True)
+    privacy = models.CharField(max_length=10)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    like_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"Archived post {self.id}"
+
+
+class ArchivedComment(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    post_id = models.BigIntegerField(db_index=True)
+    author_id = models.IntegerField(db_index=True)
+    content = models.TextField()
+    comment_type = models.CharField(max_length=10)
+    metadata = models.JSONField(blank=True, default=dict)
+    image = models.CharField(max_length=100, blank=True, null=True)
+    video = models.CharField(max_length=100, blank=True, null=True)
+    created_at = models.DateTimeField()
+    like_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"Archived comment {self.id}"
+
+
+class ArchivedLike(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    user_id = models.IntegerField(db_index=True)
+    post_id = models.BigIntegerField(null=True, blank=True, db_index=True)
+    comment_id = models.BigIntegerField(null=True, blank=True, db_index=True)
+    created_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"Archived like {self.id}"
+
+# Per-model audit policy and optional buffered (after-commit, batched) writes, see posts/audit.py
+audit.register(Post)
+audit.register(Comment)
+audit.register(Like)
+audit.register(Follow)
 
 User.add_to_class('profile_photo', models.URLField(blank=True, null=True))
 
@@ -0,0 +1,165 @@
+from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
+from django.db import router, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from singletons.logger_singleton import LoggerSingleton
+from . import search
+from .versions import bump_versions
+from .models import ArchivedComment, ArchivedLike, ArchivedPost, Comment, Follow, Like, Post, PurgeJob
+
+logger = LoggerSingleton().get_logger()
+
+# ------------------- SOFT DELETE ----------------------
+# Deleting a user or a post used to cascade through every comment, like, follow and audit
+# entry in the request's transaction, locking the database for as long as that took.
+# Now the request only hides the rows (a few UPDATEs) and records a PurgeJob; the job
+# deletes the rows afterwards in small chunks, each its own transaction, and removes the
+# media files once the chunk that referenced them has committed.
+#
+# The UPDATEs fire no model signals, so hiding also does what the post_delete receivers
+# (posts/signals.py) would have: the search rows go in the same transaction, and the
+# versions are bumped once it commits, so no conditional GET is answered 304 for content
+# that is now hidden.
+PURGE_CHUNK_SIZE = 500
+MEDIA_FIELDS = ("image", "video")
+
+
+def forget_hidden(posts, comments):
+    """
+    Removes the hidden posts and comments from the search index and, after commit, bumps
+    the versions of the lists and of every hidden post and comment.
+    """
+    search.remove_matching_from_index("post", posts)
+    search.remove_matching_from_index("comment", comments)
+    names = ["posts", "comments",
+             *(f"post_{post_id}" for post_id in posts.values_list("id", flat=True)),
+             *(f"comment_{comment_id}" for comment_id in comments.values_list("id", flat=True))]
+    transaction.on_commit(lambda: bump_versions(*names))
+
+
+def soft_delete_post(post, requested_by=None):
+    """
+    Hides the post and its comments now and returns the PurgeJob that removes them.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        Post.all_objects.filter(id=post.id).update(deleted_at=now)
+        Comment.all_objects.filter(post_id=post.id, deleted_at__isnull=True).update(deleted_at=now)
+        forget_hidden(Post.all_objects.filter(id=post.id), Comment.all_objects.filter(post_id=post.id))
+        return PurgeJob.objects.create(kind='post', target_id=post.id,
+                                       requested_by_id=getattr(requested_by, "id", None))
+
+
+def soft_delete_user(user, requested_by=None):
+    """
+    Deactivates the user, hides their posts and comments now, and returns the PurgeJob
+    that removes them and the user.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        user.is_active = False
+        user.save(update_fields=["is_active"])
+        Post.all_objects.filter(author_id=user.id, deleted_at__isnull=True).update(deleted_at=now)
+        Comment.all_objects.filter(Q(author_id=user.id) | Q(post__author_id=user.id),
+                                   deleted_at__isnull=True).update(deleted_at=now)
+        forget_hidden(Post.all_objects.filter(author_id=user.id),
+                      Comment.all_objects.filter(Q(author_id=user.id) | Q(post__author_id=user.id)))
+        return PurgeJob.objects.create(kind='user', target_id=user.id,
+                                       requested_by_id=getattr(requested_by, "id", None))
+
+
+# ------------------- PURGE ----------------------
+def purge_steps(job):
+    """
+    (label, queryset) pairs, leaves first, so no chunk has much left to cascade to.
+    """
+    if job.kind == 'post':
+        post_id = job.target_id
+        return [
+            ("comment likes", Like.objects.filter(comment__post_id=post_id)),
+            ("comments", Comment.all_objects.filter(post_id=post_id)),
+            ("post likes", Like.objects.filter(post_id=post_id)),
+            ("post", Post.all_objects.filter(id=post_id)),
+        ]
+
+    user_id = job.target_id
+    archived_posts = ArchivedPost.objects.filter(author_id=user_id).values("id")
+    return [
+        ("likes", Like.objects.filter(
+            Q(user_id=user_id) | Q(post__author_id=user_id)
+            | Q(comment__author_id=user_id) | Q(comment__post__author_id=user_id)
+        )),
+        ("comments", Comment.all_objects.filter(Q(author_id=user_id) | Q(post__author_id=user_id))),
+        ("posts", Post.all_objects.filter(author_id=user_id)),
+        ("follows", Follow.objects.filter(Q(follower_id=user_id) | Q(following_id=user_id))),
+        ("archived likes", ArchivedLike.objects.filter(Q(user_id=user_id) | Q(post_id__in=archived_posts))),
+        ("archived comments", ArchivedComment.objects.filter(Q(author_id=user_id) | Q(post_id__in=archived_posts))),
+        ("archived posts", ArchivedPost.objects.filter(author_id=user_id)),
+        ("user", User.objects.filter(id=user_id)),
+    ]
+
+
+def media_files(model, ids):
+    fields = [name for name in MEDIA_FIELDS if name in {field.name for field in model._meta.concrete_fields}]
+    if not fields or not hasattr(model, "all_objects"):
+        return []
+    names = []
+    for row in model.all_objects.filter(pk__in=ids).values_list(*fields):
+        names.extend(name for name in row if name)
+    return names
+
+
+def delete_media(job_id, names):
+    deleted = 0
+    for name in names:
+        try:
+            default_storage.delete(name)
+            deleted += 1
+        except Exception as e:
+            logger.error(f"Purge job {job_id}: could not delete media file {name}: {e}")
+    if deleted:
+        PurgeJob.objects.filter(id=job_id).update(deleted_files=F("deleted_files") + deleted)
+
+
+def run_purge(job_id, chunk_size=PURGE_CHUNK_SIZE, progress=None):
+    """
+    Runs (or resumes) a purge job. progress(job) is called after every chunk.
+    A failure is recorded on the job and re-raised; running the job again resumes it.
+    """
+    job = PurgeJob.objects.get(id=job_id)
+    if job.status == 'done':
+        return job
+
+    job.status, job.started_at = 'running', job.started_at or timezone.now()
+    job.save(update_fields=["status", "started_at"])
+    try:
+        for label, queryset in purge_steps(job):
+            job.step = label
+            job.save(update_fields=["step"])
+            model = queryset.model
+            db = router.db_for_write(model)
+            while True:
+                ids = list(queryset.using(db).order_by("pk").values_list("pk", flat=True)[:chunk_size])
+                if not ids:
+                    break
+                with transaction.atomic(using=db):
+                    files = media_files(model, ids)
+                    deleted = model._base_manager.using(db).filter(pk__in=ids).delete()[1].get(model._meta.label, 0)
+                    transaction.on_commit(lambda files=files: delete_media(job.id, files), using=db)
+                job.deleted_rows += deleted
+                job.save(update_fields=["deleted_rows"])
+                if progress is not None:
+                    progress(job)
+    except Exception as e:
+        job.status, job.last_error = 'failed', repr(e)
+        job.save(update_fields=["status", "last_error"])
+        logger.exception(f"Purge job {job.id} failed at step '{job.step}'.")
+        raise
+
+    job.status, job.finished_at, job.last_error = 'done', timezone.now(), ""
+    job.save(update_fields=["status", "finished_at", "last_error"])
+    job.refresh_from_db(fields=["deleted_files"])
+    logger.info(f"Purge job {job.id} done: {job.deleted_rows} rows and {job.deleted_files} files deleted.")
+    return job
@@ -0,0 +1,148 @@
+import asyncio
+import itertools
+import threading
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from singletons.logger_singleton import LoggerSingleton
+
+logger = LoggerSingleton().get_logger()
+
+# ------------------- REAL-TIME EVENTS ----------------------
+# Write paths publish small events to named channels; the /events/ stream (Server-Sent
+# Events, posts/async_views.py) subscribes a client to just the channels it cares about:
+#   notify_<user>    likes and comments on the user's posts, new followers
+#   author_<user>    new public posts by a user (subscribed for everyone you follow)
+#   post_<id>        likes and comments on one post (opt-in with ?posts=1,2)
+#   user_<user>      the user's own follow/unfollow (the stream then re-reads who they follow)
+#
+# The broker is chosen with settings.REALTIME_BROKER. LocalBroker only reaches clients
+# connected to the same process; with several workers plug in a backend with the same
+# publish/subscribe/unsubscribe methods on top of a shared pub/sub (e.g. Redis).
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+class Subscription:
+    """
+    One connected client: an asyncio queue on the client's event loop, filled by publish().
+    """
+
+    def __init__(self, channels, loop=None):
+        self.channels = set(channels)
+        self.loop = loop or asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.overflowed = False
+
+    def deliver(self, event):
+        # Runs on the subscriber's loop (call_soon_threadsafe)
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # A slow client: drop the event and tell it to refetch instead of buffering forever
+            self.overflowed = True
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class LocalBroker:
+    """
+    In-process broker. publish() may be called from any thread; each event is handed to
+    the subscriber's own event loop.
+    """
+
+    def __init__(self):
+        self._subscriptions = {}  # channel -> set of Subscription
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def subscribe(self, channels):
+        subscription = Subscription(channels)
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscriptions.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._subscriptions.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscriptions[channel]
+
+    def resubscribe(self, subscription, channels):
+        self.unsubscribe(subscription)
+        subscription.channels = set(channels)
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscriptions.setdefault(channel, set()).add(subscription)
+
+    def publish(self, channels, event):
+        """
+        Sends the event once to every subscriber of any of the channels. Returns how many got it.
+        """
+        event = {**event, "id": next(self._ids)}
+        with self._lock:
+            targets = set().union(*(self._subscriptions.get(channel, ()) for channel in channels))
+
+        for subscription in targets:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+            except RuntimeError:
+                # The client's loop is gone; its stream will unsubscribe on the way out
+                pass
+        return len(targets)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(set().union(*self._subscriptions.values())) if self._subscriptions else 0
+
+
+_broker = None
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        _broker = import_string(getattr(settings, "REALTIME_BROKER", "posts.realtime.LocalBroker"))()
+    return _broker
+
+
+# ------------------- PUBLISHING ----------------------
+# Called by the model signal receivers after the write commits (posts/signals.py)
+def publish(channels, event):
+    try:
+        delivered = get_broker().publish(channels, event)
+    except Exception as e:
+        # Push is best effort, clients still have polling and ETags to fall back on
+        logger.error(f"Realtime publish failed for {event.get('type')}: {e}")
+        return
+    if delivered:
+        logger.info(f"Realtime: {event['type']} sent to {delivered} subscriber(s).")
+
+
+def post_created(post):
+    if post.privacy == 'public':
+        publish([f"author_{post.author_id}"], {"type": "post_created", "post": post.id, "author": post.author_id})
+
+
+def post_liked(like, post_author_id):
+    publish([f"notify_{post_author_id}", f"post_{like.post_id}"],
+            {"type": "post_liked", "post": like.post_id, "user": like.user_id})
+
+
+def comment_created(comment, post_author_id):
+    publish([f"notify_{post_author_id}", f"post_{comment.post_id}"],
+            {"type": "comment_created", "post": comment.post_id, "comment": comment.id, "user": comment.author_id})
+
+
+def follow_changed(follow, followed):
+    event = {"type": "user_followed" if followed else "user_unfollowed",
+             "follower": follow.follower_id, "following": follow.following_id}
+    channels = [f"user_{follow.follower_id}"]
+    if followed:
+        channels.append(f"notify_{follow.following_id}")
+    publish(channels, event)
@@ -0,0 +1,73 @@
+from django.conf import settings
+from rest_framework import renderers
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # Optional: without it everything falls back to DRF's stdlib json
+    orjson = None
+
+# ------------------- FAST JSON ----------------------
+# orjson encodes datetimes, dates, UUIDs and dataclasses itself; anything else it does not
+# know (Decimal, lazy translation strings, QuerySets, ...) goes through DRF's own encoder,
+# so the output matches what DRF's JSONRenderer produces.
+#
+# Like DRF, U+2028 and U+2029 are escaped: valid in JSON, but line breaks in JavaScript
+# source, so a payload inlined in a <script> would break it. One difference remains:
+# orjson writes NaN and +/-Infinity as null, where DRF raises under STRICT_JSON (and writes
+# the non-standard NaN/Infinity tokens without it). Checking for them would mean walking
+# every payload in Python; no serializer here produces them.
+_drf_encoder = JSONEncoder()
+
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+
+def json_default(obj):
+    return _drf_encoder.default(obj)
+
+
+def dumps(data):
+    """
+    Encodes data to compact UTF-8 JSON bytes.
+    """
+    if orjson is not None:
+        encoded = orjson.dumps(data, default=json_default, option=ORJSON_OPTIONS)
+        # replace() returns the same bytes when there is nothing to escape
+        return encoded.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+    return renderers.JSONRenderer().render(data)
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    """
+    JSONRenderer backed by orjson. Indented output (?indent / Accept: ...; indent=4)
+    is left to the stdlib implementation.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        return dumps(data)
+
+
+class FastJSONParser(JSONParser):
+    """
+    JSONParser backed by orjson.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+
+        encoding = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+        try:
+            body = stream.read()
+            if encoding.lower().replace('-', '') != 'utf8':
+                body = body.decode(encoding)
+            return orjson.loads(body)
+        except (ValueError, UnicodeDecodeError) as exc:
+            raise ParseError(f'JSON parse error - {exc}')
@@ -0,0 +1,222 @@
+import hashlib
+import re
+import time
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+
+from .renderers import dumps
+
+# ------------------- RESPONSE CACHE ----------------------
+# Cached pages are stored as final response bodies: the JSON bytes plus a gzipped copy
+# and the headers to send with them, so a cache hit is a byte copy with no unpickling
+# of nested dicts, no rendering and no compression.
+#
+# Each set of query params (?search=, ?ordering=, ?page_size=, ...) is a variant of the
+# page with its own cache key: the page's key plus a hash of the params (variant_cache_key).
+# A hit reads that one body, storing one never rewrites the others, and a new variant
+# adds a key that expires on its own. Variants are invalidated with their page, through
+# its generation (see CACHE KEYS).
+JSON_CONTENT_TYPE = "application/json"
+MIN_COMPRESS_SIZE = 200  # Bytes; smaller bodies do not get smaller with gzip
+ACCEPTS_GZIP = re.compile(r"\bgzip\b")
+
+
+# ------------------- CACHE KEYS ----------------------
+# Keys and variants are derived from the request only here, so that requests the views
+# answer the same way share an entry and requests they answer differently never do:
+#   - a param counts with the value the views read (its last one), blank ones not at all
+#     (?search= is no search), and the order of the params does not matter
+#   - the page number is part of the key, parsed (?page=01 is page 1); a page that is not
+#     a positive number is not cached, the view answers it with a 404
+#
+# Every page key also carries its key format's generation (page_cache_key). Invalidating
+# all the pages of a key format (every page of a user's feed, say) increments it, which
+# orphans every page cached so far, including pages nobody keeps track of, without
+# deleting anything; the orphans expire with their timeout. A request reads the
+# generation before it reads the database, so a page computed before a concurrent write
+# is stored under the old generation and never served. Generations start at the current
+# time in nanoseconds, so one that was evicted restarts above every earlier value.
+#
+# Per-user key formats also belong to a family (e.g. every user's feed), whose generation
+# is part of each of their page keys too: invalidating one user's pages increments theirs,
+# invalidating everyone's increments the family's, one incr however many users there are.
+PAGE_PARAM = "page"
+
+
+def normalized_params(request, exclude=(PAGE_PARAM,)):
+    params = getattr(request, "query_params", request.GET)
+    return sorted(
+        (name, params.get(name).strip()) for name in params
+        if name not in exclude and params.get(name).strip()
+    )
+
+
+def variant_key(request):
+    """
+    The request's query params, other than the page, normalized.
+    """
+    return urlencode(normalized_params(request))
+
+
+def variant_cache_key(cache_key, variant):
+    """
+    The cache key of one variant (a variant_key()) of the page at cache_key.
+    """
+    return f"{cache_key}_v{hashlib.md5(variant.encode(), usedforsecurity=False).hexdigest()}"
+
+
+def canonical_url(request):
+    """
+    The request's absolute URL with its query normalized, for pagination links: requests
+    that share a cached page get the same links.
+    """
+    query = urlencode(normalized_params(request, exclude=()))
+    return request.build_absolute_uri(request.path) + (f"?{query}" if query else "")
+
+
+def page_number(request):
+    """
+    The requested page as an int (1 when absent), or None when it is not a positive number.
+    """
+    params = getattr(request, "query_params", request.GET)
+    value = params.get(PAGE_PARAM, "").strip() or "1"
+    if not value.isdigit() or int(value) < 1:
+        return None
+    return int(value)
+
+
+def generation_key(key_format):
+    return key_format.format(page="generation")
+
+
+def new_generation():
+    return time.time_ns()
+
+
+def generation(key_format, family=None):
+    """
+    The current generation of key_format's pages (e.g. "users_list_page_{page}"), prefixed
+    with the generation of their family, if any.
+    """
+    keys = [generation_key(f) for f in (family, key_format) if f is not None]
+    values = cache.get_many(keys)
+    for key in keys:
+        if key not in values:
+            # add() keeps the one another request or worker just started
+            cache.add(key, new_generation(), None)
+            values[key] = cache.get(key, new_generation())
+    return ".".join(str(values[key]) for key in keys)
+
+
+async def ageneration(key_format, family=None):
+    keys = [generation_key(f) for f in (family, key_format) if f is not None]
+    values = await cache.aget_many(keys)
+    for key in keys:
+        if key not in values:
+            await cache.aadd(key, new_generation(), None)
+            values[key] = await cache.aget(key, new_generation())
+    return ".".join(str(values[key]) for key in keys)
+
+
+def page_cache_key(key_format, page, page_generation=None, family=None):
+    """
+    The cache key of page in the current generation of key_format (or in page_generation).
+    """
+    if page_generation is None:
+        page_generation = generation(key_format, family)
+    return f"{key_format.format(page=page)}_g{page_generation}"
+
+
+async def apage_cache_key(key_format, page, family=None):
+    return page_cache_key(key_format, page, await ageneration(key_format, family))
+
+
+def invalidate_pages(key_format):
+    """
+    Orphans every cached page of key_format. Returns whether any generation was current.
+    """
+    try:
+        cache.incr(generation_key(key_format))
+    except ValueError:
+        # No generation: no page was cached since it expired, the next request starts a new one
+        return False
+    return True
+
+
+def invalidate_pages_many(key_formats):
+    """
+    invalidate_pages() for many key formats (e.g. one per user). One get_many finds the
+    formats with a generation; the others had nothing cached and cost nothing more.
+    Returns the formats invalidated.
+    """
+    formats = {generation_key(key_format): key_format for key_format in key_formats}
+    return [formats[key] for key in cache.get_many(list(formats)) if invalidate_pages(formats[key])]
+
+
+def build_entry(data):
+    body = dumps(data)
+    entry = {"body": body, "gzip": None, "headers": {"Content-Type": JSON_CONTENT_TYPE}}
+    if len(body) >= MIN_COMPRESS_SIZE:
+        compressed = compress_string(body)
+        if len(compressed) < len(body):
+            entry["gzip"] = compressed
+    return entry
+
+
+def entry_response(entry, request=None):
+    """
+    Builds the response for a cached entry, gzipped if the client accepts it.
+    """
+    accepts_gzip = request is not None and ACCEPTS_GZIP.search(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+    if entry["gzip"] is not None and accepts_gzip:
+        response = HttpResponse(entry["gzip"])
+        response["Content-Encoding"] = "gzip"
+    else:
+        response = HttpResponse(entry["body"])
+    for header, value in entry["headers"].items():
+        response[header] = value
+    if entry["gzip"] is not None:
+        patch_vary_headers(response, ("Accept-Encoding",))
+    return response
+
+
+def encoded_response(body):
+    return HttpResponse(body, content_type=JSON_CONTENT_TYPE)
+
+
+def get_cached_response(cache_key, request):
+    """
+    Returns this request's variant of the cached page as a ready-to-send response,
+    or None on a miss.
+    """
+    entry = cache.get(variant_cache_key(cache_key, variant_key(request)))
+    if entry is None:
+        return None
+    return entry_response(entry, request)
+
+
+def cache_response(cache_key, request, data, timeout):
+    """
+    Encodes data and stores it as this request's variant of the page.
+    Returns the response to send for it.
+    """
+    entry = build_entry(data)
+    cache.set(variant_cache_key(cache_key, variant_key(request)), entry, timeout)
+    return entry_response(entry, request)
+
+
+async def aget_cached_response(cache_key, request):
+    entry = await cache.aget(variant_cache_key(cache_key, variant_key(request)))
+    if entry is None:
+        return None
+    return entry_response(entry, request)
+
+
+async def acache_response(cache_key, request, data, timeout):
+    entry = build_entry(data)
+    await cache.aset(variant_cache_key(cache_key, variant_key(request)), entry, timeout)
+    return entry_response(entry, request)
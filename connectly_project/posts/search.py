@@ -0,0 +1,280 @@
+import re
+
+from django.core.exceptions import EmptyResultSet
+from django.db import connection, connections, router
+
+from .models import Post, Comment
+
+# ------------------- FULL-TEXT SEARCH ----------------------
+# SQLite: an FTS5 virtual table kept in sync by posts/signals.py (ranked with bm25).
+# Postgres: tsvector/tsquery computed by the database (ranked with ts_rank).
+
+SEARCH_TABLE = "posts_search_index"
+SEARCH_KINDS = ("post", "comment")
+
+# bm25 column weights: title, content, author
+BM25_WEIGHTS = (10.0, 1.0, 5.0)
+
+TERM_RE = re.compile(r"\w+\*?", re.UNICODE)
+
+
+def uses_fts5():
+    return connection.vendor == "sqlite"
+
+
+def uses_tsvector():
+    return connection.vendor == "postgresql"
+
+
+def _rowid(kind, object_id):
+    # Posts and comments share one table: even rowids are posts, odd rowids are comments
+    return object_id * 2 + (1 if kind == "comment" else 0)
+
+
+def parse_terms(query):
+    """
+    Splits the raw query into terms. A trailing '*' marks a prefix term ("djan*").
+    Returns a list of (term, is_prefix) tuples.
+    """
+    terms = []
+    for match in TERM_RE.findall(query or ""):
+        is_prefix = match.endswith("*")
+        term = match.rstrip("*")
+        if term:
+            terms.append((term, is_prefix))
+    return terms
+
+
+def build_fts5_query(terms):
+    # Quote every term so FTS5 operators in user input are treated as plain text
+    return " ".join(f'"{term}"*' if is_prefix else f'"{term}"' for term, is_prefix in terms)
+
+
+def build_tsquery(terms):
+    return " & ".join(f"{term}:*" if is_prefix else term for term, is_prefix in terms)
+
+
+# ------------------- INDEX MAINTENANCE (SQLITE) ----------------------
+# The FTS5 table itself is created by migration 0003_search_index.
+def _post_row(post):
+    return (
+        _rowid("post", post.id), post.title, post.content, post.author.username,
+        "post", post.id, post.privacy, post.author_id,
+    )
+
+
+def _comment_row(comment):
+    # A comment is only as visible as the post it belongs to
+    return (
+        _rowid("comment", comment.id), "", comment.content, comment.author.username,
+        "comment", comment.id, comment.post.privacy, comment.post.author_id,
+    )
+
+
+def _write_rows(rows):
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT OR REPLACE INTO {SEARCH_TABLE} "
+            "(rowid, title, content, author, kind, object_id, privacy, owner_id) "
+            "VALUES (%s, %s, %s, %s, %s, %s, %s, %s)",
+            rows,
+        )
+
+
+def index_post(post, with_comments=True):
+    if not uses_fts5():
+        return
+    _write_rows([_post_row(post)])
+    if not with_comments:
+        return
+    # Comments inherit the post's privacy, so refresh them too
+    comments = Comment.objects.filter(post=post).select_related("author", "post")
+    _write_rows([_comment_row(comment) for comment in comments])
+
+
+def index_comment(comment):
+    if not uses_fts5():
+        return
+    _write_rows([_comment_row(comment)])
+
+
+def remove_from_index(kind, object_id):
+    if not uses_fts5():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [_rowid(kind, object_id)])
+
+
+def remove_matching_from_index(kind, queryset):
+    """
+    Removes the index rows of every object of queryset (posts or comments) in one statement.
+    """
+    if not uses_fts5():
+        return
+    try:
+        sql, params = queryset.values("id").query.sql_with_params()
+    except EmptyResultSet:  # e.g. id__in=[]
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN (SELECT id * 2 + %s FROM ({sql}))",
+                       [_rowid(kind, 0), *params])
+
+
+def rebuild_index(chunk_size=1000):
+    """
+    Drops and re-fills the whole index. Returns (posts indexed, comments indexed).
+    """
+    if not uses_fts5():
+        return 0, 0
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+
+    post_count = comment_count = 0
+    rows = []
+    for post in Post.objects.select_related("author").iterator(chunk_size=chunk_size):
+        rows.append(_post_row(post))
+        post_count += 1
+        if len(rows) >= chunk_size:
+            _write_rows(rows)
+            rows = []
+
+    for comment in Comment.objects.select_related("author", "post").iterator(chunk_size=chunk_size):
+        rows.append(_comment_row(comment))
+        comment_count += 1
+        if len(rows) >= chunk_size:
+            _write_rows(rows)
+            rows = []
+
+    if rows:
+        _write_rows(rows)
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('optimize')")
+
+    return post_count, comment_count
+
+
+# ------------------- QUERYING ----------------------
+def read_connection():
+    # Same route as the ORM reads of the request (ReplicaReadMixin); the index is written on the primary
+    return connections[router.db_for_read(Post)]
+
+
+class SearchResults:
+    """
+    Lazy, sliceable list of ranked hits so DRF's paginator can page through it.
+    Only the requested page is fetched, then its posts/comments are loaded in bulk.
+    Each item is a (kind, instance, rank) tuple, best match first.
+    """
+
+    def __init__(self, query, user, kind=None):
+        self.terms = parse_terms(query)
+        self.user_id = user.id
+        self.kinds = [kind] if kind in SEARCH_KINDS else list(SEARCH_KINDS)
+        self._count = None
+
+    def count(self):
+        if self._count is None:
+            self._count = self._fetch_count() if self.terms else 0
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        if not self.terms:
+            return []
+        offset = index.start or 0
+        limit = (index.stop - offset) if index.stop is not None else self.count() - offset
+        return self._load(self._fetch_hits(offset, max(limit, 0)))
+
+    # SQLite FTS5 / Postgres tsvector backends
+    def _fetch_count(self):
+        if uses_tsvector():
+            return self._tsvector_queryset().count()
+        sql, params = self._fts5_where()
+        with read_connection().cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {SEARCH_TABLE} WHERE {sql}", params)
+            return cursor.fetchone()[0]
+
+    def _fetch_hits(self, offset, limit):
+        if uses_tsvector():
+            qs = self._tsvector_queryset()[offset:offset + limit]
+            return [(row["kind"], row["id"], row["rank"]) for row in qs]
+
+        sql, params = self._fts5_where()
+        weights = ", ".join(str(weight) for weight in BM25_WEIGHTS)
+        with read_connection().cursor() as cursor:
+            cursor.execute(
+                f"SELECT kind, object_id, bm25({SEARCH_TABLE}, {weights}) AS rank "
+                f"FROM {SEARCH_TABLE} WHERE {sql} ORDER BY rank LIMIT %s OFFSET %s",
+                params + [limit, offset],
+            )
+            # bm25 is "lower is better"; flip it so higher rank means more relevant
+            return [(kind, int(object_id), -rank) for kind, object_id, rank in cursor.fetchall()]
+
+    def _fts5_where(self):
+        placeholders = ", ".join(["%s"] * len(self.kinds))
+        sql = (
+            f"{SEARCH_TABLE} MATCH %s AND kind IN ({placeholders}) "
+            "AND (privacy = 'public' OR owner_id = %s)"
+        )
+        return sql, [build_fts5_query(self.terms), *self.kinds, self.user_id]
+
+    def _tsvector_queryset(self):
+        from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+        from django.db.models import Value, CharField
+        from .visibility import visible_to
+
+        query = SearchQuery(build_tsquery(self.terms), search_type="raw")
+        querysets = []
+
+        if "post" in self.kinds:
+            vector = (
+                SearchVector("title", weight="A")
+                + SearchVector("author__username", weight="B")
+                + SearchVector("content", weight="C")
+            )
+            querysets.append(
+                Post.objects.annotate(search=vector)
+                .filter(visible_to(self.user_id), search=query)
+                .annotate(kind=Value("post", output_field=CharField()), rank=SearchRank(vector, query))
+                .values("kind", "id", "rank")
+            )
+        if "comment" in self.kinds:
+            vector = SearchVector("author__username", weight="B") + SearchVector("content", weight="C")
+            querysets.append(
+                Comment.objects.annotate(search=vector)
+                .filter(visible_to(self.user_id, "post__"), search=query)
+                .annotate(kind=Value("comment", output_field=CharField()), rank=SearchRank(vector, query))
+                .values("kind", "id", "rank")
+            )
+
+        combined = querysets[0]
+        if len(querysets) > 1:
+            combined = combined.union(*querysets[1:], all=True)
+        return combined.order_by("-rank", "id")
+
+    def _load(self, hits):
+        post_ids = [object_id for kind, object_id, rank in hits if kind == "post"]
+        comment_ids = [object_id for kind, object_id, rank in hits if kind == "comment"]
+
+        objects = {}
+        if post_ids:
+            posts = Post.objects.filter(id__in=post_ids).select_related("author") \
+                .prefetch_related("comments__author", "comments__likes", "likes")
+            objects.update({("post", post.id): post for post in posts})
+        if comment_ids:
+            comments = Comment.objects.filter(id__in=comment_ids).select_related("author") \
+                .prefetch_related("likes")
+            objects.update({("comment", comment.id): comment for comment in comments})
+
+        # Keep the ranking order; skip hits whose row vanished since the index was written
+        return [
+            (kind, objects[(kind, object_id)], rank)
+            for kind, object_id, rank in hits
+            if (kind, object_id) in objects
+        ]
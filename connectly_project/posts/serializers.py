@@ -1,10 +1,79 @@
-from rest_framework import serializers
-from .models import Post, Comment, Like, Follow
+from rest_framework import permissions, serializers
+from .models import Post, Comment, Like, Follow, PurgeJob
 from django.contrib.auth.models import User
 from django.contrib.auth.hashers import make_password
-
-
-class UserSerializer(serializers.ModelSerializer):
+from django.db.models import Count, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
+
+
+# ------------------- SPARSE FIELDSETS ----------------------
+def parse_field_list(value):
+    return {name.strip() for name in value.split(",") if name.strip()} if value else set()
+
+
+def count_subquery(model, field):
+    """
+    Counts the model's rows pointing at the outer row, as an annotation (no per-row queries).
+    """
+    counts = model.objects.filter(**{field: OuterRef("pk")}).order_by() \
+        .values(field).annotate(total=Count("pk")).values("total")
+    return Coalesce(Subquery(counts), 0)
+
+
+class SparseFieldsMixin:
+    """
+    Lets GET requests pick the fields they need:
+      - ?fields=id,title,like_count  renders only those fields
+      - ?expand=comments             adds an expandable field to a ?fields= selection
+    Without ?fields= every field is rendered, as before. Unknown names are ignored.
+
+    prepare_queryset() narrows a queryset to what will be rendered: only the needed
+    columns, and joins/prefetches/counts only for the requested relations.
+    """
+    expandable_fields = ()
+    related_columns = {}  # Serializer field -> related column it reads, e.g. author -> author__username
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        selected = self.selected_fields(self.context.get("request"))
+        if selected is not None:
+            for name in set(self.fields) - selected:
+                self.fields.pop(name)
+
+    @classmethod
+    def selected_fields(cls, request):
+        """
+        Names of the fields requested with ?fields=/?expand=, or None for all of them.
+        """
+        if request is None or request.method not in permissions.SAFE_METHODS:
+            return None
+        params = getattr(request, "query_params", request.GET)
+        fields = parse_field_list(params.get("fields"))
+        if not fields:
+            return None
+        return fields | (parse_field_list(params.get("expand")) & set(cls.expandable_fields))
+
+    @classmethod
+    def wanted_fields(cls, request):
+        selected = cls.selected_fields(request)
+        fields = set(cls.Meta.fields)
+        return fields if selected is None else fields & selected
+
+    @classmethod
+    def columns_for(cls, wanted):
+        model = cls.Meta.model
+        concrete = {field.name for field in model._meta.concrete_fields}
+        columns = {model._meta.pk.name} | (wanted & concrete)
+        columns.update(column for name, column in cls.related_columns.items() if name in wanted)
+        return columns
+
+    @classmethod
+    def prepare_queryset(cls, queryset, request):
+        return queryset.only(*cls.columns_for(cls.wanted_fields(request)))
+
+
+
+class UserSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     password = serializers.CharField(write_only=True)
     profile_photo = serializers.CharField(source="profile.profile_photo", read_only=True)
 
@@ -28,36 +97,69 @@ class UserSerializer(serializers.ModelSerializer):
         return obj.profile.profile_photo if hasattr(obj, 'profile') else None
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     author = serializers.ReadOnlyField(source='author.username')
     post = serializers.PrimaryKeyRelatedField(queryset=Post.objects.all())
     like_count = serializers.SerializerMethodField()
+    related_columns = {'author': 'author__username'}
 
     class Meta:
         model = Comment
         fields = ['id', 'content', 'comment_type', 'metadata', 'image', 'video', 'author', 'post', 'created_at', 'like_count']
 
+    @classmethod
+    def prepare_queryset(cls, queryset, request):
+        wanted = cls.wanted_fields(request)
+        queryset = queryset.only(*cls.columns_for(wanted))
+        if 'author' in wanted:
+            queryset = queryset.select_related('author')
+        if 'like_count' in wanted:
+            queryset = queryset.annotate(like_count_value=count_subquery(Like, 'comment'))
+        return queryset
+
     def get_like_count(self, obj):
-        return obj.like_count()
+        # Annotated by prepare_queryset(), otherwise one query per comment
+        counted = getattr(obj, 'like_count_value', None)
+        return obj.like_count() if counted is None else counted
 
 
 
-class PostSerializer(serializers.ModelSerializer):
+class PostSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     comments = CommentSerializer(many=True, read_only=True)
     author = serializers.ReadOnlyField(source='author.username')
     like_count = serializers.SerializerMethodField()
     comment_count = serializers.SerializerMethodField()
+    expandable_fields = ('comments',)
+    related_columns = {'author': 'author__username'}
 
     class Meta:
         model = Post
         fields = ['id', 'title', 'content', 'post_type', 'metadata', 'image', 'video',
                   'author', 'created_at', 'comments', 'like_count', 'comment_count', 'privacy']
 
+    @classmethod
+    def prepare_queryset(cls, queryset, request):
+        wanted = cls.wanted_fields(request)
+        queryset = queryset.only(*cls.columns_for(wanted))
+        if 'author' in wanted:
+            queryset = queryset.select_related('author')
+        if 'comments' in wanted:
+            # Nested comments always render in full
+            comments = CommentSerializer.prepare_queryset(Comment.objects.all(), None)
+            queryset = queryset.prefetch_related(Prefetch('comments', queryset=comments))
+        if 'like_count' in wanted:
+            queryset = queryset.annotate(like_count_value=count_subquery(Like, 'post'))
+        if 'comment_count' in wanted:
+            queryset = queryset.annotate(comment_count_value=count_subquery(Comment, 'post'))
+        return queryset
+
     def get_like_count(self, obj):
-        return obj.like_count()
+        counted = getattr(obj, 'like_count_value', None)
+        return obj.like_count() if counted is None else counted
 
     def get_comment_count(self, obj):
-        return obj.comment_count()
+        counted = getattr(obj, 'comment_count_value', None)
+        return obj.comment_count() if counted is None else counted
 
 class LikeSerializer(serializers.ModelSerializer):
     class Meta:
@@ -69,6 +171,12 @@ class FollowSerializer(serializers.ModelSerializer):
         model = Follow
         fields = ['id', 'follower', 'following', 'created_at']
 
+class PurgeJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PurgeJob
+        fields = ['id', 'kind', 'target_id', 'status', 'step', 'deleted_rows', 'deleted_files', 'last_error',
+                  'created_at', 'started_at', 'finished_at']
+
 class UploadPhotoSerializer(serializers.Serializer):
     photo = serializers.ImageField()
 
@@ -0,0 +1,140 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save, post_delete
+from django.db import transaction
+from django.dispatch import receiver
+from django.test.signals import setting_changed
+
+from .models import Post, Comment, Like, Follow
+from . import realtime, search, trending
+from .authentication import invalidate_user_state
+from .versions import bump_versions
+from singletons.config_manager import ConfigManager
+
+
+# -------------------- SEARCH INDEX SYNC --------------------
+@receiver(post_save, sender=Post)
+def index_saved_post(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    # A brand new post has no comments to refresh yet
+    search.index_post(instance, with_comments=not created)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_deleted_post(sender, instance, **kwargs):
+    search.remove_from_index("post", instance.id)
+
+
+@receiver(post_save, sender=Comment)
+def index_saved_comment(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    search.index_comment(instance)
+
+
+@receiver(post_delete, sender=Comment)
+def unindex_deleted_comment(sender, instance, **kwargs):
+    search.remove_from_index("comment", instance.id)
+
+
+# -------------------- AUTH USER STATE --------------------
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def drop_cached_user_state(sender, instance, **kwargs):
+    # Deactivation or is_staff changes must not wait for the cache TTL
+    invalidate_user_state(instance.id)
+
+
+# -------------------- RUNTIME CONFIG --------------------
+@receiver(setting_changed)
+def reload_runtime_config(sender, setting, **kwargs):
+    # Lets override_settings(CONNECTLY_CONFIG=...) reach ConfigManager
+    if setting in ("CONNECTLY_CONFIG", "CONNECTLY_CONFIG_FILE"):
+        ConfigManager().reload()
+
+
+# -------------------- RESOURCE VERSIONS (ETags) --------------------
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def bump_post_versions(sender, instance, **kwargs):
+    bump_versions("posts", f"post_{instance.id}")
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def bump_comment_versions(sender, instance, **kwargs):
+    bump_versions("posts", f"post_{instance.post_id}", "comments", f"comment_{instance.id}")
+
+
+@receiver(post_save, sender=Like)
+@receiver(post_delete, sender=Like)
+def bump_like_versions(sender, instance, **kwargs):
+    if instance.comment_id:
+        comment_post_id = Comment.objects.filter(id=instance.comment_id).values_list("post_id", flat=True).first()
+        bump_versions("posts", f"post_{comment_post_id}", "comments", f"comment_{instance.comment_id}")
+    else:
+        bump_versions("posts", f"post_{instance.post_id}")
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def bump_follow_versions(sender, instance, **kwargs):
+    bump_versions(f"follows_{instance.follower_id}")
+
+
+# -------------------- TRENDING SCORES --------------------
+@receiver(post_save, sender=Like)
+def score_like(sender, instance, created, raw=False, **kwargs):
+    if created and not raw and instance.post_id:
+        trending.record_event(instance.post_id, trending.like_weight(), at=instance.created_at.timestamp())
+
+
+@receiver(post_delete, sender=Like)
+def unscore_like(sender, instance, **kwargs):
+    if instance.post_id:
+        trending.record_event(instance.post_id, -trending.like_weight(), at=instance.created_at.timestamp())
+
+
+@receiver(post_save, sender=Comment)
+def score_comment(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        trending.record_event(instance.post_id, trending.comment_weight(), at=instance.created_at.timestamp())
+
+
+@receiver(post_delete, sender=Comment)
+def unscore_comment(sender, instance, **kwargs):
+    trending.record_event(instance.post_id, -trending.comment_weight(), at=instance.created_at.timestamp())
+
+
+# -------------------- REAL-TIME PUSH (/events/) --------------------
+def post_author_id(post_id):
+    return Post.objects.filter(id=post_id).values_list("author_id", flat=True).first()
+
+
+@receiver(post_save, sender=Post)
+def push_new_post(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        transaction.on_commit(lambda: realtime.post_created(instance))
+
+
+@receiver(post_save, sender=Like)
+def push_new_like(sender, instance, created, raw=False, **kwargs):
+    if created and not raw and instance.post_id:
+        transaction.on_commit(lambda: realtime.post_liked(instance, post_author_id(instance.post_id)))
+
+
+@receiver(post_save, sender=Comment)
+def push_new_comment(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        transaction.on_commit(lambda: realtime.comment_created(instance, post_author_id(instance.post_id)))
+
+
+@receiver(post_save, sender=Follow)
+def push_follow(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        transaction.on_commit(lambda: realtime.follow_changed(instance, followed=True))
+
+
+@receiver(post_delete, sender=Follow)
+def push_unfollow(sender, instance, **kwargs):
+    transaction.on_commit(lambda: realtime.follow_changed(instance, followed=False))
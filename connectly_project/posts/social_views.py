@@ -0,0 +1,11 @@
+from dj_rest_auth.registration.views import SocialLoginView
+from allauth.socialaccount.providers.google.views import GoogleOAuth2Adapter
+
+# ------------------- GOOGLE OAUTH ----------------------
+# Kept out of posts/views.py: dj_rest_auth's registration views and the allauth adapter
+# are slow to import and only this endpoint needs them. The URLconf loads this module on
+# the first request to /auth/google/ (see posts/lazy_views.py).
+
+
+class GoogleLogin(SocialLoginView):
+    adapter_class = GoogleOAuth2Adapter
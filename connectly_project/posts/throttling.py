@@ -0,0 +1,151 @@
+import math
+import threading
+import time
+
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+
+from singletons.config_manager import ConfigManager
+from singletons.logger_singleton import LoggerSingleton
+
+logger = LoggerSingleton().get_logger()
+
+# ------------------- RATE LIMITING ----------------------
+# Sliding window counter: one counter per (scope, client, window) in the shared cache.
+# The count of the previous window is weighted by how much of it still overlaps the
+# sliding window, which approximates a true sliding log with two cache operations:
+#   estimated = previous * (1 - elapsed / window) + current
+# Limits come from ConfigManager: RATE_LIMIT for the per-user scope, RATE_LIMIT_SCOPES
+# for per-endpoint scopes (a view's throttle_scope), both per RATE_LIMIT_WINDOW seconds;
+# ENABLE_RATE_LIMIT switches all of it off.
+
+
+class LocalCounters:
+    """
+    In-process fallback used when the shared cache is unavailable.
+    Limits then apply per worker process instead of globally.
+    """
+
+    def __init__(self):
+        self._counts = {}
+        self._lock = threading.Lock()
+        self._window_index = None
+
+    def get(self, key):
+        return self._counts.get(key, 0)
+
+    def incr(self, key, window_index):
+        with self._lock:
+            if window_index != self._window_index:
+                # Only the current and previous windows are ever read
+                self._counts = {k: v for k, v in self._counts.items() if k[1] >= window_index - 1}
+                self._window_index = window_index
+            self._counts[key] = self._counts.get(key, 0) + 1
+            return self._counts[key]
+
+
+local_counters = LocalCounters()
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """
+    Base class; subclasses decide the scope and the limit.
+    """
+    cache_format = "ratelimit_{scope}_{ident}_{window}"
+
+    def get_scope(self, view):
+        raise NotImplementedError
+
+    def get_limit(self, scope):
+        raise NotImplementedError
+
+    def get_client_ident(self, request):
+        user = request.user
+        if user and user.is_authenticated:
+            return f"user{user.id}"
+        return f"ip{self.get_ident(request)}"
+
+    def allow_request(self, request, view):
+        if not ConfigManager().get_setting("ENABLE_RATE_LIMIT"):
+            return True
+        scope = self.get_scope(view)
+        if scope is None:
+            return True
+        limit = self.get_limit(scope)
+        if not limit:
+            return True
+
+        window = ConfigManager().get_setting("RATE_LIMIT_WINDOW") or 60
+        now = time.time()
+        window_index = int(now // window)
+        ident = self.get_client_ident(request)
+
+        current, previous = self.count_request(scope, ident, window_index, window)
+
+        elapsed = (now % window) / window
+        estimated = previous * (1 - elapsed) + current
+        if estimated <= limit:
+            return True
+
+        self.wait_seconds = self.compute_wait(limit, current, previous, elapsed, window)
+        logger.info(f"Rate limited: scope={scope} client={ident} ({estimated:.0f}/{limit} per {window}s)")
+        return False
+
+    def count_request(self, scope, ident, window_index, window):
+        """
+        Atomically counts this request and returns (current window count, previous window count).
+        """
+        current_key = self.cache_format.format(scope=scope, ident=ident, window=window_index)
+        previous_key = self.cache_format.format(scope=scope, ident=ident, window=window_index - 1)
+        try:
+            try:
+                current = cache.incr(current_key)
+            except ValueError:
+                # First request of this window; add() loses the race if another worker got there first
+                if cache.add(current_key, 1, timeout=window * 2):
+                    current = 1
+                else:
+                    current = cache.incr(current_key)
+            previous = cache.get(previous_key, 0)
+        except Exception:
+            current = local_counters.incr((scope + ident, window_index), window_index)
+            previous = local_counters.get((scope + ident, window_index - 1))
+        return current, previous
+
+    @staticmethod
+    def compute_wait(limit, current, previous, elapsed, window):
+        if current >= limit or not previous:
+            # Only the next window resets the current count
+            return math.ceil((1 - elapsed) * window)
+        # Wait until enough of the previous window has slid out
+        allowed_weight = (limit - current) / previous
+        return max(math.ceil(((1 - allowed_weight) - elapsed) * window), 1)
+
+    def wait(self):
+        return getattr(self, "wait_seconds", None)
+
+
+class UserRateLimit(SlidingWindowThrottle):
+    """
+    Overall limit per user (or per IP for anonymous requests), across every endpoint.
+    """
+
+    def get_scope(self, view):
+        return "user"
+
+    def get_limit(self, scope):
+        return ConfigManager().get_setting("RATE_LIMIT")
+
+
+class EndpointRateLimit(SlidingWindowThrottle):
+    """
+    Per-endpoint limit for views that set throttle_scope (e.g. 'feed', 'likes').
+    """
+
+    def get_scope(self, view):
+        return getattr(view, "throttle_scope", None)
+
+    def get_limit(self, scope):
+        config = ConfigManager()
+        scopes = config.get_setting("RATE_LIMIT_SCOPES") or {}
+        return scopes.get(scope, config.get_setting("RATE_LIMIT"))
@@ -0,0 +1,137 @@
+import math
+import time
+from datetime import datetime, timedelta, timezone
+
+from django.db import transaction
+
+from singletons.config_manager import ConfigManager
+from .models import Comment, Like, Post, PostScore
+
+# ------------------- TRENDING SCORES ----------------------
+# A post's score is the sum of its likes and comments, each worth its weight halved every
+# TRENDING_HALF_LIFE_HOURS. Instead of decaying every stored score as time passes, each
+# event is scaled *up* by how far after a fixed epoch it happened:
+#   score = sum(weight * 2 ** ((event_time - EPOCH) / half_life))
+# Scaling every score by the same factor does not change their order, so the stored
+# scores can be sorted as they are (an index scan) and an event only touches its own post.
+# Scores are stored as log2(score) so they grow linearly with time instead of overflowing.
+# compact_trending drops posts whose score has decayed to nothing (see compact()).
+EPOCH = 1_700_000_000  # Fixed reference time (2023-11-14), never change it without rebuild()
+MIN_SCORE = 0.05  # Current decayed score below which a post is no longer trending
+
+
+def half_life_seconds():
+    return ConfigManager().get_setting("TRENDING_HALF_LIFE_HOURS") * 3600
+
+
+def event_exponent(at=None):
+    """
+    log2 of the scale factor for an event happening at `at` (a unix timestamp, default now).
+    """
+    at = time.time() if at is None else at
+    return (at - EPOCH) / half_life_seconds()
+
+
+def log2_add(a, b):
+    """
+    log2(2**a + 2**b) without leaving log space.
+    """
+    high, low = max(a, b), min(a, b)
+    return high + math.log2(1 + 2 ** (low - high))
+
+
+def log2_sub(a, b):
+    """
+    log2(2**a - 2**b), or None when the result would not be positive.
+    """
+    if b >= a:
+        return None
+    return a + math.log2(1 - 2 ** (b - a))
+
+
+def current_score(hot, now=None):
+    """
+    The decayed score as of now, e.g. 3.0 for three fresh likes.
+    """
+    return 2 ** (hot - event_exponent(now))
+
+
+def record_event(post_id, weight, at=None):
+    """
+    Adds an event's contribution to the post's score. Removing an event (an unlike, a
+    deleted comment) passes a negative weight and the time the event originally happened.
+    """
+    if not weight:
+        return
+    delta = math.log2(abs(weight)) + event_exponent(at)
+    with transaction.atomic():
+        score = PostScore.objects.select_for_update().filter(post_id=post_id).first()
+        if score is None:
+            if weight < 0:
+                return
+            score, created = PostScore.objects.get_or_create(post_id=post_id, defaults={"hot": delta})
+            if created:
+                return
+            # Another request scored the post first
+            score = PostScore.objects.select_for_update().get(post_id=post_id)
+
+        hot = log2_add(score.hot, delta) if weight > 0 else log2_sub(score.hot, delta)
+        if hot is None:
+            score.delete()
+        else:
+            score.hot = hot
+            score.save(update_fields=["hot", "updated_at"])
+
+
+def like_weight():
+    return ConfigManager().get_setting("TRENDING_LIKE_WEIGHT")
+
+
+def comment_weight():
+    return ConfigManager().get_setting("TRENDING_COMMENT_WEIGHT")
+
+
+def trending_posts():
+    """
+    Public posts with a score, hottest first.
+    """
+    return Post.objects.filter(privacy='public', score__isnull=False).order_by('-score__hot', '-id')
+
+
+# ------------------- MAINTENANCE ----------------------
+def compact(min_score=MIN_SCORE, now=None):
+    """
+    Deletes the scores of posts that have decayed below min_score. Returns how many went.
+    """
+    threshold = math.log2(min_score) + event_exponent(now)
+    return PostScore.objects.filter(hot__lt=threshold).delete()[0]
+
+
+def rebuild(since_hours=None, now=None):
+    """
+    Recomputes every score from the stored likes and comments, e.g. after changing the
+    weights or half-life. Only events from the last since_hours count (default: 10 half-lives).
+    Returns the number of scored posts.
+    """
+    now = time.time() if now is None else now
+    since_hours = since_hours or ConfigManager().get_setting("TRENDING_HALF_LIFE_HOURS") * 10
+    since = datetime.fromtimestamp(now, tz=timezone.utc) - timedelta(hours=since_hours)
+
+    scores = {}
+    events = [
+        (Like.objects.filter(post__isnull=False, created_at__gte=since).values_list('post_id', 'created_at'),
+         like_weight()),
+        (Comment.objects.filter(created_at__gte=since).values_list('post_id', 'created_at'), comment_weight()),
+    ]
+    for rows, weight in events:
+        for post_id, created_at in rows.iterator():
+            delta = math.log2(weight) + event_exponent(created_at.timestamp())
+            scores[post_id] = delta if post_id not in scores else log2_add(scores[post_id], delta)
+
+    with transaction.atomic():
+        PostScore.objects.all().delete()
+        PostScore.objects.bulk_create(
+            [PostScore(post_id=post_id, hot=hot) for post_id, hot in scores.items()], batch_size=1000
+        )
+    return len(scores)
+
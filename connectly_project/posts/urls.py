@@ -5,12 +5,14 @@ from .views import (
     CommentListCreate, CommentRetrieveUpdateDestroy, LikeCommentView,
     UserPostCommentsList, UserPostCommentDetail, UserAllCommentsList,
     PostAllCommentsList, PostCommentDetail, AllCommentsList,
-    UserPostList, UserSpecificPost, FollowUserView, UserFollowersView, AllUsersFollowersView
+    UserPostList, UserSpecificPost, FollowUserView, UserFollowersView, AllUsersFollowersView,
+    TrendingPostsView, PostBatchView, UserBatchView, PurgeJobView
 )
 
 urlpatterns = [
     # -------------------- USER ENDPOINTS --------------------
     path('users/', UserListView.as_view(), name='user-list'),  # ✅ View-Only for Authenticated Users
+    path('users/batch/', UserBatchView.as_view(), name='user-batch'),  # Several users by ?ids=
     path('users/create/', UserCreateView.as_view(), name='user-create'),  # ✅ Admin-Only for Creating Users
     path('users/<int:pk>/', UserRetrieveUpdateDestroy.as_view(), name='user-retrieve-update-destroy'),
 
@@ -18,6 +20,9 @@ urlpatterns = [
     path('', PostListCreate.as_view(), name='post-list-create'),
     path('<int:pk>/', PostRetrieveUpdateDestroy.as_view(), name='post-retrieve-update-destroy'),
     path('<int:pk>/like/', LikePostView.as_view(), name='post-like'),
+    path('batch/', PostBatchView.as_view(), name='post-batch'),  # Several posts by ?ids=
+    path('trending/', TrendingPostsView.as_view(), name='post-trending'),
+    path('purge-jobs/<int:pk>/', PurgeJobView.as_view(), name='purge-job'),  # Progress of a delete
 
     # -------------------- COMMENT ENDPOINTS --------------------
     path('comments/', CommentListCreate.as_view(), name='comment-list-create'),
@@ -0,0 +1,121 @@
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from singletons.config_manager import ConfigManager
+
+# ------------------- RESOURCE VERSIONS ----------------------
+# Each cacheable resource has a version in the cache, replaced whenever the resource
+# changes (posts/signals.py). ETag and Last-Modified are derived from these versions,
+# so answering a conditional GET costs one cache read and no queries.
+#
+# A version is the time of the change in nanoseconds rather than a counter: after a
+# cache eviction a counter would restart and could hand out an old ETag again.
+#
+#   posts             any post, comment or like changed (post lists, feeds)
+#   post_<id>         the post, its comments or its likes changed (post detail)
+#   comments          any comment or comment like changed (comment list)
+#   comment_<id>      the comment or its likes changed (comment detail)
+#   follows_<user>    the user followed or unfollowed someone (their feed)
+#
+# Versions expire after CACHE_TIMEOUT, like the responses they validate. With a per-process
+# cache (the default LocMemCache) a bump in one worker is not seen by the others, so that
+# is how long another worker can keep answering 304 for a changed resource. An expired
+# version starts again at the current time, which only costs clients one full response.
+VERSION_CACHE_KEY = "version_{}"
+
+
+def new_version():
+    return time.time_ns()
+
+
+def version_timeout():
+    return ConfigManager().get_setting("CACHE_TIMEOUT")
+
+
+def get_versions(*names):
+    keys = [VERSION_CACHE_KEY.format(name) for name in names]
+    versions = cache.get_many(keys)
+    missing = {key: new_version() for key in keys if key not in versions}
+    if missing:
+        # Unknown (or evicted) versions start now; add() keeps one another worker just set
+        for key, version in missing.items():
+            cache.add(key, version, timeout=version_timeout())
+        versions.update(cache.get_many(list(missing)))
+    return [versions.get(key, missing.get(key)) for key in keys]
+
+
+async def aget_versions(*names):
+    keys = [VERSION_CACHE_KEY.format(name) for name in names]
+    versions = await cache.aget_many(keys)
+    missing = {key: new_version() for key in keys if key not in versions}
+    if missing:
+        for key, version in missing.items():
+            await cache.aadd(key, version, timeout=version_timeout())
+        versions.update(await cache.aget_many(list(missing)))
+    return [versions.get(key, missing.get(key)) for key in keys]
+
+
+def bump_versions(*names):
+    version = new_version()
+    cache.set_many({VERSION_CACHE_KEY.format(name): version for name in names}, timeout=version_timeout())
+
+
+# ------------------- VALIDATORS ----------------------
+def build_validators(versions, *extra):
+    """
+    Returns (etag, last_modified) for a response built from the given versions.
+    extra is anything else the body depends on (e.g. the requesting user).
+
+    Last-Modified has whole seconds, so it is None until the second of the newest version
+    has passed: a change later in that same second would get the same date and clients
+    sending only If-Modified-Since would be told their copy is current.
+    """
+    digest = hashlib.md5(repr((versions, extra)).encode(), usedforsecurity=False).hexdigest()
+    last_modified = -(-max(versions) // 1_000_000_000)  # Rounded up
+    if last_modified >= time.time():
+        last_modified = None
+    # Weak: the same content may be sent gzipped or not
+    return f'W/"{digest}"', last_modified
+
+
+def not_modified_response(request, etag, last_modified):
+    """
+    HttpResponseNotModified if the client's copy is current, else None.
+    """
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None and response.status_code == 304:
+        response["ETag"] = etag
+    return response
+
+
+def set_validators(response, etag, last_modified):
+    if response.status_code == 200:
+        response["ETag"] = etag
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified)
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    Adds ETag/Last-Modified to GET responses and answers If-None-Match /
+    If-Modified-Since with 304 before the view does any work.
+    Views return the version names their response depends on from get_version_names().
+    """
+
+    def get_version_names(self, request, *args, **kwargs):
+        raise NotImplementedError
+
+    def get(self, request, *args, **kwargs):
+        names = self.get_version_names(request, *args, **kwargs)
+        etag, last_modified = build_validators(get_versions(*names), request.user.id)
+
+        not_modified = not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        return set_validators(super().get(request, *args, **kwargs), etag, last_modified)
@@ -1,105 +1,122 @@
 from rest_framework import generics, permissions, status, serializers
 from rest_framework.response import Response
 from django.contrib.auth.models import User
-from .models import Post, Comment, Like, Follow
-from .serializers import UserSerializer, PostSerializer, CommentSerializer, LikeSerializer, FollowSerializer, UploadPhotoSerializer
+from .models import Post, Comment, Like, Follow, ArchivedPost, ArchivedComment, PurgeJob
+from .serializers import UserSerializer, PostSerializer, CommentSerializer, LikeSerializer, FollowSerializer, UploadPhotoSerializer, PurgeJobSerializer, count_subquery
 from .permissions import IsOwnerOrAdmin, IsAdminOrReadOnly
+from .db_router import ReplicaReadMixin, primary_reads
+from .authentication import FAST_AUTHENTICATION_CLASSES
+from .search import SearchResults, SEARCH_KINDS
+from .response_cache import (
+    cache_response, canonical_url, get_cached_response, normalized_params, page_cache_key, page_number
+)
+from .versions import ConditionalGetMixin
+from .trending import trending_posts
+from .events import emit
+from .batch import get_many_cached, ordered_results, parse_ids
+from .export import EXPORT_FORMATS, aexport_stream, export_stream, parse_cursor, parse_kinds
+from .archive import archived_post_data, get_archived_post
+from .purge import soft_delete_post, soft_delete_user
+from .visibility import can_view, check_can_view, visible_post_page, visible_to
+from .event_handlers import (
+    ALL_USERS_FOLLOWERS_PAGE_KEY, COMMENT_LIST_PAGE_KEY, FEED_PAGE_KEY, POST_LIST_PAGE_KEY, PROFILE_COUNTS_KEY,
+    USER_LIST_PAGE_KEY, clear_numbered_pages, user_page_key,
+)
 from factories.post_factory import PostFactory
 from factories.comment_factory import CommentFactory
 from django.shortcuts import get_object_or_404
+from django.http import Http404, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
 from django.db.models import Prefetch, Count, Q
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
 from singletons.logger_singleton import LoggerSingleton
+from singletons.config_manager import ConfigManager
 
-# For Google OAuth
-from dj_rest_auth.registration.views import SocialLoginView
-from allauth.socialaccount.providers.google.views import GoogleOAuth2Adapter
+# For Google OAuth (GoogleLogin lives in posts/social_views.py, imported on first use)
 from rest_framework_simplejwt.tokens import RefreshToken
-from django.contrib.auth import get_user_model
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny
-import requests
+from .google_auth import fetch_google_user_info, get_or_create_social_user
 
-# For Google Drive API
-from googleapiclient.discovery import build
-from google.oauth2 import service_account
-from googleapiclient.http import MediaFileUpload
+# For Google Drive API (the client is imported on the first upload)
+from .google_drive import upload_to_google_drive
 from rest_framework.parsers import MultiPartParser, FormParser
-from rest_framework import status
-import os
-import json
-from datetime import datetime
-import tempfile
-from django.contrib.auth.hashers import make_password
 
 # For Caching
 from django.core.cache import cache
 
 # ------------------- PAGE NUMBER ----------------------
 class FeedPagination(PageNumberPagination):
-    page_size = 2  # Number of items per page
     page_size_query_param = 'page_size'
-    max_page_size = 3  # Optional: Limit max results per page
 
-# -------------------- LOGGER --------------------------
-logger = LoggerSingleton().get_logger()
-
-# ------------------- CACHING CONFIGURATION ----------------------
-CACHE_TIMEOUT = 300  # Cache timeout in seconds (5 minutes)
-
-# ------------------ GOOGLE DRIVE API -------------------------
+    @property
+    def page_size(self):
+        return ConfigManager().get_setting("FEED_PAGE_SIZE")  # Number of items per page
 
-# Load Google Drive credentials
-GOOGLE_DRIVE_CREDENTIALS = "C:/Users/STUDY MODE/Desktop/apt-api-group11/service_account.json"
-GOOGLE_DRIVE_PARENT_FOLDER_ID = os.getenv("GOOGLE_DRIVE_PARENT_FOLDER_ID")
+    @property
+    def max_page_size(self):
+        return ConfigManager().get_setting("FEED_MAX_PAGE_SIZE")  # Limit max results per page
 
-# Authenticate with Google Drive
-def authenticate_google_drive():
-    if not GOOGLE_DRIVE_CREDENTIALS:
-        raise Exception("Google Drive credentials not found")
+    # Links from the normalized query, as equivalent requests share one cached page
+    def get_next_link(self):
+        if not self.page.has_next():
+            return None
+        return replace_query_param(canonical_url(self.request), self.page_query_param, self.page.next_page_number())
 
-    # Load JSON from the file (this was the issue)
-    try:
-        with open(GOOGLE_DRIVE_CREDENTIALS, "r", encoding="utf-8") as f:
-            creds_dict = json.load(f)
-    except json.JSONDecodeError as e:
-        raise Exception(f"Error loading Google Drive credentials: {e}")
+    def get_previous_link(self):
+        if not self.page.has_previous():
+            return None
+        url, page = canonical_url(self.request), self.page.previous_page_number()
+        return remove_query_param(url, self.page_query_param) if page == 1 else \
+            replace_query_param(url, self.page_query_param, page)
 
-    creds = service_account.Credentials.from_service_account_info(creds_dict, scopes=['https://www.googleapis.com/auth/drive'])
-    return build('drive', 'v3', credentials=creds)
-
-# Upload file to Google Drive
-def upload_to_google_drive(file_obj, username):
-    drive_service = authenticate_google_drive()
-
-    # Get file extension
-    file_extension = file_obj.name.split('.')[-1]
-
-    # Generate a unique filename: username-profile-photo-YYYYMMDD-HHMMSS.ext
-    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-    new_filename = f"{username}-profile-photo-{timestamp}.{file_extension}"
+class ProfileSectionPagination(CursorPagination):
+    """
+    Cursor pagination for one section of a page that has several (e.g. the profile's
+    posts and comments), each with its own ?<section>_cursor= and ?<section>_page_size=.
+    Cursors stay cheap on deep pages, unlike page numbers which make the database skip rows.
+    """
+    ordering = ('-created_at', '-id')
+    max_page_size = 100
 
-    # Save in-memory file to a temporary file
-    with tempfile.NamedTemporaryFile(delete=False, suffix=f".{file_extension}") as temp_file:
-        for chunk in file_obj.chunks():
-            temp_file.write(chunk)
-        temp_file_path = temp_file.name
+    def __init__(self, section):
+        self.cursor_query_param = f"{section}_cursor"
+        self.page_size_query_param = f"{section}_page_size"
+        self.page_size = ConfigManager().get_setting("DEFAULT_PAGE_SIZE")
 
-    file_metadata = {
-        'name': new_filename,  # Set new filename
-        'parents': [GOOGLE_DRIVE_PARENT_FOLDER_ID]
-    }
+# -------------------- LOGGER --------------------------
+logger = LoggerSingleton().get_logger()
 
-    media = MediaFileUpload(temp_file_path, mimetype=file_obj.content_type, resumable=True)
-    file = drive_service.files().create(
-        body=file_metadata,
-        media_body=media,
-        fields="id"
-    ).execute()
+# ------------------- CACHING CONFIGURATION ----------------------
+def cache_timeout():
+    return ConfigManager().get_setting("CACHE_TIMEOUT")  # Seconds, 5 minutes by default
 
-    return f"https://drive.google.com/file/d/{file['id']}/view"
+def profile_counts(user_id):
+    """
+    The user's follower/following/post/comment counts, counted in one query and cached
+    until the event handlers drop them (posts/event_handlers.py).
+    """
+    cache_key = PROFILE_COUNTS_KEY.format(user=user_id)
+    counts = cache.get(cache_key)
+    if counts is None:
+        with primary_reads():  # Cached for every reader (posts/db_router.py)
+            counts = User.objects.filter(id=user_id).annotate(
+                followers_count=count_subquery(Follow, 'following'),
+                following_count=count_subquery(Follow, 'follower'),
+                posts_count=count_subquery(Post, 'author'),
+                comments_count=count_subquery(Comment, 'author'),
+            ).values('followers_count', 'following_count', 'posts_count', 'comments_count').first() or {}
+            if counts:
+                # Archived posts and comments still count (they may be in another database)
+                counts['posts_count'] += ArchivedPost.objects.filter(author_id=user_id).count()
+                counts['comments_count'] += ArchivedComment.objects.filter(author_id=user_id).count()
+        cache.set(cache_key, counts, cache_timeout())
+    return counts
 
 # ------------------- USER VIEWS -----------------------
 class UserCreateView(generics.CreateAPIView):
@@ -113,7 +130,7 @@ class UserRetrieveUpdateDestroy(generics.RetrieveUpdateDestroyAPIView):
     Retrieve, update, or delete a user.
     Implements caching for performance optimization.
     """
-    queryset = User.objects.all()
+    queryset = User.objects.filter(is_active=True)
     serializer_class = UserSerializer
     permission_classes = [IsAdminOrReadOnly]
 
@@ -124,11 +141,11 @@ class UserRetrieveUpdateDestroy(generics.RetrieveUpdateDestroyAPIView):
 
         if cached_user:
             logger.info(f"Cache hit: Fetching user {user_id} from cache.")
-            return User.objects.get(id=user_id)  # Ensure it's a QuerySet object
+            return get_object_or_404(self.queryset, id=user_id)  # Ensure it's a QuerySet object
 
         logger.info(f"Cache miss: Fetching user {user_id} from database.")
-        user = get_object_or_404(User, id=user_id)
-        cache.set(cache_key, UserSerializer(user).data, CACHE_TIMEOUT)  # Serialize before caching
+        user = get_object_or_404(self.queryset, id=user_id)
+        cache.set(cache_key, UserSerializer(user).data, cache_timeout())  # Serialize before caching
         logger.info(f"Cache set: Cached user {user_id}.")
         return user
 
@@ -138,20 +155,44 @@ class UserRetrieveUpdateDestroy(generics.RetrieveUpdateDestroyAPIView):
 
         # Invalidate cache on update
         cache.delete(f"user_{instance.id}")
-        cache.delete("users_list")
+        clear_numbered_pages(USER_LIST_PAGE_KEY)
+        clear_numbered_pages(ALL_USERS_FOLLOWERS_PAGE_KEY)
         logger.info(f"Cache invalidated: User {instance.id} updated.")
 
-    def perform_destroy(self, instance):
-        super().perform_destroy(instance)
+    def destroy(self, request, *args, **kwargs):
+        """
+        Deactivates the user and hides their content at once; the rows are removed by a
+        background purge job (posts/purge.py), whose progress the 202 response points to.
+        """
+        user = self.get_object()
+        with transaction.atomic():
+            job = soft_delete_user(user, request.user)
+            emit("user_deleted", deleted_user=user.id, user=request.user.id, job=job.id)
+        logger.info(f"User {user.id} deactivated, purge job {job.id} queued.")
+        return Response(PurgeJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+class UserBatchView(ReplicaReadMixin, APIView):
+    """
+    Several users by id in one request: GET /posts/users/batch/?ids=3,1,2.
+    Shares the user_<id> cache entries of UserRetrieveUpdateDestroy.
+    """
+    permission_classes = [permissions.IsAuthenticated]
 
-        # Invalidate cache on delete
-        cache.delete(f"user_{instance.id}")
-        cache.delete("users_list")
-        logger.info(f"Cache invalidated: User {instance.id} deleted.")
+    def get(self, request, *args, **kwargs):
+        ids = parse_ids(request)
+
+        def load_missing(missing):
+            logger.info(f"Cache miss: Fetching {len(missing)} users from database.")
+            return {user.id: UserSerializer(user).data
+                    for user in User.objects.filter(id__in=missing, is_active=True)}
+
+        users = get_many_cached(ids, "user_{}", load_missing, cache_timeout())
+        return Response(ordered_results(ids, users), status=status.HTTP_200_OK)
 
-class UserListView(generics.ListAPIView):
+class UserListView(ReplicaReadMixin, generics.ListAPIView):
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
+    authentication_classes = FAST_AUTHENTICATION_CLASSES
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['id']
     search_fields = ['username', 'email']
@@ -159,74 +200,107 @@ class UserListView(generics.ListAPIView):
     pagination_class = FeedPagination
 
     def get_queryset(self):
-        return User.objects.annotate(
+        return UserSerializer.prepare_queryset(User.objects.filter(is_active=True).annotate(
             followers_count=Count('followers', distinct=True),
             following_count=Count('following', distinct=True)
-        ).order_by('id')
+        ).order_by('id'), self.request)
 
     def list(self, request, *args, **kwargs):
-        cache_key = f"users_list_page_{request.query_params.get('page', 1)}"
-        cached_data = cache.get(cache_key)
+        page = page_number(request)
+        if page is None:
+            return super().list(request, *args, **kwargs)  # Answered with a 404, never cached
 
-        if cached_data:
+        cache_key = page_cache_key(USER_LIST_PAGE_KEY, page)
+        cached_response = get_cached_response(cache_key, request)
+        if cached_response:
             logger.info("Cache hit: Fetching paginated users list from cache.")
-            return Response(cached_data, status=status.HTTP_200_OK)
+            return cached_response
 
         logger.info("Cache miss: Fetching users list from database.")
-        queryset = self.get_queryset()
-        paginated_queryset = self.paginate_queryset(queryset)
-
-        response = self.get_paginated_response(UserSerializer(paginated_queryset, many=True).data)
+        with primary_reads():  # Cached for every reader (posts/db_router.py)
+            queryset = self.filter_queryset(self.get_queryset())
+            paginated_queryset = self.paginate_queryset(queryset)
+            response = self.get_paginated_response(self.get_serializer(paginated_queryset, many=True).data)
 
-        cache.set(cache_key, response.data, CACHE_TIMEOUT)
+        cache_response(cache_key, request, response.data, cache_timeout())
         logger.info("Cache set: Cached paginated users list.")
 
         return response
 
 # -------------------- POST VIEWS --------------------
-class PostListCreate(generics.ListCreateAPIView):
+class PostListCreate(ConditionalGetMixin, ReplicaReadMixin, generics.ListCreateAPIView):
     queryset = Post.objects.select_related('author') \
         .prefetch_related('comments__author', 'likes__user') \
         .order_by('-created_at')
     serializer_class = PostSerializer
     permission_classes = [permissions.IsAuthenticated]
+    authentication_classes = FAST_AUTHENTICATION_CLASSES
     pagination_class = FeedPagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['id']
     search_fields = ['title', 'content', 'author__username']
     ordering_fields = ['id', 'created_at', 'title', 'content']
 
+    def get_version_names(self, request, *args, **kwargs):
+        return ["posts"]
+
     def get_queryset(self):
         """
         Only show public posts OR private posts authored by current user.
         """
-        user = self.request.user
-        return Post.objects.filter(
-            Q(privacy='public') | Q(author=user)
-        ).order_by('-created_at')
+        return PostSerializer.prepare_queryset(Post.objects.filter(
+            visible_to(self.request.user.id)
+        ).order_by('-created_at', '-id'), self.request)
 
     def list(self, request, *args, **kwargs):
         """
-        Caches paginated post list per user per page.
+        The plain list is the shared public list merged with the user's private posts
+        (posts/visibility.py). Searched, filtered or reordered lists are cached per user.
         """
-        user_id = request.user.id
-        page_number = request.query_params.get("page", 1)
-        cache_key = f"posts_list_user_{user_id}_page_{page_number}"
-        cached_data = cache.get(cache_key)
+        params = dict(normalized_params(request))
+        if not any(param in params for param in ("search", "ordering", *self.filterset_fields)):
+            return self.shared_list(request)
+
+        user_id, page = request.user.id, page_number(request)
+        if page is None:
+            return super().list(request, *args, **kwargs)  # Answered with a 404, never cached
+
+        cache_key = user_page_key(POST_LIST_PAGE_KEY, user_id, page)
+        cached_response = get_cached_response(cache_key, request)
+        if cached_response:
+            logger.info(f"Cache hit: Returning cached posts for user {user_id} page {page}.")
+            return cached_response
+
+        logger.info(f"Cache miss: Fetching posts for user {user_id} page {page}.")
+        with primary_reads():  # Cached past this request (posts/db_router.py)
+            response = super().list(request, *args, **kwargs)
+        cache_response(cache_key, request, response.data, cache_timeout())
+        logger.info(f"Cache set: {cache_key}")
+        return response
 
-        if cached_data:
-            logger.info(f"Cache hit: Returning cached posts for user {user_id} page {page_number}.")
-            return Response(cached_data, status=status.HTTP_200_OK)
+    def shared_list(self, request):
+        page_size, page = self.paginator.get_page_size(request), page_number(request)
+        if page is None:
+            raise NotFound("Invalid page.")
+        count, results = visible_post_page(request, page, page_size, cache_timeout())
+        if page > 1 and not results:
+            raise NotFound("Invalid page.")
 
-        logger.info(f"Cache miss: Fetching posts for user {user_id} page {page_number}.")
-        response = super().list(request, *args, **kwargs)
-        cache.set(cache_key, response.data, CACHE_TIMEOUT)
-        logger.info(f"Cache set: posts_list_user_{user_id}_page_{page_number}")
-        return response
+        url = canonical_url(request)
+        page_param = self.paginator.page_query_param
+        return Response({
+            "count": count,
+            "next": replace_query_param(url, page_param, page + 1) if page * page_size < count else None,
+            "previous": None if page == 1 else (
+                remove_query_param(url, page_param) if page == 2 else replace_query_param(url, page_param, page - 1)
+            ),
+            "results": results,
+        })
 
+    @transaction.atomic
     def perform_create(self, serializer):
         """
-        Creates a new post and clears cached lists.
+        Creates a new post. Cached lists are cleared by the post_created handlers.
         """
         data = self.request.data
         try:
@@ -246,94 +320,115 @@ class PostListCreate(generics.ListCreateAPIView):
 
             post.save()
             serializer.instance = post
-
-            self.clear_all_post_page_caches()
-
-            # Also clear feed caches for all users
-            UserFeedView().clear_all_feed_page_caches()
-            
-            logger.info(f"Post created: '{post.title}' by {self.request.user.username}")
+            emit("post_created", post=post.id, user=self.request.user.id)
 
         except ValueError as e:
             logger.error(f"Post creation failed: {str(e)}")
             raise serializers.ValidationError(str(e))
 
-    def clear_all_post_page_caches(self):
-        """
-        Clear cached post pages for all users (across all page numbers).
-        """
-        logger.info("Clearing cached post list pages for all users...")
-        for user in User.objects.all():
-            user_id = user.id
-            page = 1
-            while True:
-                cache_key = f"posts_list_user_{user_id}_page_{page}"
-                if cache.get(cache_key):
-                    cache.delete(cache_key)
-                    logger.info(f"Cache deleted: {cache_key}")
-                else:
-                    break
-                page += 1
-
-class PostRetrieveUpdateDestroy(generics.RetrieveUpdateDestroyAPIView):
+class PostRetrieveUpdateDestroy(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Post.objects.all()
     serializer_class = PostSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsOwnerOrAdmin]
 
+    def get_version_names(self, request, *args, **kwargs):
+        return [f"post_{kwargs['pk']}"]
+
     def get_object(self):
         post_id = self.kwargs["pk"]
         post = get_object_or_404(Post, id=post_id)
 
         # Restrict view of private posts from others, including admin
-        if post.privacy == 'private' and post.author != self.request.user:
-            if self.request.method == 'GET':
-                raise serializers.ValidationError("You are not authorized to view this private post.")
+        if self.request.method == 'GET':
+            check_can_view(self.request.user.id, post)
 
         self.check_object_permissions(self.request, post)
         return post
 
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            return super().retrieve(request, *args, **kwargs)
+        except Http404:
+            # Old posts are moved to the archive (posts/archive.py) but stay readable
+            post = get_archived_post(kwargs["pk"])
+            if post is None:
+                raise
+            check_can_view(request.user.id, post)
+            return Response(archived_post_data(post))
+
+    @transaction.atomic
     def perform_update(self, serializer):
-        instance = self.get_object()
-        serializer.save()
+        post = serializer.save()
+        emit("post_updated", post=post.id, user=self.request.user.id)
 
-        # Invalidate detail and list caches
-        cache.delete(f"post_{instance.id}")
-        self.clear_all_post_page_caches()
+    def destroy(self, request, *args, **kwargs):
+        """
+        Hides the post and its comments at once; the rows are removed by a background
+        purge job (posts/purge.py), whose progress the 202 response points to.
+        """
+        post = self.get_object()
+        with transaction.atomic():
+            job = soft_delete_post(post, request.user)
+            emit("post_deleted", post=post.id, author=post.author_id, user=request.user.id, job=job.id)
+        return Response(PurgeJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
 
-        # Also clear feed caches for all users
-        UserFeedView().clear_all_feed_page_caches()
+class TrendingPostsView(ReplicaReadMixin, generics.ListAPIView):
+    """
+    Public posts ranked by recent likes and comments (time-decayed, see posts/trending.py).
+    """
+    serializer_class = PostSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    authentication_classes = FAST_AUTHENTICATION_CLASSES
+    throttle_scope = 'feed'
+    pagination_class = FeedPagination
 
-        logger.info(f"Cache invalidated: Post {instance.id} updated.")
+    def get_queryset(self):
+        return PostSerializer.prepare_queryset(trending_posts(), self.request)
 
-    def perform_destroy(self, instance):
-        post_id = instance.id
-        instance.delete()
+class PostBatchView(ReplicaReadMixin, APIView):
+    """
+    Several posts by id in one request: GET /posts/batch/?ids=3,1,2.
+    Private posts of other users are reported as missing, like unknown ids.
+    """
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    authentication_classes = FAST_AUTHENTICATION_CLASSES
 
-        # Invalidate detail and list caches
-        cache.delete(f"post_{post_id}")
-        self.clear_all_post_page_caches()
-
-        # Also clear feed caches for all users
-        UserFeedView().clear_all_feed_page_caches()
-
-        logger.info(f"Cache invalidated: Post {post_id} deleted.")
-
-    def clear_all_post_page_caches(self):
-        logger.info("Clearing cached post list pages for all users...")
-        for user in User.objects.all():
-            user_id = user.id
-            page = 1
-            while True:
-                cache_key = f"posts_list_user_{user_id}_page_{page}"
-                if cache.get(cache_key):
-                    cache.delete(cache_key)
-                    logger.info(f"Cache deleted: {cache_key}")
-                else:
-                    break
-                page += 1
+    def get(self, request, *args, **kwargs):
+        ids = parse_ids(request)
+
+        def load_missing(missing):
+            logger.info(f"Cache miss: Fetching {len(missing)} posts from database.")
+            posts = PostSerializer.prepare_queryset(Post.objects.filter(id__in=missing), None)
+            # Cached with what the privacy check needs; the rendered post is the same for every reader
+            return {
+                post.id: {"author_id": post.author_id, "privacy": post.privacy, "data": PostSerializer(post).data}
+                for post in posts
+            }
+
+        entries = get_many_cached(ids, "post_{}", load_missing, cache_timeout())
+        visible = {
+            post_id: entry["data"] for post_id, entry in entries.items()
+            if can_view(request.user.id, entry["privacy"], entry["author_id"])
+        }
+        return Response(ordered_results(ids, visible), status=status.HTTP_200_OK)
+
+class PurgeJobView(generics.RetrieveAPIView):
+    """
+    Progress of the purge job started by deleting a user or a post.
+    Visible to whoever requested the deletion, and to admins.
+    """
+    queryset = PurgeJob.objects.all()
+    serializer_class = PurgeJobSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_object(self):
+        job = get_object_or_404(PurgeJob, id=self.kwargs["pk"])
+        if job.requested_by_id != self.request.user.id and not self.request.user.is_staff:
+            raise Http404
+        return job
 
 # -------------------- COMMENT VIEWS --------------------
-class CommentListCreate(generics.ListCreateAPIView):
+class CommentListCreate(ConditionalGetMixin, generics.ListCreateAPIView):
     """
     Lists all comments and allows authenticated users to create new comments.
     Caching implemented to improve performance.
@@ -346,20 +441,33 @@ class CommentListCreate(generics.ListCreateAPIView):
     ordering_fields = ['id', 'created_at', 'content']
     pagination_class = FeedPagination
 
+    def get_version_names(self, request, *args, **kwargs):
+        return ["comments"]
+
     def get_queryset(self):
-        cache_key = "comments_list"
-        cached_comments = cache.get(cache_key)
+        return CommentSerializer.prepare_queryset(Comment.objects.order_by('-created_at', '-id'), self.request)
 
-        if cached_comments:
+    def list(self, request, *args, **kwargs):
+        """
+        Caches the rendered pages, one variant per set of query params.
+        """
+        page = page_number(request)
+        if page is None:
+            return super().list(request, *args, **kwargs)  # Answered with a 404, never cached
+
+        cache_key = page_cache_key(COMMENT_LIST_PAGE_KEY, page)
+        cached_response = get_cached_response(cache_key, request)
+        if cached_response:
             logger.info("Cache hit: Fetching comments from cache.")
-            return cached_comments
+            return cached_response
 
         logger.info("Cache miss: Fetching comments from database.")
-        comments = Comment.objects.all().order_by('-created_at')
-        cache.set(cache_key, comments, CACHE_TIMEOUT)
+        response = super().list(request, *args, **kwargs)
+        cache_response(cache_key, request, response.data, cache_timeout())
         logger.info("Cache set: Comments list cached.")
-        return comments
+        return response
 
+    @transaction.atomic
     def perform_create(self, serializer):
         data = self.request.POST
         files = self.request.FILES
@@ -380,39 +488,13 @@ class CommentListCreate(generics.ListCreateAPIView):
 
             comment.save()
             serializer.instance = comment
-
-            cache.delete("comments_list")
-            self.clear_related_post_cache(comment.post.id)
-
-            logger.info(f"Comment created on Post ID {comment.post.id} by {self.request.user.username}")
-            logger.info(f"Cache invalidated: Related post caches cleared for Post ID {comment.post.id}.")
+            emit("comment_created", comment=comment.id, post=comment.post_id, user=self.request.user.id)
 
         except ValueError as e:
             logger.error(f"Comment creation failed: {str(e)}")
             raise serializers.ValidationError(str(e))
 
-    def clear_related_post_cache(self, post_id):
-        """
-        Clears individual post detail cache and paginated post list caches.
-        """
-        # Clear specific post detail view
-        post_cache_key = f"post_{post_id}"
-        cache.delete(post_cache_key)
-        logger.info(f"Cache deleted: {post_cache_key}")
-
-        # Clear paginated list view caches
-        page = 1
-        while True:
-            list_cache_key = f"posts_list_page_{page}"
-            if cache.get(list_cache_key):
-                cache.delete(list_cache_key)
-                logger.info(f"Cache deleted: {list_cache_key}")
-            else:
-                break
-            page += 1
-
-        
-class CommentRetrieveUpdateDestroy(generics.RetrieveUpdateDestroyAPIView):
+class CommentRetrieveUpdateDestroy(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Retrieve, update, or delete a comment.
     Implements caching for performance optimization.
@@ -421,48 +503,23 @@ class CommentRetrieveUpdateDestroy(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = CommentSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsOwnerOrAdmin]
 
+    def get_version_names(self, request, *args, **kwargs):
+        return [f"comment_{kwargs['pk']}"]
+
     def get_object(self):
         comment_id = self.kwargs["pk"]
         return get_object_or_404(Comment, id=comment_id)
 
+    @transaction.atomic
     def perform_update(self, serializer):
-        instance = self.get_object()
-        serializer.save()
-        cache.delete(f"comment_{instance.id}")
-        cache.delete("comments_list")
-        self.clear_related_post_cache(instance.post.id)
-        logger.info(f"Comment {instance.id} updated. Cache invalidated.")
+        comment = serializer.save()
+        emit("comment_updated", comment=comment.id, post=comment.post_id, user=self.request.user.id)
 
+    @transaction.atomic
     def perform_destroy(self, instance):
-        post_id = instance.post.id
+        comment_id, post_id, author_id = instance.id, instance.post_id, instance.author_id
         instance.delete()
-
-        cache.delete(f"comment_{instance.id}")
-        cache.delete("comments_list")
-        logger.info(f"Comment {instance.id} deleted. Cache invalidated.")
-
-        self.clear_related_post_cache(post_id)
-
-    def clear_related_post_cache(self, post_id):
-        """
-        Clears post detail cache and all paginated post list caches.
-        """
-        logger.info(f"[Comment] Clearing cached post detail and list for post {post_id}...")
-
-        # Always delete the post detail cache
-        cache.delete(f"post_{post_id}")
-        logger.info(f"Cache deleted: post_{post_id}")
-
-        # Always delete all paginated post list pages (safer and cleaner)
-        page = 1
-        while True:
-            list_cache_key = f"posts_list_page_{page}"
-            if cache.get(list_cache_key):
-                cache.delete(list_cache_key)
-                logger.info(f"Cache deleted: {list_cache_key}")
-            else:
-                break
-            page += 1
+        emit("comment_deleted", comment=comment_id, post=post_id, author=author_id, user=self.request.user.id)
 
 # -------------------- COMMENT TRACKING VIEWS --------------------
 class PostCommentDetail(generics.RetrieveAPIView):
@@ -519,52 +576,35 @@ class UserSpecificPost(generics.RetrieveAPIView):
             id=self.kwargs["post_id"]
         )
 
-        # Privacy check: only the author can view private posts
-        if post.privacy == 'private' and self.request.user != post.author:
-            raise serializers.ValidationError("You are not authorized to view this private post.")
-
+        check_can_view(self.request.user.id, post)
         return post
 
-class UserPostList(generics.ListAPIView):
+class UserPostList(ReplicaReadMixin, generics.ListAPIView):
     serializer_class = PostSerializer
     permission_classes = [permissions.IsAuthenticated]
+    authentication_classes = FAST_AUTHENTICATION_CLASSES
 
     def get_queryset(self):
-        user_id = self.kwargs['user_id']
-        requesting_user = self.request.user
-
-        if requesting_user.id == int(user_id):
-            # Show all posts if the user is viewing their own posts
-            return Post.objects.filter(author_id=user_id)
-        else:
-            # Show only public posts if viewing someone else's posts
-            return Post.objects.filter(author_id=user_id, privacy='public')
+        # All of the user's own posts, only the public ones of anyone else
+        return Post.objects.filter(visible_to(self.request.user.id), author_id=self.kwargs['user_id'])
 
 # -------------------- LIKE VIEWS --------------------
 class LikePostView(generics.CreateAPIView):
     serializer_class = LikeSerializer
     permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = 'likes'
 
     def post(self, request, *args, **kwargs):
         post_id = kwargs.get("pk")
         post = get_object_or_404(Post, id=post_id)
-        like, created = Like.objects.get_or_create(user=request.user, post=post)
-
-        # Invalidate cache for individual post
-        cache.delete(f"post_{post_id}")
-        # Invalidate all paginated post list caches
-        page = 1
-        while True:
-            cache_key = f"posts_list_page_{page}"
-            if cache.get(cache_key):
-                cache.delete(cache_key)
-                logger.info(f"Cache invalidated: {cache_key}")
-            else:
-                break
-            page += 1
+
+        with transaction.atomic():
+            like, created = Like.objects.get_or_create(user=request.user, post=post)
+            if not created:
+                like.delete()
+            emit("post_liked" if created else "post_unliked", post=post.id, user=request.user.id)
 
         if not created:
-            like.delete()
             return Response({"message": "Like removed"}, status=status.HTTP_200_OK)
         
         return Response({"message": "Post liked"}, status=status.HTTP_201_CREATED)
@@ -572,48 +612,23 @@ class LikePostView(generics.CreateAPIView):
 class LikeCommentView(generics.CreateAPIView):
     serializer_class = LikeSerializer
     permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = 'likes'
 
     def post(self, request, *args, **kwargs):
         comment = get_object_or_404(Comment, id=kwargs.get("pk"))
-        post_id = comment.post.id  # Get related post ID
-
-        like, created = Like.objects.get_or_create(user=request.user, comment=comment)
-        message = "Comment liked" if created else "Like removed"
-        
-        if not created:
-            like.delete()
 
-        # Invalidate related post caches (for list + detail view)
-        self.clear_related_post_cache(post_id)
+        with transaction.atomic():
+            like, created = Like.objects.get_or_create(user=request.user, comment=comment)
+            if not created:
+                like.delete()
+            emit("comment_liked" if created else "comment_unliked",
+                 comment=comment.id, post=comment.post_id, user=request.user.id)
 
+        message = "Comment liked" if created else "Like removed"
         return Response({"message": message}, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
-
-    def clear_related_post_cache(self, post_id):
-        """
-        Clears the cache for the post detail and all post list pages.
-        """
-        logger.info(f"[LikeComment] Clearing cache for post ID {post_id}...")
-
-        # Clear the post detail cache
-        cache.delete(f"post_{post_id}")
-        logger.info(f"Cache deleted: post_{post_id}")
-
-        # Clear all post list pages (to reflect like_count on comments)
-        page = 1
-        while True:
-            cache_key = f"posts_list_page_{page}"
-            if cache.get(cache_key):
-                cache.delete(cache_key)
-                logger.info(f"Cache deleted: {cache_key}")
-            else:
-                break
-            page += 1
     
 
 # -------------------- GOOGLE OAUTH --------------------
-class GoogleLogin(SocialLoginView):
-    adapter_class = GoogleOAuth2Adapter
-
 class ConvertTokenView(APIView):
     permission_classes = [AllowAny]
 
@@ -622,26 +637,18 @@ class ConvertTokenView(APIView):
         if not access_token:
             return Response({"error": "Missing access token"}, status=400)
 
-        # Verify and get user info from Google
-        google_user_info_url = "https://www.googleapis.com/oauth2/v2/userinfo"
-        headers = {"Authorization": f"Bearer {access_token}"}
-        response = requests.get(google_user_info_url, headers=headers)
-
-        if response.status_code != 200:
+        # Verify and get user info from Google (pooled session, timeout, short-lived cache)
+        user_info = fetch_google_user_info(access_token)
+        if user_info is None:
             return Response({"error": "Invalid Google token"}, status=400)
 
-        user_info = response.json()
         email = user_info.get("email")
 
         if not email:
             return Response({"error": "Unable to fetch email from Google"}, status=400)
 
-        # Get or create user, assigning default password 'mmdc2025' if new
-        user_model = get_user_model()
-        user, created = user_model.objects.get_or_create(
-            email=email, 
-            defaults={"username": email.split("@")[0], "password": make_password("mmdc2025")}
-        )
+        # Get or create the user; social-only accounts get an unusable password
+        user, created = get_or_create_social_user(email)
 
         # Generate JWT tokens
         refresh = RefreshToken.for_user(user)
@@ -656,49 +663,37 @@ class ConvertTokenView(APIView):
 class FollowUserView(generics.CreateAPIView):
     serializer_class = FollowSerializer
     permission_classes = [permissions.IsAuthenticated]
-
-    def clear_feed_cache_for_user(self, user_id):
-        page = 1
-        while True:
-            cache_key = f"user_feed_page_{user_id}_{page}"
-            if cache.get(cache_key):
-                cache.delete(cache_key)
-                logger.info(f"Cleared feed cache: {cache_key}")
-            else:
-                break
-            page += 1
+    throttle_scope = 'follows'
 
     def post(self, request, *args, **kwargs):
         following_user = get_object_or_404(User, id=kwargs['user_id'])
         if request.user == following_user:
             return Response({"error": "You cannot follow yourself"}, status=status.HTTP_400_BAD_REQUEST)
 
-        follow, created = Follow.objects.get_or_create(follower=request.user, following=following_user)
+        with transaction.atomic():
+            follow, created = Follow.objects.get_or_create(follower=request.user, following=following_user)
+            if not created:
+                follow.delete()
+            emit("user_followed" if created else "user_unfollowed",
+                 follower=request.user.id, following=following_user.id)
 
         if not created:
-            follow.delete()
             message = "Unfollowed user"
             response_status = status.HTTP_200_OK
         else:
             message = "Followed user"
             response_status = status.HTTP_201_CREATED
 
-        cache.delete(f"user_followers_{following_user.id}")
-        cache.delete(f"user_profile_{following_user.id}")
-        cache.delete("all_users_followers")
-        logger.info("Cache invalidated: 'all_users_followers' after follow/unfollow.")
-
-        self.clear_feed_cache_for_user(request.user.id)
-
         return Response({"message": message}, status=response_status)
 
-class UserFollowersView(generics.RetrieveAPIView):
+class UserFollowersView(ReplicaReadMixin, generics.RetrieveAPIView):
     """
     Retrieves a specific user's follower count and following count.
     Allows ordering by follower count.
     """
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
+    authentication_classes = FAST_AUTHENTICATION_CLASSES
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     ordering_fields = ['followers_count', 'following_count']
 
@@ -711,10 +706,11 @@ class UserFollowersView(generics.RetrieveAPIView):
         if cached_data:
             return Response(cached_data)
 
-        # Fetch user and follower data
-        user = get_object_or_404(User, id=user_id)
-        followers_count = Follow.objects.filter(following=user).count()
-        following_count = Follow.objects.filter(follower=user).count()
+        # Fetch user and follower data, cached for every reader (posts/db_router.py)
+        with primary_reads():
+            user = get_object_or_404(User, id=user_id)
+            followers_count = Follow.objects.filter(following=user).count()
+            following_count = Follow.objects.filter(follower=user).count()
 
         response_data = {
             "user": user.username,
@@ -723,11 +719,11 @@ class UserFollowersView(generics.RetrieveAPIView):
         }
 
         # Cache the data for performance improvement
-        cache.set(cache_key, response_data, timeout=300)  # Cache for 5 minutes
+        cache.set(cache_key, response_data, timeout=cache_timeout())
 
         return Response(response_data)
 
-class AllUsersFollowersView(generics.ListAPIView):
+class AllUsersFollowersView(ReplicaReadMixin, generics.ListAPIView):
     """
     Endpoint to retrieve all users along with their follower count.
     Allows filtering by username and ordering by followers_count.
@@ -735,6 +731,7 @@ class AllUsersFollowersView(generics.ListAPIView):
     """
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
+    authentication_classes = FAST_AUTHENTICATION_CLASSES
     pagination_class = FeedPagination  # Apply pagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['id']
@@ -745,38 +742,42 @@ class AllUsersFollowersView(generics.ListAPIView):
         return User.objects.annotate(
             followers_count=Count('followers', distinct=True),
             following_count=Count('following', distinct=True)
-        )
+        ).order_by('id')
 
     def list(self, request, *args, **kwargs):
-        cache_key = "all_users_followers"
-        cached_data = cache.get(cache_key)
+        page = page_number(request)
+        if page is None:
+            return super().list(request, *args, **kwargs)  # Answered with a 404, never cached
 
-        if cached_data:
+        cache_key = page_cache_key(ALL_USERS_FOLLOWERS_PAGE_KEY, page)
+        cached_response = get_cached_response(cache_key, request)
+        if cached_response:
             logger.info("Cache hit: Fetching all users' followers from cache.")
-            return Response(cached_data, status=status.HTTP_200_OK)
+            return cached_response
 
         logger.info("Cache miss: Fetching all users' followers from database.")
-        queryset = self.get_queryset()
-        paginated_queryset = self.paginate_queryset(queryset)
-
-        data = [{
-            "id": user.id,
-            "username": user.username,
-            "email": user.email,
-            "followers_count": user.followers_count,
-            "following_count": user.following_count,
-        } for user in paginated_queryset]
+        with primary_reads():  # Cached for every reader (posts/db_router.py)
+            queryset = self.filter_queryset(self.get_queryset())
+            paginated_queryset = self.paginate_queryset(queryset)
+
+            data = [{
+                "id": user.id,
+                "username": user.username,
+                "email": user.email,
+                "followers_count": user.followers_count,
+                "following_count": user.following_count,
+            } for user in paginated_queryset]
 
         response = self.get_paginated_response(data)
 
         # Cache the paginated response for 5 minutes
-        cache.set(cache_key, response.data, timeout=CACHE_TIMEOUT)
+        cache_response(cache_key, request, response.data, cache_timeout())
         logger.info("Cache set: Cached all users' followers data.")
 
         return response
     
 # -------------------- USER FEED --------------------
-class UserFeedView(generics.ListAPIView):
+class UserFeedView(ConditionalGetMixin, ReplicaReadMixin, generics.ListAPIView):
     """
     Shows the feed with DRF pagination and per-page caching:
       - Public posts from followed users
@@ -786,15 +787,23 @@ class UserFeedView(generics.ListAPIView):
     """
     serializer_class = PostSerializer
     permission_classes = [permissions.IsAuthenticated]
+    authentication_classes = FAST_AUTHENTICATION_CLASSES
+    throttle_scope = 'feed'
     pagination_class = FeedPagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['id']
     search_fields = ['title', 'content', 'author__username']
     ordering_fields = ['id', 'created_at', 'title', 'content', 'author__username']
 
+    def get_version_names(self, request, *args, **kwargs):
+        return ["posts", f"follows_{request.user.id}"]
+
     def get_queryset(self):
-        user = self.request.user
-        followed_users = Follow.objects.filter(follower=user).values_list('following', flat=True)
+        return PostSerializer.prepare_queryset(self.feed_queryset(self.request.user), self.request)
+
+    @staticmethod
+    def feed_queryset(user):
+        followed_users = Follow.objects.filter(follower_id=user.id).values_list('following', flat=True)
 
         # Only show:
         #  - public posts by followed users
@@ -803,120 +812,157 @@ class UserFeedView(generics.ListAPIView):
         return (
             Post.objects.filter(
                 Q(author__in=followed_users, privacy='public') |
-                Q(likes__user=user, privacy='public') |
-                Q(comments__author=user, privacy='public') |
-                Q(author=user)  # includes user's private
+                Q(likes__user_id=user.id, privacy='public') |
+                Q(comments__author_id=user.id, privacy='public') |
+                Q(author_id=user.id)  # includes user's private
             )
             .distinct()
             .order_by('-created_at')
         )
 
     def list(self, request, *args, **kwargs):
-        user_id = request.user.id
-        page_number = request.query_params.get("page", 1)
-        cache_key = f"user_feed_page_{user_id}_{page_number}"
-
-        cached_data = cache.get(cache_key)
-        if cached_data is not None:
-            logger.info(f"[UserFeedView] Cache hit for user={user_id}, page={page_number}")
-            return Response(cached_data, status=status.HTTP_200_OK)
-
-        logger.info(f"[UserFeedView] Cache miss for user={user_id}, page={page_number}")
-        queryset = self.filter_queryset(self.get_queryset())
-        page = self.paginate_queryset(queryset)
+        user_id, number = request.user.id, page_number(request)
+        if number is None:
+            return super().list(request, *args, **kwargs)  # Answered with a 404, never cached
+        cache_key = user_page_key(FEED_PAGE_KEY, user_id, number)
+
+        cached_response = get_cached_response(cache_key, request)
+        if cached_response is not None:
+            logger.info(f"[UserFeedView] Cache hit for user={user_id}, page={number}")
+            return cached_response
+
+        logger.info(f"[UserFeedView] Cache miss for user={user_id}, page={number}")
+        with primary_reads():  # Cached past this request (posts/db_router.py)
+            queryset = self.filter_queryset(self.get_queryset())
+            page = self.paginate_queryset(queryset)
+            if page is not None:
+                serializer = self.get_serializer(page, many=True)
+                paginated_response = self.get_paginated_response(serializer.data)
+            else:
+                # If not enough posts to paginate, just cache minimal
+                minimal_data = self.get_serializer(queryset, many=True).data
         if page is not None:
-            serializer = self.get_serializer(page, many=True)
-            paginated_response = self.get_paginated_response(serializer.data)
-            cache.set(cache_key, paginated_response.data, CACHE_TIMEOUT)
+            cache_response(cache_key, request, paginated_response.data, cache_timeout())
             return paginated_response
 
-        # If not enough posts to paginate, just cache minimal
-        serializer = self.get_serializer(queryset, many=True)
-        minimal_data = serializer.data
-        cache.set(cache_key, minimal_data, CACHE_TIMEOUT)
+        cache_response(cache_key, request, minimal_data, cache_timeout())
         return Response(minimal_data, status=status.HTTP_200_OK)
 
-    def clear_all_feed_page_caches(self):
-        """
-        Call this to invalidate ALL feed caches for ALL users and pages.
-        Example usage in Post creation/update/deletion:
-            UserFeedView().clear_all_feed_page_caches()
-        """
-        logger.info("[UserFeedView] Clearing ALL feed page caches for every user.")
-        for user in User.objects.all():
-            user_id = user.id
-            page = 1
-            while True:
-                cache_key = f"user_feed_page_{user_id}_{page}"
-                if cache.get(cache_key):
-                    cache.delete(cache_key)
-                    logger.info(f"Cleared feed cache: {cache_key}")
-                else:
-                    break
-                page += 1
+# -------------------- SEARCH --------------------
+class SearchView(ReplicaReadMixin, generics.ListAPIView):
+    """
+    Full-text search over posts and comments, best match first.
+      - ?q=       search terms, all must match; end a term with * for a prefix match (e.g. djan*)
+      - ?type=    optional, 'post' or 'comment' to search only one kind
+    Private posts (and their comments) only show up for their author.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    authentication_classes = FAST_AUTHENTICATION_CLASSES
+    throttle_scope = 'search'
+    pagination_class = FeedPagination
+
+    def get_queryset(self):
+        query = self.request.query_params.get("q", "")
+        kind = self.request.query_params.get("type")
+        return SearchResults(query, self.request.user, kind=kind)
+
+    def list(self, request, *args, **kwargs):
+        if not ConfigManager().get_setting("ENABLE_SEARCH"):
+            return Response({"error": "Search is disabled."}, status=status.HTTP_404_NOT_FOUND)
+
+        if not request.query_params.get("q", "").strip():
+            return Response({"error": "Missing search query 'q'."}, status=status.HTTP_400_BAD_REQUEST)
+
+        if request.query_params.get("type") not in (None, *SEARCH_KINDS):
+            return Response({"error": f"'type' must be one of: {', '.join(SEARCH_KINDS)}."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        page = self.paginate_queryset(self.get_queryset())
+        context = self.get_serializer_context()
+        results = []
+        for kind, instance, rank in page:
+            serializer_class = PostSerializer if kind == "post" else CommentSerializer
+            results.append({
+                "type": kind,
+                "rank": round(rank, 4),
+                kind: serializer_class(instance, context=context).data,
+            })
+
+        logger.info(f"Search by user {request.user.id}: '{request.query_params.get('q')}' -> {len(results)} results")
+        return self.get_paginated_response(results)
 
 # -------------------- PROFILE VIEW --------------------
-class UserProfileView(generics.RetrieveAPIView):
+class UserProfileView(generics.GenericAPIView):
     """
-    Retrieves the logged-in user's details.
-    - Paginates only the user's posts
-    - Comments are included without pagination
-    - No caching so that it always reflects real-time changes
+    Retrieves the logged-in user's details with their posts and comments as two
+    independently cursor-paginated sections (?posts_cursor=, ?comments_cursor=).
+    Counters are cached until a follow, post or comment changes them, so the whole
+    profile is answered in a fixed number of queries however active the user is.
     """
-    serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]  # <--- Enforce authentication
-    pagination_class = None  # or your custom pagination if you want paginated posts
-                             # but typically you only paginate the posts portion
-
-    def get_queryset(self):
-        # Always use the actual User model, not request.user.__class__
-        User = get_user_model()
-        return User.objects.filter(id=self.request.user.id)
 
     def get(self, request, *args, **kwargs):
-        logger.info(f"Fetching profile for user {request.user.id} with pagination (if enabled).")
-        
-        # 1. Get the user object
-        user_qs = self.get_queryset()
-        if not user_qs.exists():
-            return Response({"error": "User not found"}, status=status.HTTP_404_NOT_FOUND)
-        
-        user = user_qs.first()
-
-        # 2. (Optional) Paginate the user's posts if you want
-        posts_qs = Post.objects.filter(author=user).order_by('-created_at')
-        # If you do want pagination on the posts, do something like:
-        page = self.paginate_queryset(posts_qs)
-        if page is not None:
-            serialized_posts = PostSerializer(page, many=True).data
-        else:
-            serialized_posts = PostSerializer(posts_qs, many=True).data
+        logger.info(f"Fetching profile for user {request.user.id}.")
+        user = request.user
 
-        # 3. Get user comments (unpaginated or paginated—your choice)
-        comments_qs = Comment.objects.filter(author=user).order_by('-created_at')
-        serialized_comments = CommentSerializer(comments_qs, many=True).data
+        posts = PostSerializer.prepare_queryset(Post.objects.filter(author_id=user.id), request)
+        comments = CommentSerializer.prepare_queryset(Comment.objects.filter(author_id=user.id), request)
 
-        # 4. Construct the final profile data
         profile_data = {
             "id": user.id,
             "username": user.username,
             "email": user.email,
             "profile_photo": getattr(user, 'profile_photo', None),
-            "followers_count": user.followers.count(),
-            "following_count": user.following.count(),
-            "posts": serialized_posts,       # possibly paginated
-            "comments": serialized_comments  # unpaginated
+            **profile_counts(user.id),
+            "posts": self.paginate_section("posts", posts, PostSerializer),
+            "comments": self.paginate_section("comments", comments, CommentSerializer),
+        }
+        return Response(profile_data, status=status.HTTP_200_OK)
+
+    def paginate_section(self, section, queryset, serializer_class):
+        paginator = ProfileSectionPagination(section)
+        page = paginator.paginate_queryset(queryset, self.request, view=self)
+        return {
+            "next": paginator.get_next_link(),
+            "previous": paginator.get_previous_link(),
+            "results": serializer_class(page, many=True, context=self.get_serializer_context()).data,
         }
 
-        # 5. If pagination is on for posts, DRF will create pagination links for the "posts" portion
-        #    and you can embed them in the final response. Or you can just return the default DRF
-        #    paginated response, but that typically expects a single "results" list.
-        if page is not None:
-            # If you want a single unified response with the pagination metadata, do:
-            return self.get_paginated_response(profile_data)
-        else:
-            # If no pagination was applied, just return the data
-            return Response(profile_data, status=status.HTTP_200_OK)
+# -------------------- DATA EXPORT --------------------
+class ExportView(APIView):
+    """
+    Streams the user's posts, comments, likes and follows (posts/export.py).
+      ?output=ndjson|csv             default ndjson
+      ?kinds=posts,likes             default everything
+      ?cursor=likes:120              resume after the last row received
+      ?user=<id>                     admins only; admins export every user without it
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    throttle_scope = 'export'
+
+    def get(self, request, *args, **kwargs):
+        output = request.query_params.get("output", "ndjson")
+        if output not in EXPORT_FORMATS:
+            return Response({"error": f"output must be one of: {', '.join(EXPORT_FORMATS)}."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            kinds = parse_kinds(request.query_params.get("kinds"))
+            cursor = parse_cursor(request.query_params.get("cursor"))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        user_id = request.user.id
+        if request.user.is_staff:
+            requested = request.query_params.get("user", "")
+            user_id = int(requested) if requested.isdigit() else None
+        logger.info(f"Export by user {request.user.id}: user={user_id or 'all'}, kinds={kinds}, output={output}")
+
+        # Under ASGI a sync iterator would be buffered whole before the first byte is sent
+        stream = aexport_stream if isinstance(request._request, ASGIRequest) else export_stream
+        response = StreamingHttpResponse(stream(output, kinds, user_id=user_id, cursor=cursor),
+                                         content_type=EXPORT_FORMATS[output])
+        response["Content-Disposition"] = f'attachment; filename="connectly-export.{output}"'
+        return response
 
 # -------------------- UPLOAD PHOTO VIEW --------------------
 class UploadPhotoView(generics.CreateAPIView):
@@ -0,0 +1,138 @@
+from django.core.cache import cache
+from django.db.models import F, Q
+from rest_framework import serializers
+
+from singletons.logger_singleton import LoggerSingleton
+from .db_router import primary_reads
+from .event_handlers import POST_PAGES_FAMILY, PRIVATE_POST_PAGE_KEY, PUBLIC_POST_PAGE_KEY
+from .models import Post
+from .response_cache import generation, page_cache_key, variant_cache_key, variant_key
+from .serializers import PostSerializer
+
+logger = LoggerSingleton().get_logger()
+
+# ------------------- VISIBILITY RULES ----------------------
+# Public posts are visible to everyone, private ones only to their author (admins included).
+# Every view that shows posts, or comments through their post, checks with these helpers.
+NOT_AUTHORIZED = "You are not authorized to view this private post."
+
+
+def visible_to(user_id, prefix=""):
+    """
+    Filter for the posts user_id may see; prefix="post__" filters comments by their post.
+    """
+    return Q(**{f"{prefix}privacy": 'public'}) | Q(**{f"{prefix}author_id": user_id})
+
+
+def can_view(user_id, privacy, author_id):
+    return privacy != 'private' or author_id == user_id
+
+
+def check_can_view(user_id, post):
+    """
+    Raises ValidationError when user_id may not see post (a Post or an ArchivedPost).
+    """
+    if not can_view(user_id, post.privacy, post.author_id):
+        raise serializers.ValidationError(NOT_AUTHORIZED)
+
+
+# ------------------- SHARED POST LIST ----------------------
+# The post list used to be cached per user and page, although everyone sees the same public
+# posts. Now the public posts are cached once, in chunks of page_size (PUBLIC_POST_PAGE_KEY),
+# and each user's private posts in chunks of their own (PRIVATE_POST_PAGE_KEY). A page is the
+# two merged by (created_at, id), newest first.
+#
+# A chunk is {"count": ..., "items": [[sort key, rendered post], ...]}, cached as a variant
+# per set of query params other than ?page= (page_size, fields, ...), like the response
+# cache (posts/response_cache.py). Where a page starts in each list is found by binary
+# search, so a request loads a few chunks of each however many posts there are.
+ORDERING = ('-created_at', '-id')
+
+
+def render_entries(queryset, request, start=0, stop=None):
+    """
+    [[sort key, rendered post], ...] for queryset[start:stop] in ORDERING.
+    """
+    queryset = PostSerializer.prepare_queryset(queryset, request).annotate(sort_created=F('created_at'))
+    return [
+        [[post.sort_created.isoformat(timespec="microseconds"), post.id],
+         PostSerializer(post, context={"request": request}).data]
+        for post in queryset.order_by(*ORDERING)[start:stop]
+    ]
+
+
+class CachedChunks:
+    """
+    The rendered posts of queryset in ORDERING, read by position from chunks of page_size
+    that are cached under key_format's pages, in the generation current when created.
+    """
+
+    def __init__(self, key_format, queryset, request, page_size, timeout, family=None):
+        self.key_format, self.queryset, self.request = key_format, queryset, request
+        self.page_size, self.timeout = page_size, timeout
+        self.generation, self.variant = generation(key_format, family), variant_key(request)
+        self.chunks = {}
+
+    def chunk(self, number):
+        if number not in self.chunks:
+            cache_key = variant_cache_key(page_cache_key(self.key_format, number + 1, self.generation), self.variant)
+            entry = cache.get(cache_key)
+            if entry is None:
+                logger.info(f"Cache miss: {cache_key}")
+                offset = number * self.page_size
+                with primary_reads():  # Cached for every reader (posts/db_router.py)
+                    entry = {"count": self.queryset.count(),
+                             "items": render_entries(self.queryset, self.request, offset, offset + self.page_size)}
+                cache.set(cache_key, entry, self.timeout)
+            self.chunks[number] = entry
+        return self.chunks[number]
+
+    def __len__(self):
+        return self.chunk(0)["count"]
+
+    def __getitem__(self, position):
+        return self.chunk(position // self.page_size)["items"][position % self.page_size]
+
+    def slice(self, start, stop):
+        stop = min(stop, len(self))
+        items = []
+        for number in range(start // self.page_size, (stop - 1) // self.page_size + 1):
+            offset = number * self.page_size
+            items.extend(self.chunk(number)["items"][max(start - offset, 0):stop - offset])
+        return items
+
+
+def public_before(public, private, position):
+    """
+    How many of the posts before merged position `position` are public: the smallest i
+    with public[i] not newer than private[position - i - 1].
+    """
+    lo, hi = max(position - len(private), 0), min(position, len(public))
+    while lo < hi:
+        i = (lo + hi) // 2
+        if public[i][0] > private[position - i - 1][0]:
+            lo = i + 1
+        else:
+            hi = i
+    return lo
+
+
+def visible_post_page(request, page, page_size, timeout):
+    """
+    (count, rendered posts) of page (1-based) of the posts request.user may see.
+    """
+    user_id = request.user.id
+    public = CachedChunks(PUBLIC_POST_PAGE_KEY, Post.objects.filter(privacy='public'), request, page_size, timeout)
+    private = CachedChunks(PRIVATE_POST_PAGE_KEY.format(user=user_id, page="{page}"),
+                           Post.objects.filter(author_id=user_id, privacy='private'), request, page_size, timeout,
+                           family=POST_PAGES_FAMILY)
+    count, start = len(public) + len(private), (page - 1) * page_size
+    if start >= count:
+        return count, []  # Past the end
+
+    first_public = public_before(public, private, start)
+    first_private = start - first_public
+    merged = sorted(public.slice(first_public, first_public + page_size)
+                    + private.slice(first_private, first_private + page_size),
+                    key=lambda item: item[0], reverse=True)
+    return count, [data for _, data in merged[:page_size]]
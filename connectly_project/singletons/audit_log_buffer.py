@@ -0,0 +1,117 @@
+import atexit
+import threading
+
+from django.conf import settings
+from django.db import connections, router, transaction
+
+from singletons.logger_singleton import LoggerSingleton
+
+logger = LoggerSingleton().get_logger()
+
+
+class AuditLogBuffer:
+    """
+    Process-wide buffer of unsaved auditlog LogEntry objects.
+    Entries are added after their transaction commits and written in batches
+    with bulk_create, either by the background flusher thread or by flush().
+    """
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if not cls._instance:
+            cls._instance = super(AuditLogBuffer, cls).__new__(cls, *args, **kwargs)
+            cls._instance._initialize()
+        return cls._instance
+
+    def _initialize(self):
+        self._entries = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._flusher = None
+        atexit.register(self.flush)
+
+    def add(self, entry):
+        with self._lock:
+            self._entries.append(entry)
+            pending = len(self._entries)
+
+        if getattr(settings, "AUDITLOG_BACKGROUND_FLUSH", True):
+            self._start_flusher()
+            if pending >= getattr(settings, "AUDITLOG_BATCH_SIZE", 500):
+                self._wakeup.set()
+
+    def pending(self):
+        with self._lock:
+            return len(self._entries)
+
+    def flush(self):
+        """
+        Writes every buffered entry now. Returns how many were written.
+        A batch that fails is written row by row; rows that still fail go back into the
+        buffer for the next flush (at most AUDITLOG_MAX_PENDING entries are kept).
+        """
+        with self._lock:
+            entries, self._entries = self._entries, []
+
+        if not entries:
+            return 0
+
+        from auditlog import get_logentry_model
+        LogEntry = get_logentry_model()
+        try:
+            # One transaction, so a failed batch leaves no half-written rows to write twice
+            with transaction.atomic(using=router.db_for_write(LogEntry)):
+                LogEntry.objects.bulk_create(entries, batch_size=getattr(settings, "AUDITLOG_BATCH_SIZE", 500))
+        except Exception:
+            logger.exception(f"Audit log batch of {len(entries)} entries failed, writing them one by one.")
+            written, failed = self._write_each(entries)
+            self._requeue(failed)
+            logger.info(f"Audit log flushed: {written} entries written, {len(failed)} kept for the next flush.")
+            return written
+
+        logger.info(f"Audit log flushed: {len(entries)} entries written.")
+        return len(entries)
+
+    @staticmethod
+    def _write_each(entries):
+        written, failed = 0, []
+        for entry in entries:
+            entry.pk = None  # Possibly set by the rolled back batch
+            try:
+                entry.save(force_insert=True)
+                written += 1
+            except Exception as e:
+                logger.error(f"Audit log entry for {entry.content_type_id}:{entry.object_pk} not written: {e}")
+                failed.append(entry)
+        return written, failed
+
+    def _requeue(self, entries):
+        limit = getattr(settings, "AUDITLOG_MAX_PENDING", 10000)
+        with self._lock:
+            self._entries[:0] = entries
+            dropped = len(self._entries) - limit
+            if dropped > 0:
+                # Never grow without bound while the database is down; the oldest go first
+                del self._entries[:dropped]
+        if dropped > 0:
+            logger.error(f"Audit log buffer over {limit} entries, dropped the {dropped} oldest.")
+
+    def _start_flusher(self):
+        if self._flusher is not None and self._flusher.is_alive():
+            return
+        with self._lock:
+            if self._flusher is not None and self._flusher.is_alive():
+                return
+            self._flusher = threading.Thread(target=self._run, name="auditlog-flusher", daemon=True)
+            self._flusher.start()
+
+    def _run(self):
+        interval = getattr(settings, "AUDITLOG_FLUSH_INTERVAL", 2)
+        while True:
+            self._wakeup.wait(interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            finally:
+                # This thread owns its own DB connection, don't leave it open between flushes
+                connections.close_all()
@@ -1,4 +1,86 @@
+import json
+import os
+import signal
+import threading
+import time
+from types import MappingProxyType
+
+from singletons.logger_singleton import LoggerSingleton
+
+logger = LoggerSingleton().get_logger()
+
+# Every known setting with its type and default. Values are loaded, lowest priority first, from:
+#   1. these defaults
+#   2. the CONNECTLY_CONFIG dict in Django settings
+#   3. environment variables named CONNECTLY_<KEY> (dicts as JSON)
+#   4. the JSON file at settings.CONNECTLY_CONFIG_FILE, if any
+# reload() re-reads all of them; it runs on SIGHUP and whenever the config file changes.
+SETTINGS_SCHEMA = {
+    "DEFAULT_PAGE_SIZE": (int, 20),
+    "FEED_PAGE_SIZE": (int, 2),  # Items per page on the paginated list endpoints
+    "FEED_MAX_PAGE_SIZE": (int, 3),  # Upper bound for ?page_size=
+    "CACHE_TIMEOUT": (int, 300),  # Seconds, for the cached list/detail responses in posts/views.py
+    "COMPRESSION_MIN_SIZE": (int, 512),  # Bytes; smaller responses are sent uncompressed
+    "TRENDING_HALF_LIFE_HOURS": (int, 12),  # A like or comment counts half as much after this long
+    "TRENDING_LIKE_WEIGHT": (int, 1),
+    "TRENDING_COMMENT_WEIGHT": (int, 3),
+    "ENABLE_ANALYTICS": (bool, True),
+    "ENABLE_SEARCH": (bool, True),
+    "ENABLE_RATE_LIMIT": (bool, True),
+    "RATE_LIMIT": (int, 100),  # Requests per user per RATE_LIMIT_WINDOW, see posts/throttling.py
+    "RATE_LIMIT_WINDOW": (int, 60),  # Seconds
+    "RATE_LIMIT_SCOPES": (dict, {  # Per-endpoint limits, by the view's throttle_scope
+        "feed": 60,
+        "likes": 30,
+        "follows": 30,
+        "search": 60,
+        "export": 5,
+    }),
+}
+
+ENV_PREFIX = "CONNECTLY_"
+TRUE_STRINGS = ("1", "true", "yes", "on")
+FALSE_STRINGS = ("0", "false", "no", "off")
+
+
+def coerce(key, value):
+    """
+    Converts a raw value (often a string from the environment) to the setting's type.
+    Raises ValueError if it cannot be converted.
+    """
+    if key not in SETTINGS_SCHEMA:
+        return value
+    expected, _ = SETTINGS_SCHEMA[key]
+
+    if expected is bool:
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, str) and value.strip().lower() in TRUE_STRINGS + FALSE_STRINGS:
+            return value.strip().lower() in TRUE_STRINGS
+    elif expected is int:
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+        if isinstance(value, str) and value.strip().lstrip("-").isdigit():
+            return int(value)
+    elif expected is dict:
+        if isinstance(value, str):
+            try:
+                value = json.loads(value)
+            except ValueError:
+                pass
+        if isinstance(value, dict):
+            return value
+
+    raise ValueError(f"{key} must be a {expected.__name__}, got {value!r}")
+
+
 class ConfigManager:
+    """
+    Process-wide runtime configuration.
+
+    Reads never lock: the settings live in a read-only mapping that is swapped out as a
+    whole by set_setting() and reload(), so a reader always sees one consistent snapshot.
+    """
     _instance = None
 
     def __new__(cls, *args, **kwargs):
@@ -8,14 +90,125 @@ class ConfigManager:
         return cls._instance
 
     def _initialize(self):
-        self.settings = {
-            "DEFAULT_PAGE_SIZE": 20,
-            "ENABLE_ANALYTICS": True,
-            "RATE_LIMIT": 100
-        }
+        # Re-entrant: the SIGHUP handler may run while this thread is inside set_setting()
+        self._write_lock = threading.RLock()
+        self._watcher = None
+        self._reload_signals = {}  # signum: the handler it replaced
+        self._file_mtime = None
+        self._settings = MappingProxyType(self._load())
+
+    @property
+    def settings(self):
+        return self._settings
 
     def get_setting(self, key):
-        return self.settings.get(key)
+        return self._settings.get(key)
 
     def set_setting(self, key, value):
-        self.settings[key] = value
+        """
+        Overrides a setting in this process until the next reload().
+        """
+        value = coerce(key, value)
+        with self._write_lock:
+            self._settings = MappingProxyType({**self._settings, key: value})
+
+    def reload(self):
+        with self._write_lock:
+            self._settings = MappingProxyType(self._load())
+        logger.info("Config reloaded.")
+
+    # ------------------- SOURCES ----------------------
+    def _load(self):
+        values = {key: default for key, (_, default) in SETTINGS_SCHEMA.items()}
+        for source, raw in self._sources():
+            for key, value in raw.items():
+                if key not in SETTINGS_SCHEMA:
+                    logger.warning(f"Config: ignoring unknown setting {key} from {source}.")
+                    continue
+                try:
+                    values[key] = coerce(key, value)
+                except ValueError as e:
+                    # A typo in a hot reload must not take the worker down
+                    logger.warning(f"Config: ignoring {source} value, {e}")
+        return values
+
+    def _sources(self):
+        from django.conf import settings
+
+        if settings.configured:
+            yield "settings.CONNECTLY_CONFIG", getattr(settings, "CONNECTLY_CONFIG", {})
+
+        yield "environment", {
+            key: os.environ[ENV_PREFIX + key] for key in SETTINGS_SCHEMA if ENV_PREFIX + key in os.environ
+        }
+
+        path = self.config_file()
+        if path:
+            try:
+                with open(path) as f:
+                    self._file_mtime = os.fstat(f.fileno()).st_mtime
+                    yield path, json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Config: could not read {path}: {e}")
+
+    @staticmethod
+    def config_file():
+        from django.conf import settings
+
+        return getattr(settings, "CONNECTLY_CONFIG_FILE", None) if settings.configured else None
+
+    # ------------------- HOT RELOAD ----------------------
+    def install_reload_signal(self, signum=getattr(signal, "SIGHUP", None)):
+        """
+        Reloads on the given signal (SIGHUP by default), e.g. `kill -HUP <worker pid>`.
+        Called from the WSGI/ASGI entry points, so only serving processes handle the signal;
+        management commands, shells and the test runner keep the default action.
+        Only possible from the main thread; returns False where it was not installed.
+        """
+        if signum is None or threading.current_thread() is not threading.main_thread():
+            return False
+        if signum in self._reload_signals:
+            return True  # Installing twice would chain the handler onto itself
+
+        previous = signal.getsignal(signum)
+        if previous == signal.SIG_DFL:
+            # The default action would have terminated the process
+            logger.warning(f"Config: signal {signum} now reloads the runtime config instead of stopping the process.")
+
+        def handler(received, frame):
+            logger.info(f"Config: reloading on signal {received}.")
+            self.reload()
+            if callable(previous):
+                previous(received, frame)
+
+        signal.signal(signum, handler)
+        self._reload_signals[signum] = previous
+        return True
+
+    def remove_reload_signal(self, signum=getattr(signal, "SIGHUP", None)):
+        """
+        Puts back the handler that was in place before install_reload_signal().
+        """
+        if signum in self._reload_signals:
+            signal.signal(signum, self._reload_signals.pop(signum))
+
+    def watch_config_file(self, interval=2.0):
+        """
+        Starts a daemon thread that reloads whenever the config file's mtime changes.
+        """
+        if not self.config_file() or self._watcher is not None:
+            return
+        self._watcher = threading.Thread(
+            target=self._watch, args=(interval,), name="config-file-watcher", daemon=True
+        )
+        self._watcher.start()
+
+    def _watch(self, interval):
+        while True:
+            time.sleep(interval)
+            try:
+                mtime = os.stat(self.config_file()).st_mtime
+            except (OSError, TypeError):
+                continue
+            if mtime != self._file_mtime:
+                self.reload()
@@ -0,0 +1,126 @@
+import queue
+import threading
+from functools import partial
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+from singletons.logger_singleton import LoggerSingleton
+
+logger = LoggerSingleton().get_logger()
+
+
+class EventDispatcher:
+    """
+    Process-wide registry of domain event handlers (posts/events.py).
+    Synchronous handlers run as soon as the write commits; background handlers run on a
+    worker thread, or inline when EVENTS_BACKGROUND_DISPATCH is off. Background handlers
+    registered with outbox=True run from the event's outbox row, the others from memory.
+    """
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if not cls._instance:
+            cls._instance = super(EventDispatcher, cls).__new__(cls, *args, **kwargs)
+            cls._instance._initialize()
+        return cls._instance
+
+    def _initialize(self):
+        self._handlers = {}  # event name -> list of (handler, background, outbox)
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+
+    def register(self, name, handler, background=True, outbox=True):
+        outbox = background and outbox
+        with self._lock:
+            handlers = self._handlers.setdefault(name, [])
+            if (handler, background, outbox) not in handlers:
+                handlers.append((handler, background, outbox))
+
+    def handlers(self, name, background, outbox=None):
+        return [handler for handler, is_background, in_outbox in self._handlers.get(name, ())
+                if is_background == background and outbox in (None, in_outbox)]
+
+    def has_outbox_handlers(self, name):
+        return bool(self.handlers(name, background=True, outbox=True))
+
+    def dispatch(self, name, payload, event_id=None):
+        """
+        Called once the emitting transaction has committed.
+        """
+        for handler in self.handlers(name, background=False):
+            try:
+                handler(name, **payload)
+            except Exception:
+                # The write already committed, a failing side effect must not fail the request
+                logger.exception(f"Event handler {handler.__name__} failed for {name}.")
+
+        in_memory = self.handlers(name, background=True, outbox=False)
+        if in_memory:
+            self._submit(partial(self.run_handlers, name, payload, in_memory))
+        if event_id is not None:
+            self._submit(partial(self.process, event_id))
+
+    def _submit(self, task):
+        if getattr(settings, "EVENTS_BACKGROUND_DISPATCH", True):
+            self._start_worker()
+            self._queue.put(task)
+        else:
+            task()
+
+    def run_handlers(self, name, payload, handlers):
+        """
+        Runs background handlers that have no outbox row. A failure is only logged.
+        """
+        for handler in handlers:
+            try:
+                handler(name, **payload)
+            except Exception:
+                logger.exception(f"Event handler {handler.__name__} failed for {name}.")
+
+    def process(self, event_id):
+        """
+        Runs the outbox handlers of one outbox event and marks it processed.
+        Returns False if a handler failed; the event is then left for process_outbox to retry.
+        """
+        from posts.models import OutboxEvent
+
+        event = OutboxEvent.objects.filter(id=event_id, processed_at__isnull=True).first()
+        if event is None:
+            return True
+
+        for handler in self.handlers(event.name, background=True, outbox=True):
+            try:
+                handler(event.name, **event.payload)
+            except Exception as e:
+                logger.exception(f"Event handler {handler.__name__} failed for {event}.")
+                OutboxEvent.objects.filter(id=event.id).update(attempts=event.attempts + 1, last_error=repr(e))
+                return False
+
+        OutboxEvent.objects.filter(id=event.id).update(processed_at=timezone.now(), attempts=event.attempts + 1)
+        return True
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def _start_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(target=self._run, name="event-dispatcher", daemon=True)
+            self._worker.start()
+
+    def _run(self):
+        while True:
+            task = self._queue.get()
+            try:
+                task()
+            except Exception:
+                logger.exception(f"Background event task {task} failed.")
+            finally:
+                # This thread owns its own DB connection, don't leave it open between events
+                connections.close_all()
@@ -0,0 +1,132 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from auditlog.models import LogEntry
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from factories.comment_factory import CommentFactory
+from factories.post_factory import PostFactory
+from posts import archive
+from posts.models import ArchivedComment, ArchivedLike, ArchivedPost, Comment, Like, Post, PostScore
+from posts.search import SearchResults
+from posts.versions import get_versions
+
+
+class ArchiveTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create(username="author")
+        self.fan = User.objects.create(username="fan")
+        self.old = PostFactory.create_post(post_type="text", title="Old", author=self.author)
+        comment = CommentFactory.create_comment(comment_type="text", content="First!", author=self.fan, post=self.old)
+        Like.objects.create(user=self.fan, post=self.old)
+        Like.objects.create(user=self.author, comment=comment)
+        Post.objects.filter(id=self.old.id).update(created_at=timezone.now() - timedelta(days=400))
+        self.recent = PostFactory.create_post(post_type="text", title="Recent", author=self.author)
+        self.client = APIClient()
+        self.client.force_authenticate(self.fan)
+
+    def test_old_posts_move_with_their_comments_and_likes(self):
+        out = StringIO()
+        call_command("archive_posts", stdout=out)
+        self.assertIn("Posts archived: 1", out.getvalue())
+
+        self.assertEqual(list(Post.objects.values_list("title", flat=True)), ["Recent"])
+        self.assertFalse(Comment.objects.exists() or Like.objects.exists())
+        archived = ArchivedPost.objects.get(id=self.old.id)
+        self.assertEqual((archived.like_count, archived.comment_count), (1, 1))
+        self.assertEqual(ArchivedComment.objects.get().like_count, 1)
+        self.assertEqual(ArchivedLike.objects.count(), 2)
+
+    def test_delete_skips_per_row_side_effects(self):
+        LogEntry.objects.all().delete()
+        version = get_versions(f"post_{self.old.id}")
+        self.assertTrue(PostScore.objects.filter(post=self.old).exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(archive.archive_posts(timezone.now() - timedelta(days=365)), 1)
+
+        self.assertFalse(LogEntry.objects.filter(action=LogEntry.Action.DELETE).exists())
+        self.assertFalse(PostScore.objects.filter(post_id=self.old.id).exists())
+        self.assertEqual(SearchResults("first", self.fan).count(), 0)
+        self.assertEqual([post.title for kind, post, rank in SearchResults("recent", self.fan)[:10]], ["Recent"])
+        self.assertNotEqual(get_versions(f"post_{self.old.id}"), version)
+
+    def test_rerun_after_a_partial_move_finishes_it(self):
+        # Copied to the archive but never deleted from the live tables
+        call_command("archive_posts", stdout=StringIO())
+        archived = ArchivedPost.objects.get(id=self.old.id)
+        Post.objects.create(id=archived.id, title="Old", content="", author=self.author)
+        Post.objects.filter(id=archived.id).update(created_at=archived.created_at)
+
+        call_command("archive_posts", stdout=StringIO())
+        self.assertFalse(Post.objects.filter(id=self.old.id).exists())
+        self.assertEqual(ArchivedPost.objects.count(), 1)
+
+    def archive_with(self, change):
+        """
+        Runs the archive with change() applied between the copy and the delete.
+        """
+        original = archive.unchanged_posts
+
+        def changed_then_checked(*args):
+            change()
+            return original(*args)
+
+        with mock.patch("posts.archive.unchanged_posts", side_effect=changed_then_checked):
+            return archive.archive_posts(timezone.now() - timedelta(days=365))
+
+    def test_like_added_during_archival_is_not_lost(self):
+        late = User.objects.create(username="late")
+        self.assertEqual(self.archive_with(lambda: Like.objects.create(user=late, post=self.old)), 0)
+        self.assertEqual(Like.objects.filter(post=self.old).count(), 2)
+
+        call_command("archive_posts", stdout=StringIO())
+        self.assertFalse(Post.objects.filter(id=self.old.id).exists())
+        self.assertEqual(ArchivedPost.objects.get(id=self.old.id).like_count, 2)
+        self.assertEqual(ArchivedLike.objects.filter(user_id=late.id).count(), 1)
+
+    def test_swapped_like_rolls_the_batch_back(self):
+        # Same counts, different rows: caught by the delete instead of the count check
+        def swap():
+            Like.objects.filter(post=self.old).delete()
+            Like.objects.create(user=self.author, post=self.old)
+
+        self.assertEqual(self.archive_with(swap), 0)
+        self.assertTrue(Post.objects.filter(id=self.old.id).exists())
+        self.assertEqual(Like.objects.count(), 2)  # Nothing deleted (the swap ran in the rolled back transaction)
+
+        call_command("archive_posts", stdout=StringIO())
+        self.assertFalse(Post.objects.filter(id=self.old.id).exists() or Like.objects.exists())
+        self.assertEqual(ArchivedLike.objects.count(), 2)
+
+    def test_archived_posts_stay_readable(self):
+        call_command("archive_posts", stdout=StringIO())
+        post = self.client.get(f"/posts/{self.old.id}/", secure=True).json()
+        self.assertTrue(post["archived"])
+        self.assertEqual((post["author"], post["like_count"]), ("author", 1))
+        self.assertEqual(post["comments"][0]["author"], "fan")
+
+        token = RefreshToken.for_user(self.fan).access_token
+        response = self.client.get(f"/async/posts/{self.old.id}/", headers={"Authorization": f"Bearer {token}"},
+                                   secure=True)
+        self.assertEqual(response.json()["title"], "Old")
+        self.assertEqual(self.client.get("/posts/999999/", secure=True).status_code, 404)
+
+    def test_profile_counts_include_the_archive(self):
+        call_command("archive_posts", stdout=StringIO())
+        self.client.force_authenticate(self.author)
+        profile = self.client.get("/profile/", secure=True).json()
+        self.assertEqual(profile["posts_count"], 2)
+
+    def test_dry_run(self):
+        out = StringIO()
+        call_command("archive_posts", "--dry-run", stdout=out)
+        self.assertIn("Posts older than 365 days: 1", out.getvalue())
+        self.assertFalse(ArchivedPost.objects.exists())
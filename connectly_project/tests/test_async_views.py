@@ -0,0 +1,76 @@
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from factories.post_factory import PostFactory
+from posts.async_views import aget_jwt_user
+from posts.models import Follow, Post
+
+
+class AsyncViewsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="async_user")
+        self.other = User.objects.create(username="other_user")
+        self.post = PostFactory.create_post(post_type="text", title="Async", content="hello", author=self.user)
+        self.private_post = PostFactory.create_post(
+            post_type="text", title="Mine", content="secret", author=self.other, privacy="private"
+        )
+        token = RefreshToken.for_user(self.user).access_token
+        self.headers = {"Authorization": f"Bearer {token}"}
+
+    async def test_feed_matches_sync_shape(self):
+        response = await self.async_client.get("/async/feed/", headers=self.headers, secure=True)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["count"], 1)
+        self.assertEqual(data["results"][0]["id"], self.post.id)
+        self.assertIsNone(data["previous"])
+
+    async def test_requires_authentication(self):
+        response = await self.async_client.get("/async/feed/", secure=True)
+        self.assertEqual(response.status_code, 401)
+
+    async def test_post_detail_privacy(self):
+        response = await self.async_client.get(f"/async/posts/{self.post.id}/", headers=self.headers, secure=True)
+        self.assertEqual(response.json()["title"], "Async")
+
+        response = await self.async_client.get(
+            f"/async/posts/{self.private_post.id}/", headers=self.headers, secure=True
+        )
+        self.assertEqual(response.status_code, 400)
+
+    async def test_follower_counts(self):
+        await sync_to_async(Follow.objects.create)(follower=self.other, following=self.user)
+
+        response = await self.async_client.get(
+            f"/async/users/{self.user.id}/followers/", headers=self.headers, secure=True
+        )
+        self.assertEqual(response.json()["followers_count"], 1)
+
+    def test_jwt_user_comes_from_the_cached_state(self):
+        request = RequestFactory().get("/async/feed/", headers=self.headers)
+        self.assertEqual(async_to_sync(aget_jwt_user)(request).id, self.user.id)  # Fills the cache
+
+        with self.assertNumQueries(0):
+            user = async_to_sync(aget_jwt_user)(request)
+        self.assertEqual((user.id, user.username), (self.user.id, "async_user"))
+
+        self.user.is_active = False
+        self.user.save(update_fields=["is_active"])  # Drops the cached state
+        self.assertIsNone(async_to_sync(aget_jwt_user)(request))
+
+    async def test_post_detail_conditional_get(self):
+        url = f"/async/posts/{self.post.id}/"
+        response = await self.async_client.get(url, headers=self.headers, secure=True)
+        etag = response["ETag"]
+
+        response = await self.async_client.get(url, headers={**self.headers, "If-None-Match": etag}, secure=True)
+        self.assertEqual(response.status_code, 304)
+
+        await sync_to_async(Post.objects.filter(id=self.post.id).update)(title="Changed")
+        await sync_to_async(self.post.save)()  # Bumps post_<id>
+        response = await self.async_client.get(url, headers={**self.headers, "If-None-Match": etag}, secure=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
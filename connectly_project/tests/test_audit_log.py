@@ -0,0 +1,129 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from auditlog.models import LogEntry
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.db.models.query import QuerySet
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from factories.post_factory import PostFactory
+from posts.models import Like, Post
+from singletons.audit_log_buffer import AuditLogBuffer
+
+
+@override_settings(AUDITLOG_BUFFERED=True, AUDITLOG_BACKGROUND_FLUSH=False)
+class BufferedAuditLogTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="auditor")
+        AuditLogBuffer().flush()
+        LogEntry.objects.all().delete()
+
+    def test_entries_written_only_on_flush(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            post = PostFactory.create_post(post_type="text", title="Buffered", author=self.user)
+
+        self.assertEqual(LogEntry.objects.count(), 0)
+        self.assertGreater(AuditLogBuffer().pending(), 0)
+
+        AuditLogBuffer().flush()
+        self.assertTrue(LogEntry.objects.get_for_object(post).filter(action=LogEntry.Action.CREATE).exists())
+
+    def test_updates_are_buffered_with_their_diff(self):
+        post = PostFactory.create_post(post_type="text", title="Before", author=self.user)
+        AuditLogBuffer().flush()
+        with self.captureOnCommitCallbacks(execute=True):
+            post.title = "After"
+            post.save()
+
+        self.assertFalse(LogEntry.objects.get_for_object(post).filter(action=LogEntry.Action.UPDATE).exists())
+        AuditLogBuffer().flush()
+        entry = LogEntry.objects.get_for_object(post).get(action=LogEntry.Action.UPDATE)
+        self.assertEqual(entry.changes_dict["title"], ["Before", "After"])
+
+    def test_update_reads_the_stored_row_once_and_diffs_only_saved_fields(self):
+        post = PostFactory.create_post(post_type="text", title="Before", author=self.user)
+        AuditLogBuffer().flush()
+
+        def save_title(title):
+            post.title, post.content = title, "never saved"
+            with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+                post.save(update_fields=["title"])
+            return len(queries)
+
+        with override_settings(AUDITLOG_MODEL_POLICY={"posts.Post": "skip"}):
+            unaudited = save_title("Skipped")
+        self.assertEqual(save_title("After"), unaudited + 1)  # Only the buffered diff's read
+
+        AuditLogBuffer().flush()
+        entry = LogEntry.objects.get_for_object(post).get(action=LogEntry.Action.UPDATE)
+        self.assertEqual(set(entry.changes_dict), {"title"})
+
+    def test_failed_batch_is_written_row_by_row_or_kept(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            post = PostFactory.create_post(post_type="text", title="Kept", author=self.user)
+        with mock.patch.object(QuerySet, "bulk_create", side_effect=DatabaseError("batch failed")), \
+                mock.patch.object(LogEntry, "save", side_effect=DatabaseError("down")):
+            self.assertEqual(AuditLogBuffer().flush(), 0)
+        self.assertEqual(AuditLogBuffer().pending(), 1)  # Kept for the next flush
+
+        with mock.patch.object(QuerySet, "bulk_create", side_effect=DatabaseError("batch failed")):
+            self.assertEqual(AuditLogBuffer().flush(), 1)
+        self.assertEqual(AuditLogBuffer().pending(), 0)
+        self.assertTrue(LogEntry.objects.get_for_object(post).filter(action=LogEntry.Action.CREATE).exists())
+
+    @override_settings(AUDITLOG_MAX_PENDING=1)
+    def test_kept_entries_are_bounded(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            PostFactory.create_post(post_type="text", title="Old", author=self.user)
+            PostFactory.create_post(post_type="text", title="New", author=self.user)
+        with mock.patch.object(QuerySet, "bulk_create", side_effect=DatabaseError("batch failed")), \
+                mock.patch.object(LogEntry, "save", side_effect=DatabaseError("down")):
+            AuditLogBuffer().flush()
+        self.assertEqual(AuditLogBuffer().pending(), 1)
+        AuditLogBuffer().flush()
+        self.assertEqual(LogEntry.objects.get().object_repr, str(Post.objects.get(title="New")))
+
+    def test_rolled_back_writes_are_not_logged(self):
+        PostFactory.create_post(post_type="text", title="Never committed", author=self.user)
+        # on_commit callbacks never ran, nothing reached the buffer
+        self.assertEqual(AuditLogBuffer().pending(), 0)
+
+    @override_settings(AUDITLOG_MODEL_POLICY={"posts.Like": "skip"})
+    def test_skip_policy(self):
+        post = PostFactory.create_post(post_type="text", title="Liked", author=self.user)
+        AuditLogBuffer().flush()
+        with self.captureOnCommitCallbacks(execute=True):
+            Like.objects.create(user=self.user, post=post)
+        AuditLogBuffer().flush()
+        self.assertFalse(LogEntry.objects.get_for_model(Like).exists())
+
+
+class AuditLogPolicyTest(TestCase):
+    @override_settings(AUDITLOG_MODEL_POLICY={"posts.Like": "skip"})
+    def test_unbuffered_writes_follow_the_policy(self):
+        user = User.objects.create(username="liker")
+        post = PostFactory.create_post(post_type="text", title="Logged", author=user)
+        Like.objects.create(user=user, post=post)
+        self.assertTrue(LogEntry.objects.get_for_object(post).exists())
+        self.assertFalse(LogEntry.objects.get_for_model(Like).exists())
+
+        # Skipping the like held auditlog off for that one signal only
+        later = PostFactory.create_post(post_type="text", title="Later", author=user)
+        self.assertTrue(LogEntry.objects.get_for_object(later).exists())
+
+
+class CompactAuditLogTest(TestCase):
+    def test_old_entries_are_removed(self):
+        user = User.objects.create(username="old")
+        post = PostFactory.create_post(post_type="text", title="Old", author=user)
+        LogEntry.objects.get_for_object(post).update(timestamp=timezone.now() - timedelta(days=400))
+        PostFactory.create_post(post_type="text", title="New", author=user)
+
+        call_command("compact_auditlog", "--days", "90", stdout=StringIO())
+
+        self.assertFalse(LogEntry.objects.get_for_object(post).exists())
+        self.assertTrue(LogEntry.objects.exists())
@@ -0,0 +1,43 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from factories.post_factory import PostFactory
+from posts.authentication import TokenUser, get_user_state
+
+
+class StatelessJWTAuthenticationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="reader", email="reader@connectly.com")
+        PostFactory.create_post(post_type="text", title="Hello", content="world", author=self.user)
+        self.client = APIClient()
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_cached_feed_page_needs_no_queries(self):
+        self.assertEqual(self.client.get("/feed/", secure=True).status_code, 200)
+
+        # Feed page and user state are both cached now: no user lookup, no session
+        with self.assertNumQueries(0):
+            response = self.client.get("/feed/", secure=True)
+        self.assertEqual(response.status_code, 200)
+
+    def test_deactivated_user_is_rejected(self):
+        self.client.get("/posts/", secure=True)
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertEqual(self.client.get("/posts/", secure=True).status_code, 401)
+
+    def test_token_user_loads_lazily(self):
+        token_user = TokenUser(get_user_state(self.user.id))
+
+        with self.assertNumQueries(0):
+            self.assertEqual(token_user.id, self.user.id)
+            self.assertFalse(token_user.is_staff)
+            self.assertEqual(token_user, self.user)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(token_user.email, "reader@connectly.com")
@@ -0,0 +1,65 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from factories.post_factory import PostFactory
+from posts.models import Like
+
+
+@override_settings(EVENTS_BACKGROUND_DISPATCH=False)
+class BatchEndpointTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.reader = User.objects.create(username="reader")
+        self.author = User.objects.create(username="author")
+        self.posts = [PostFactory.create_post(post_type="text", title=f"Post {i}", author=self.author)
+                      for i in range(3)]
+        self.secret = PostFactory.create_post(post_type="text", title="Secret", author=self.author, privacy="private")
+        self.client = APIClient()
+        self.client.force_authenticate(self.reader)
+
+    def batch(self, path, ids):
+        return self.client.get(f"{path}?ids={','.join(map(str, ids))}", secure=True)
+
+    def test_posts_come_back_in_requested_order(self):
+        ids = [self.posts[2].id, 999, self.posts[0].id, self.secret.id]
+        body = self.batch("/posts/batch/", ids).json()
+        self.assertEqual([post["title"] for post in body["results"]], ["Post 2", "Post 0"])
+        # Someone else's private post is indistinguishable from an unknown id
+        self.assertEqual(body["missing"], [999, self.secret.id])
+
+        self.client.force_authenticate(self.author)
+        body = self.batch("/posts/batch/", ids).json()
+        self.assertEqual([post["title"] for post in body["results"]], ["Post 2", "Post 0", "Secret"])
+
+    def test_only_cache_misses_are_queried(self):
+        ids = [post.id for post in self.posts]
+        self.batch("/posts/batch/", ids[:2])
+        # One IN query for the third post, plus its prefetched comments
+        with self.assertNumQueries(2):
+            body = self.batch("/posts/batch/", ids).json()
+        self.assertEqual(len(body["results"]), 3)
+        with self.assertNumQueries(0):
+            self.batch("/posts/batch/", ids)
+
+    def test_likes_refresh_cached_posts(self):
+        self.batch("/posts/batch/", [self.posts[0].id])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f"/posts/{self.posts[0].id}/like/", secure=True)
+        body = self.batch("/posts/batch/", [self.posts[0].id]).json()
+        self.assertEqual(body["results"][0]["like_count"], Like.objects.count())
+
+    def test_users_batch(self):
+        body = self.batch("/posts/users/batch/", [self.author.id, self.reader.id, self.author.id]).json()
+        self.assertEqual([user["username"] for user in body["results"]], ["author", "reader"])
+
+    def test_users_batch_requires_authentication(self):
+        self.client.force_authenticate(None)
+        response = self.batch("/posts/users/batch/", [self.author.id])
+        self.assertIn(response.status_code, (401, 403))
+        self.assertNotIn("email", response.content.decode())
+
+    def test_bad_ids_are_rejected(self):
+        self.assertEqual(self.client.get("/posts/batch/?ids=1,x", secure=True).status_code, 400)
+        self.assertEqual(self.client.get("/posts/batch/", secure=True).status_code, 400)
+        self.assertEqual(self.batch("/posts/batch/", range(1, 102)).status_code, 400)
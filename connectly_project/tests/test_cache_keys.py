@@ -0,0 +1,117 @@
+import random
+from urllib.parse import quote
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from factories.comment_factory import CommentFactory
+from factories.post_factory import PostFactory
+from posts.event_handlers import COMMENT_LIST_PAGE_KEY, USER_LIST_PAGE_KEY
+from posts.models import Follow
+from posts.response_cache import generation_key, invalidate_pages, page_cache_key, variant_cache_key
+
+NO_CACHE = {"default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}}
+
+# Endpoint: {param: values to pick from}; None leaves the param out
+PARAMS = {
+    "/posts/": {
+        "search": [None, "", "alpha", "beta", "carol"],
+        "ordering": [None, "", "id", "-id", "title", "-created_at"],
+        "fields": [None, "id,title", "id,privacy,author"],
+    },
+    "/posts/users/": {
+        "search": [None, "", "a", "bob"],
+        "ordering": [None, "id", "-username", "email"],
+    },
+    "/posts/users/followers/": {
+        "search": [None, "a", "carol"],
+        "ordering": [None, "username", "-followers_count"],
+    },
+    "/posts/comments/": {
+        "search": [None, "", "first", "alice"],
+        "ordering": [None, "id", "-id", "content"],
+    },
+    "/feed/": {
+        "fields": [None, "id", "id,title"],
+    },
+}
+COMMON = {
+    "page": [None, "1", "01", " 2", "2", "3", "0", "x"],
+    "page_size": [None, "", "1", "2", "3"],
+}
+
+
+@override_settings(EVENTS_BACKGROUND_DISPATCH=False, CONNECTLY_CONFIG={"ENABLE_RATE_LIMIT": False})
+class CacheKeyTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.users = [User.objects.create(username=name, email=f"{name}@example.com")
+                      for name in ("alice", "bob", "carol")]
+        words = ["alpha", "beta", "gamma"]
+        for i in range(7):
+            author = self.users[i % 3]
+            post = PostFactory.create_post(post_type="text", title=f"{words[i % 3]} {i}", content="x",
+                                           author=author, privacy='private' if i % 4 == 3 else 'public')
+            CommentFactory.create_comment(comment_type="text", content=f"first {i}", author=self.users[i % 2],
+                                          post=post)
+        Follow.objects.create(follower=self.users[0], following=self.users[1])
+        Follow.objects.create(follower=self.users[2], following=self.users[1])
+        self.client = APIClient()
+
+    def get(self, url):
+        response = self.client.get(url, secure=True)
+        return response.status_code, response.json() if response.status_code != 404 else None
+
+    def random_url(self, rng):
+        path = rng.choice(list(PARAMS))
+        params = []
+        for name, values in {**PARAMS[path], **COMMON}.items():
+            value = rng.choice(values)
+            if value is not None:
+                params.append((name, value))
+        if params and rng.random() < 0.2:
+            params.append(rng.choice(params))  # Repeated param
+        rng.shuffle(params)
+        return path + "?" + "&".join(f"{name}={quote(value)}" for name, value in params)
+
+    def test_cached_responses_match_uncached_ones(self):
+        rng = random.Random(48)
+        for _ in range(150):
+            url, user = self.random_url(rng), rng.choice(self.users)
+            self.client.force_authenticate(user)
+            cached = self.get(url)  # Served from, or stored in, a cache warmed by the requests before
+            with override_settings(CACHES=NO_CACHE):
+                uncached = self.get(url)
+            self.assertEqual(cached, uncached, f"{url} as {user.username}")
+
+    def test_writes_invalidate_every_cached_page(self):
+        alice = self.users[0]
+        self.client.force_authenticate(alice)
+        before = self.get("/posts/comments/?page=3")  # Page 3 cached without pages 1 and 2
+        with self.captureOnCommitCallbacks(execute=True):
+            post = PostFactory.create_post(post_type="text", title="new", content="x", author=alice)
+            self.client.post("/posts/comments/", {"comment_type": "text", "content": "latest", "post": post.id},
+                             secure=True)
+        after = self.get("/posts/comments/?page=3")
+        with override_settings(CACHES=NO_CACHE):
+            self.assertEqual(after, self.get("/posts/comments/?page=3"))
+        self.assertNotEqual(after, before)
+
+    def test_equivalent_requests_share_a_variant(self):
+        self.client.force_authenticate(self.users[0])
+        self.get("/posts/users/?page_size=2&search=a")
+        self.assertIsNotNone(cache.get(variant_cache_key(page_cache_key(USER_LIST_PAGE_KEY, 1), "page_size=2&search=a")))
+        for url in ("/posts/users/?search=a&page=1&page_size=2&ordering=", "/posts/users/?page=01&search=+a&page_size=2"):
+            with self.assertNumQueries(0):
+                self.get(url)
+
+    def test_page_filled_during_a_write_is_never_served(self):
+        cache_key = page_cache_key(COMMENT_LIST_PAGE_KEY, 7)  # Read before the view reads the database
+        invalidate_pages(COMMENT_LIST_PAGE_KEY)  # A write commits meanwhile
+        cache.set(cache_key, {"": "stale"})
+        self.assertNotEqual(page_cache_key(COMMENT_LIST_PAGE_KEY, 7), cache_key)
+
+        # An evicted generation restarts above every earlier one, never reusing old keys
+        cache.delete(generation_key(COMMENT_LIST_PAGE_KEY))
+        self.assertGreater(page_cache_key(COMMENT_LIST_PAGE_KEY, 7), cache_key)
@@ -0,0 +1,62 @@
+import gzip
+import zlib
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.http import StreamingHttpResponse
+from django.test import RequestFactory, TestCase
+from rest_framework.test import APIClient
+from factories.post_factory import PostFactory
+from posts.middleware import CompressionMiddleware, choose_encoding
+
+
+class CompressionTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="reader")
+        PostFactory.create_post(post_type="text", title="Long", content="lorem ipsum " * 200, author=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_large_responses_are_gzipped(self):
+        plain = self.client.get("/feed/", secure=True)
+        compressed = self.client.get("/feed/", HTTP_ACCEPT_ENCODING="gzip", secure=True)
+
+        self.assertNotIn("Content-Encoding", plain)
+        self.assertEqual(compressed["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(compressed.content), plain.content)
+        self.assertIn("Accept-Encoding", compressed["Vary"])
+
+    def test_small_responses_are_not_compressed(self):
+        response = self.client.get("/posts/?fields=id", HTTP_ACCEPT_ENCODING="gzip", secure=True)
+        self.assertNotIn("Content-Encoding", response)
+
+    def test_encoding_negotiation(self):
+        available = {"gzip": None, "br": None, "zstd": None}
+        self.assertEqual(choose_encoding("gzip, br, zstd", available), "zstd")
+        self.assertEqual(choose_encoding("gzip;q=1.0, br;q=0.5", available), "gzip")
+        self.assertEqual(choose_encoding("br", {"gzip": None}), None)
+        self.assertEqual(choose_encoding("*;q=0.1, zstd;q=0", available), "br")
+        self.assertIsNone(choose_encoding("identity", available))
+
+    def test_async_streams_are_gzipped_chunk_by_chunk(self):
+        async def events():
+            yield b"data: first\n\n"
+            yield b"data: second\n\n"
+
+        async def get_response(request):
+            return StreamingHttpResponse(events(), content_type="text/event-stream")
+
+        async def read(response):
+            decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            # Each event can be decoded as soon as it is sent, before the stream ends
+            return [decoder.decompress(chunk) async for chunk in response.streaming_content]
+
+        middleware = CompressionMiddleware(get_response)
+        request = RequestFactory().get("/events/", HTTP_ACCEPT_ENCODING="gzip")
+        response = async_to_sync(middleware)(request)
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        chunks = [chunk for chunk in async_to_sync(read)(response) if chunk]
+        self.assertEqual(chunks, [b"data: first\n\n", b"data: second\n\n"])
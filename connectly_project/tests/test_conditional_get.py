@@ -0,0 +1,85 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from factories.comment_factory import CommentFactory
+from factories.post_factory import PostFactory
+from posts.models import Follow
+from posts.versions import VERSION_CACHE_KEY, bump_versions, get_versions, new_version
+
+
+class ConditionalGetTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="poller")
+        self.other = User.objects.create(username="writer")
+        self.post = PostFactory.create_post(post_type="text", title="Hello", content="World", author=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get(self, path, **headers):
+        return self.client.get(path, secure=True, **headers)
+
+    def age_versions(self, *names, seconds=2):
+        cache.set_many({VERSION_CACHE_KEY.format(name): new_version() - seconds * 1_000_000_000 for name in names})
+
+    def test_unchanged_post_returns_304_without_queries(self):
+        self.age_versions(f"post_{self.post.id}")
+        first = self.get(f"/posts/{self.post.id}/")
+        self.assertEqual(first.status_code, 200)
+
+        with self.assertNumQueries(0):
+            again = self.get(f"/posts/{self.post.id}/", HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again["ETag"], first["ETag"])
+
+        by_date = self.get(f"/posts/{self.post.id}/", HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+        self.assertEqual(by_date.status_code, 304)
+
+    def test_no_last_modified_within_the_second_of_a_change(self):
+        # A second change in the same second would carry the same Last-Modified
+        first = self.get(f"/posts/{self.post.id}/")
+        self.assertEqual(first.status_code, 200)
+        self.assertNotIn("Last-Modified", first)
+        self.assertIn("ETag", first)
+
+    def test_versions_expire_with_the_response_cache(self):
+        # Never kept forever: a bump in another worker's cache would go unseen
+        with mock.patch("posts.versions.cache") as versions_cache:
+            versions_cache.get_many.return_value = {}
+            get_versions("posts")
+            bump_versions("posts")
+        self.assertEqual(versions_cache.add.call_args.kwargs["timeout"], 300)
+        self.assertEqual(versions_cache.set_many.call_args.kwargs["timeout"], 300)
+
+    def test_new_comment_changes_post_and_list_etags(self):
+        detail = self.get(f"/posts/{self.post.id}/")
+        listing = self.get("/posts/")
+
+        CommentFactory.create_comment(comment_type="text", content="Nice", author=self.other, post=self.post)
+
+        self.assertEqual(self.get(f"/posts/{self.post.id}/", HTTP_IF_NONE_MATCH=detail["ETag"]).status_code, 200)
+        self.assertEqual(self.get("/posts/", HTTP_IF_NONE_MATCH=listing["ETag"]).status_code, 200)
+
+    def test_feed_etag_is_per_user_and_changes_on_follow(self):
+        feed = self.get("/feed/")
+        self.assertEqual(self.get("/feed/", HTTP_IF_NONE_MATCH=feed["ETag"]).status_code, 304)
+
+        # Another user's feed never matches this one's ETag
+        other_client = APIClient()
+        other_client.force_authenticate(self.other)
+        self.assertEqual(other_client.get("/feed/", HTTP_IF_NONE_MATCH=feed["ETag"], secure=True).status_code, 200)
+
+        Follow.objects.create(follower=self.user, following=self.other)
+        self.assertEqual(self.get("/feed/", HTTP_IF_NONE_MATCH=feed["ETag"]).status_code, 200)
+
+    def test_async_feed_shares_validators(self):
+        feed = self.get("/feed/")
+        token = RefreshToken.for_user(self.user).access_token
+        response = self.client.get(
+            "/async/feed/", headers={"Authorization": f"Bearer {token}", "If-None-Match": feed["ETag"]}, secure=True
+        )
+        self.assertEqual(response.status_code, 304)
@@ -0,0 +1,151 @@
+import tempfile
+from pathlib import Path
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework.test import APIClient
+from factories.post_factory import PostFactory
+from posts.db_router import (
+    PrimaryReplicaRouter, choose_replica, is_pinned_to_primary, pin_user_to_primary,
+    route_reads_to, reset_read_route
+)
+from posts.db_snapshot import ensure_snapshot, restore_snapshot
+from posts.middleware import PrimaryPinMiddleware
+from posts.models import Post
+from posts.search import SEARCH_TABLE, _post_row
+
+
+@override_settings(DATABASE_REPLICAS=["replica"], REPLICA_PIN_SECONDS=5)
+class PrimaryReplicaRouterTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.router = PrimaryReplicaRouter()
+
+    def test_reads_use_default_unless_routed(self):
+        self.assertIsNone(self.router.db_for_read(Post))
+
+        token = route_reads_to(choose_replica())
+        try:
+            self.assertEqual(self.router.db_for_read(Post), "replica")
+        finally:
+            reset_read_route(token)
+
+        self.assertIsNone(self.router.db_for_read(Post))
+
+    def test_writes_always_go_to_primary(self):
+        token = route_reads_to("replica")
+        try:
+            self.assertEqual(self.router.db_for_write(Post), "default")
+        finally:
+            reset_read_route(token)
+
+    def test_user_is_pinned_after_write(self):
+        self.assertFalse(is_pinned_to_primary(1))
+        pin_user_to_primary(1)
+        self.assertTrue(is_pinned_to_primary(1))
+        self.assertFalse(is_pinned_to_primary(2))
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas_configured(self):
+        self.assertIsNone(choose_replica())
+
+
+class PrimaryPinMiddlewareTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="writer")
+
+    def test_async_write_pins_user(self):
+        async def get_response(request):
+            return HttpResponse(status=201)
+
+        middleware = PrimaryPinMiddleware(get_response)
+        request = RequestFactory().get("/")
+        request.user = self.user
+        async_to_sync(middleware)(request)
+        self.assertFalse(is_pinned_to_primary(self.user.id))
+
+        request = RequestFactory().post("/")
+        request.user = self.user
+        async_to_sync(middleware)(request)
+        self.assertTrue(is_pinned_to_primary(self.user.id))
+
+
+@override_settings(DATABASE_REPLICAS=["replica"], EVENTS_BACKGROUND_DISPATCH=False)
+class ReplicaRoutingTest(TestCase):
+    """
+    Routing against a second SQLite database holding different rows than the primary,
+    so every response shows which database it was read from.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        # The runner only sets up 'default'; the replica is a copy of the migrated snapshot,
+        # added before TestCase opens its transactions so it is rolled back like the primary
+        cls.tmp = tempfile.TemporaryDirectory()
+        replica = Path(cls.tmp.name) / "replica.sqlite3"
+        restore_snapshot(ensure_snapshot(), replica)
+        connections.settings["replica"] = {**connections["default"].settings_dict, "NAME": str(replica)}
+        cls.databases = {"default", "replica"}
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections["replica"].close()
+        del connections["replica"]
+        del connections.settings["replica"]
+        cls.tmp.cleanup()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username="author")
+        replica_author = User.objects.using("replica").create(id=cls.author.id, username="author")
+        cls.replica_post = Post.objects.using("replica").create(title="On replica", content="", post_type="text",
+                                                                author=replica_author)
+
+    def setUp(self):
+        cache.clear()
+        self.post = PostFactory.create_post(post_type="text", title="On primary", author=self.author)
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def titles(self):
+        response = self.client.get(f"/posts/users/{self.author.id}/posts/", secure=True)
+        self.assertEqual(response.status_code, 200)
+        return [post["title"] for post in response.json()]
+
+    def test_reads_go_to_replica_until_user_writes(self):
+        self.assertEqual(self.titles(), ["On replica"])
+
+        response = self.client.post(f"/posts/{self.post.id}/like/", secure=True)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.titles(), ["On primary"])
+
+        cache.clear()  # Pin expired
+        self.assertEqual(self.titles(), ["On replica"])
+
+    def test_shared_caches_are_filled_from_the_primary(self):
+        self.assertEqual(self.titles(), ["On replica"])  # Uncached reads stay on the replica
+
+        response = self.client.get(f"/posts/batch/?ids={self.post.id}", secure=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([post["title"] for post in response.json()["results"]], ["On primary"])
+        self.assertEqual(cache.get(f"post_{self.post.id}")["data"]["title"], "On primary")
+
+    def test_search_reads_the_replica_index(self):
+        # The index signals only write to the primary; give the replica its own row
+        with connections["replica"].cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE} (rowid, title, content, author, kind, object_id, privacy, owner_id) "
+                "VALUES (%s, %s, %s, %s, %s, %s, %s, %s)",
+                _post_row(self.replica_post),
+            )
+
+        response = self.client.get("/search/?q=replica", secure=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([hit["post"]["title"] for hit in response.json()["results"]], ["On replica"])
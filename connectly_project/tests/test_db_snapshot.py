@@ -0,0 +1,47 @@
+import sqlite3
+import tempfile
+from contextlib import closing
+from pathlib import Path
+
+from django.db import connection
+from django.test import TestCase
+from posts.db_snapshot import applied_migrations, build_snapshot, restore_snapshot, snapshot_is_current
+
+
+class DatabaseSnapshotTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Built before TestCase starts guarding connections: it migrates through its own alias
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.snapshot = Path(cls.tmp.name) / "snapshot.sqlite3"
+        build_snapshot(cls.snapshot)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+        super().tearDownClass()
+
+    def test_snapshot_has_every_migration_applied(self):
+        self.assertTrue(snapshot_is_current(self.snapshot))
+        self.assertIn(("posts", "0001_initial"), applied_migrations(self.snapshot))
+
+    def test_missing_migration_makes_it_stale(self):
+        stale = Path(self.tmp.name) / "stale.sqlite3"
+        restore_snapshot(self.snapshot, stale)
+        with closing(sqlite3.connect(stale)) as db, db:
+            db.execute("DELETE FROM django_migrations WHERE app = 'posts' AND name LIKE '0007%'")
+        self.assertFalse(snapshot_is_current(stale))
+        self.assertFalse(snapshot_is_current(Path(self.tmp.name) / "missing.sqlite3"))
+
+    def test_restore_replaces_the_target_database(self):
+        target = Path(self.tmp.name) / "target.sqlite3"
+        with closing(sqlite3.connect(target)) as db, db:
+            db.execute("CREATE TABLE leftover (id INTEGER)")
+        restore_snapshot(self.snapshot, target)
+
+        with closing(sqlite3.connect(target)) as db:
+            tables = {name for (name,) in db.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            self.assertEqual(db.execute("SELECT COUNT(*) FROM auth_user").fetchone(), (0,))
+        self.assertNotIn("leftover", tables)
+        self.assertLessEqual(set(connection.introspection.table_names()) - {"django_cache"}, tables)
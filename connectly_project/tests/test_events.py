@@ -0,0 +1,111 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from factories.post_factory import PostFactory
+from posts import event_handlers
+from posts.event_handlers import FEED_PAGE_KEY, POST_LIST_PAGE_KEY, user_page_key
+from posts.events import emit
+from posts.models import OutboxEvent
+
+
+@override_settings(EVENTS_BACKGROUND_DISPATCH=False)
+class DomainEventTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create(username="author")
+        self.reader = User.objects.create(username="reader")
+        self.post = PostFactory.create_post(post_type="text", title="Hello", author=self.author)
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def page_key(self, key_format, user):
+        return user_page_key(key_format, user.id, 1)
+
+    def test_event_waits_for_the_commit(self):
+        cache.set(self.page_key(POST_LIST_PAGE_KEY, self.reader), {"": {}})
+        with self.captureOnCommitCallbacks() as callbacks:
+            emit("post_deleted", post=self.post.id, user=self.author.id)
+            # Written with the transaction, handlers not run yet
+            event = OutboxEvent.objects.get(name="post_deleted")
+            self.assertIsNotNone(cache.get(self.page_key(POST_LIST_PAGE_KEY, self.reader)))
+
+        for callback in callbacks:
+            callback()
+        event.refresh_from_db()
+        self.assertIsNotNone(event.processed_at)
+        self.assertIsNone(cache.get(self.page_key(POST_LIST_PAGE_KEY, self.reader)))
+
+    def test_rolled_back_writes_emit_nothing(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            with self.assertRaises(RuntimeError):
+                with transaction.atomic():
+                    emit("post_deleted", post=self.post.id, user=self.author.id)
+                    raise RuntimeError("rollback")
+        self.assertEqual(callbacks, [])
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_like_clears_the_post_list_pages(self):
+        keys = [f"post_{self.post.id}", self.page_key(POST_LIST_PAGE_KEY, self.reader),
+                self.page_key(FEED_PAGE_KEY, self.reader)]
+        cache.set_many({key: {"": {}} for key in keys})
+
+        self.client.force_authenticate(self.reader)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f"/posts/{self.post.id}/like/", secure=True)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertIsNone(cache.get(f"post_{self.post.id}"))
+        self.assertNotIn(self.page_key(POST_LIST_PAGE_KEY, self.reader), keys)
+        self.assertNotIn(self.page_key(FEED_PAGE_KEY, self.reader), keys)
+
+    def test_follow_clears_follower_caches(self):
+        feed_key = self.page_key(FEED_PAGE_KEY, self.reader)
+        cache.set_many({f"user_followers_{self.author.id}": [], feed_key: {}})
+        self.client.force_authenticate(self.reader)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f"/posts/users/{self.author.id}/follow/", secure=True)
+
+        self.assertIsNone(cache.get(f"user_followers_{self.author.id}"))
+        self.assertNotEqual(self.page_key(FEED_PAGE_KEY, self.reader), feed_key)
+        self.assertEqual(OutboxEvent.objects.filter(name="user_followed").count(), 0)
+
+    def test_failed_handler_is_retried_by_process_outbox(self):
+        with mock.patch("posts.purge.run_purge", side_effect=[ConnectionError("down"), None]) as run_purge:
+            with self.captureOnCommitCallbacks(execute=True):
+                emit("post_deleted", post=self.post.id, user=self.author.id, job=1)
+
+            event = OutboxEvent.objects.get(name="post_deleted")
+            self.assertIsNone(event.processed_at)
+            self.assertEqual(event.attempts, 1)
+            self.assertIn("down", event.last_error)
+
+            OutboxEvent.objects.filter(id=event.id).update(created_at=event.created_at - timedelta(minutes=5))
+            out = StringIO()
+            call_command("process_outbox", stdout=out)
+        event.refresh_from_db()
+        self.assertIsNotNone(event.processed_at)
+        self.assertEqual(run_purge.call_count, 2)
+        self.assertIn("Events processed: 1, failed: 0", out.getvalue())
+
+    def test_cache_only_events_write_no_outbox_row(self):
+        cache.set(self.page_key(FEED_PAGE_KEY, self.author), {"": {}})
+        with self.captureOnCommitCallbacks(execute=True):
+            emit("post_liked", post=self.post.id, user=self.reader.id)
+        self.assertFalse(OutboxEvent.objects.exists())
+        # The background fan-out still ran, from memory
+        self.assertIsNone(cache.get(self.page_key(FEED_PAGE_KEY, self.author)))
+
+    def test_process_outbox_purges_old_processed_events(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            emit("post_deleted", post=self.post.id, user=self.author.id)
+        OutboxEvent.objects.update(processed_at=OutboxEvent.objects.get().processed_at - timedelta(days=30))
+
+        call_command("process_outbox", stdout=StringIO())
+        self.assertFalse(OutboxEvent.objects.exists())
@@ -0,0 +1,92 @@
+import csv
+import io
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from factories.comment_factory import CommentFactory
+from factories.post_factory import PostFactory
+from posts.models import Follow, Like
+
+
+class ExportTest(TestCase):
+    def setUp(self):
+        cache.clear()  # Rate limit counters
+        self.user = User.objects.create(username="exporter")
+        self.other = User.objects.create(username="other")
+        self.posts = [PostFactory.create_post(post_type="text", title=f"Post {i}", author=self.user,
+                                              metadata={"n": i}) for i in range(3)]
+        PostFactory.create_post(post_type="text", title="Not mine", author=self.other)
+        CommentFactory.create_comment(comment_type="text", content="Hi", author=self.user, post=self.posts[0])
+        Like.objects.create(user=self.user, post=self.posts[1])
+        Follow.objects.create(follower=self.user, following=self.other)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def export(self, query=""):
+        response = self.client.get(f"/export/{query}", secure=True)
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content).decode()
+
+    def test_ndjson_streams_only_the_users_rows(self):
+        rows = [json.loads(line) for line in self.export().splitlines()]
+        self.assertEqual([row["type"] for row in rows], ["posts"] * 3 + ["comments", "likes", "follows"])
+        self.assertEqual(rows[0]["metadata"], {"n": 0})
+        self.assertNotIn("Not mine", [row.get("title") for row in rows])
+
+    def test_cursor_resumes_after_the_last_row(self):
+        rows = [json.loads(line) for line in self.export().splitlines()]
+        resumed = [json.loads(line) for line in self.export(f"?cursor={rows[1]['cursor']}").splitlines()]
+        self.assertEqual(resumed, rows[2:])
+
+    def test_csv(self):
+        reader = csv.DictReader(io.StringIO(self.export("?output=csv&kinds=likes,posts")))
+        rows = list(reader)
+        self.assertEqual([row["type"] for row in rows], ["posts"] * 3 + ["likes"])
+        self.assertEqual(rows[-1]["post_id"], str(self.posts[1].id))
+
+    def test_only_admins_export_other_users(self):
+        rows = self.export(f"?user={self.other.id}&kinds=posts").splitlines()
+        self.assertEqual(len(rows), 3)  # Still only the requester's own posts
+
+        self.user.is_staff = True
+        self.user.save()
+        rows = self.export("?kinds=posts").splitlines()
+        self.assertEqual(len(rows), 4)
+
+    def test_rows_are_read_only_as_the_response_is_consumed(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/export/?kinds=likes", secure=True)
+        self.assertFalse([q for q in queries if "posts_like" in q["sql"]])
+
+        with CaptureQueriesContext(connection) as queries:
+            body = b"".join(response.streaming_content)
+        self.assertTrue([q for q in queries if "posts_like" in q["sql"]])
+        self.assertEqual(len(body.splitlines()), 1)
+
+    async def test_asgi_export_streams_an_async_iterator(self):
+        token = await sync_to_async(RefreshToken.for_user)(self.user)
+        response = await self.async_client.get("/export/", headers={"Authorization": f"Bearer {token.access_token}"},
+                                               secure=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+        body = b"".join([chunk async for chunk in response.streaming_content])
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([row["type"] for row in rows], ["posts"] * 3 + ["comments", "likes", "follows"])
+
+    def test_bad_parameters(self):
+        self.assertEqual(self.client.get("/export/?output=xml", secure=True).status_code, 400)
+        self.assertEqual(self.client.get("/export/?cursor=nope", secure=True).status_code, 400)
+
+    def test_command(self):
+        out = io.StringIO()
+        call_command("export_data", "--user", str(self.user.id), "--kinds", "follows", stdout=out)
+        row = json.loads(out.getvalue())
+        self.assertEqual(row["following_id"], self.other.id)
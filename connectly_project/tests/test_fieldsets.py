@@ -0,0 +1,55 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from factories.comment_factory import CommentFactory
+from factories.post_factory import PostFactory
+
+
+class SparseFieldsetTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="mobile")
+        for i in range(3):
+            post = PostFactory.create_post(post_type="text", title=f"Post {i}", content="x" * 100, author=self.user)
+            for j in range(2):
+                CommentFactory.create_comment(comment_type="text", content=f"c{j}", author=self.user, post=post)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get(self, path):
+        return self.client.get(path, secure=True).json()
+
+    def test_fields_limits_output(self):
+        data = self.get("/posts/?fields=id,title,like_count")
+        self.assertEqual(set(data["results"][0]), {"id", "title", "like_count"})
+
+    def test_expand_adds_comments(self):
+        data = self.get("/posts/?fields=id&expand=comments")
+        post = data["results"][0]
+        self.assertEqual(set(post), {"id", "comments"})
+        self.assertEqual(len(post["comments"]), 2)
+        self.assertIn("like_count", post["comments"][0])
+
+    def test_default_output_is_unchanged(self):
+        post = self.get("/feed/")["results"][0]
+        self.assertEqual(post["comment_count"], 2)
+        self.assertEqual(len(post["comments"]), 2)
+        self.assertIn("content", post)
+
+    def test_only_requested_columns_are_selected(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.get("/posts/?fields=id,title")
+        post_query = next(q["sql"] for q in queries if 'FROM "posts_post"' in q["sql"] and "LIMIT" in q["sql"])
+        self.assertNotIn('"posts_post"."content"', post_query)
+        self.assertFalse(any('FROM "posts_comment"' in q["sql"] for q in queries))
+
+    def test_counts_do_not_query_per_row(self):
+        with CaptureQueriesContext(connection) as few:
+            self.get("/feed/?page_size=1")
+        cache.clear()
+        with CaptureQueriesContext(connection) as more:
+            self.get("/feed/?page_size=3")
+        self.assertEqual(len(few), len(more))
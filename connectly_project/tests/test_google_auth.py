@@ -0,0 +1,120 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from posts import google_auth
+
+
+class StubOAuthHandler(BaseHTTPRequestHandler):
+    """
+    Minimal stand-in for Google's userinfo endpoint.
+    """
+    hits = 0
+
+    def do_GET(self):
+        StubOAuthHandler.hits += 1
+        bodies = {
+            "Bearer html-token": b"<html>Sign in to the network</html>",
+            "Bearer list-token": b'["social.user@gmail.com"]',
+            "Bearer no-email-token": b'{"id": "1234"}',
+        }
+        if self.headers.get("Authorization") in bodies:
+            body = bodies[self.headers["Authorization"]]
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        if self.headers.get("Authorization") != "Bearer good-token":
+            self.send_response(401)
+            self.end_headers()
+            return
+
+        body = json.dumps({"id": "1234", "email": "social.user@gmail.com", "name": "Social User"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ConvertTokenTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StubOAuthHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.userinfo_url = f"http://127.0.0.1:{cls.server.server_address[1]}/oauth2/v2/userinfo"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        StubOAuthHandler.hits = 0
+        self.client = APIClient()
+        self.settings_override = override_settings(GOOGLE_USERINFO_URL=self.userinfo_url)
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+
+    def convert(self, token, path="/auth/convert-token/"):
+        return self.client.post(path, {"access_token": token}, format="json", secure=True)
+
+    def test_verified_token_is_cached(self):
+        first = self.convert("good-token")
+        second = self.convert("good-token")
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.status_code, 200)
+        self.assertIn("access", second.data)
+        self.assertEqual(StubOAuthHandler.hits, 1)
+
+    def test_social_user_gets_unusable_password(self):
+        self.convert("good-token")
+        user = User.objects.get(email="social.user@gmail.com")
+        self.assertEqual(user.username, "social.user")
+        self.assertFalse(user.has_usable_password())
+
+    def test_invalid_token_is_rejected_and_not_cached(self):
+        self.assertEqual(self.convert("bad-token").status_code, 400)
+        self.assertEqual(self.convert("bad-token").status_code, 400)
+        self.assertEqual(StubOAuthHandler.hits, 2)
+
+    def test_answer_that_is_not_a_user_is_a_failed_verification(self):
+        for token in ("html-token", "list-token", "no-email-token"):
+            self.assertEqual(self.convert(token).status_code, 400)
+            self.assertEqual(self.convert(token, path="/async/auth/convert-token/").status_code, 400)
+        self.assertEqual(StubOAuthHandler.hits, 6)  # Not cached either
+
+    def test_async_endpoint_shares_the_cache(self):
+        self.convert("good-token")
+        response = self.convert("good-token", path="/async/auth/convert-token/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(StubOAuthHandler.hits, 1)
+
+    @override_settings(GOOGLE_USERINFO_URL="http://127.0.0.1:9/unreachable")
+    def test_unreachable_google_fails_fast(self):
+        self.assertEqual(self.convert("good-token").status_code, 400)
+
+    def test_async_client_is_closed_with_its_loop(self):
+        async def reuse():
+            client = await google_auth.get_async_client()
+            self.assertIs(await google_auth.get_async_client(), client)
+            return client
+
+        client = asyncio.run(reuse())
+        self.assertTrue(client.is_closed)
+        self.assertNotIn(client, [entry[0] for entry in google_auth._async_clients.values()])
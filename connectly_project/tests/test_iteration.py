@@ -0,0 +1,41 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from posts.event_handlers import FEED_PAGE_KEY, clear_pages, user_page_key
+from posts.iteration import chunked_ids, iter_ids, keyset_iterator
+
+
+class KeysetIterationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.users = [User.objects.create(username=f"user{i}") for i in range(5)]
+        self.ids = [user.id for user in self.users]
+
+    def test_ids_come_in_chunks_one_query_each(self):
+        with self.assertNumQueries(4):  # Three chunks and the empty query that ends them
+            self.assertEqual(list(chunked_ids(User.objects.all(), chunk_size=2)),
+                             [self.ids[:2], self.ids[2:4], self.ids[4:]])
+        self.assertEqual(list(iter_ids(User.objects.filter(id__gt=self.ids[1]), chunk_size=2)), self.ids[2:])
+
+    def test_rows_respect_only_and_filters(self):
+        users = list(keyset_iterator(User.objects.filter(username__gte="user1").only("id"), chunk_size=3))
+        self.assertEqual([user.id for user in users], self.ids[1:])
+        self.assertEqual(users[0].get_deferred_fields() & {"username"}, {"username"})
+
+    def test_deleting_while_iterating_does_not_skip_rows(self):
+        seen = []
+        for ids in chunked_ids(User.objects.all(), chunk_size=2):
+            seen.extend(ids)
+            User.objects.filter(id__in=ids).delete()
+        self.assertEqual(seen, self.ids)
+
+    def test_clear_pages_reaches_every_user(self):
+        def page_keys():
+            return [user_page_key(FEED_PAGE_KEY, user_id, 1) for user_id in self.ids]
+
+        cached = page_keys()
+        cache.set_many({key: {"": {}} for key in cached})
+        with self.assertNumQueries(0):  # One increment of the feed family's generation, no user scan
+            clear_pages(FEED_PAGE_KEY)
+        self.assertEqual(cache.get_many(page_keys()), {})
+        self.assertTrue(set(page_keys()).isdisjoint(cached))
@@ -0,0 +1,54 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from factories.comment_factory import CommentFactory
+from factories.post_factory import PostFactory
+from posts.models import Follow, Like
+from singletons.config_manager import ConfigManager
+
+
+@override_settings(EVENTS_BACKGROUND_DISPATCH=False)
+class UserProfileTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="heavy", email="heavy@example.com")
+        self.fan = User.objects.create(username="fan")
+        Follow.objects.create(follower=self.fan, following=self.user)
+        for i in range(5):
+            post = PostFactory.create_post(post_type="text", title=f"Post {i}", author=self.user)
+            comment = CommentFactory.create_comment(comment_type="text", content=f"Comment {i}",
+                                                    author=self.user, post=post)
+            Like.objects.create(user=self.fan, comment=comment)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.page_size = ConfigManager().get_setting("DEFAULT_PAGE_SIZE")
+        ConfigManager().set_setting("DEFAULT_PAGE_SIZE", 2)
+
+    def tearDown(self):
+        ConfigManager().set_setting("DEFAULT_PAGE_SIZE", self.page_size)
+
+    def test_sections_are_paginated_independently(self):
+        profile = self.client.get("/profile/", secure=True).json()
+        self.assertEqual(profile["followers_count"], 1)
+        self.assertEqual(profile["posts_count"], 5)
+        self.assertEqual([post["title"] for post in profile["posts"]["results"]], ["Post 4", "Post 3"])
+        self.assertEqual(profile["comments"]["results"][0]["like_count"], 1)
+
+        # Paging through comments leaves the posts section where it was
+        second = self.client.get(profile["comments"]["next"], secure=True).json()
+        self.assertEqual([c["content"] for c in second["comments"]["results"]], ["Comment 2", "Comment 1"])
+        self.assertEqual([post["title"] for post in second["posts"]["results"]], ["Post 4", "Post 3"])
+
+    def test_query_count_does_not_grow_with_activity(self):
+        self.client.get("/profile/", secure=True)  # Caches the counters
+        with self.assertNumQueries(3):  # Posts page, its prefetched comments, comments page
+            self.client.get("/profile/", secure=True)
+
+    def test_counters_follow_writes(self):
+        self.client.get("/profile/", secure=True)
+        self.client.force_authenticate(self.fan)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f"/posts/users/{self.user.id}/follow/", secure=True)  # Unfollow
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.get("/profile/", secure=True).json()["followers_count"], 0)
@@ -0,0 +1,129 @@
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db.models.query import QuerySet
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from factories.comment_factory import CommentFactory
+from factories.post_factory import PostFactory
+from posts.models import Comment, Follow, Like, Post, PurgeJob
+from posts.purge import run_purge, soft_delete_post
+from posts.search import SearchResults
+
+
+@override_settings(EVENTS_BACKGROUND_DISPATCH=False)
+class PurgeTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create(username="admin", is_staff=True)
+        self.author = User.objects.create(username="author")
+        self.fan = User.objects.create(username="fan")
+        self.post = PostFactory.create_post(post_type="text", title="Doomed", author=self.author)
+        for i in range(3):
+            comment = CommentFactory.create_comment(comment_type="text", content=f"c{i}", author=self.fan,
+                                                    post=self.post)
+            Like.objects.create(user=self.author, comment=comment)
+        Like.objects.create(user=self.fan, post=self.post)
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def test_deleted_post_disappears_at_once_and_is_purged_after_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.delete(f"/posts/{self.post.id}/", secure=True)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()["status"], "pending")
+
+        # Hidden before the purge has run
+        self.assertEqual(self.client.get(f"/posts/{self.post.id}/", secure=True).status_code, 404)
+        self.assertFalse(Post.objects.exists() or Comment.objects.exists())
+        self.assertTrue(Post.all_objects.filter(id=self.post.id).exists())
+
+        for callback in callbacks:
+            callback()
+        self.assertFalse(Post.all_objects.exists() or Comment.all_objects.exists() or Like.objects.exists())
+        job = self.client.get(f"/posts/purge-jobs/{response.json()['id']}/", secure=True).json()
+        self.assertEqual((job["status"], job["deleted_rows"]), ("done", 8))
+
+    def test_deleted_post_is_never_answered_304_before_the_purge(self):
+        detail = self.client.get(f"/posts/{self.post.id}/", secure=True)
+        listing = self.client.get("/posts/", secure=True)
+        self.assertEqual(SearchResults("doomed", self.author).count(), 1)
+
+        with mock.patch("posts.purge.run_purge"), self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f"/posts/{self.post.id}/", secure=True)
+        self.assertTrue(Post.all_objects.filter(id=self.post.id).exists())  # Not purged yet
+
+        again = self.client.get(f"/posts/{self.post.id}/", HTTP_IF_NONE_MATCH=detail["ETag"], secure=True)
+        self.assertEqual(again.status_code, 404)
+        self.assertEqual(self.client.get("/posts/", HTTP_IF_NONE_MATCH=listing["ETag"], secure=True).status_code, 200)
+        self.assertEqual(SearchResults("doomed", self.author).count(), 0)
+
+    def test_purge_job_is_private_to_the_requester(self):
+        job = soft_delete_post(self.post, self.author)
+        self.client.force_authenticate(self.fan)
+        self.assertEqual(self.client.get(f"/posts/purge-jobs/{job.id}/", secure=True).status_code, 404)
+        self.client.force_authenticate(self.admin)
+        self.assertEqual(self.client.get(f"/posts/purge-jobs/{job.id}/", secure=True).status_code, 200)
+
+    def test_failed_purge_resumes_where_it_stopped(self):
+        job = soft_delete_post(self.post, self.author)
+        real_delete = QuerySet.delete
+        calls = []
+
+        def flaky_delete(queryset):
+            calls.append(queryset.model)
+            if queryset.model is Comment and len([m for m in calls if m is Comment]) == 2:
+                raise RuntimeError("database went away")
+            return real_delete(queryset)
+
+        with mock.patch.object(QuerySet, "delete", flaky_delete):
+            with self.assertRaises(RuntimeError):
+                run_purge(job.id, chunk_size=2)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.step), ("failed", "comments"))
+        self.assertEqual(Comment.all_objects.count(), 1)  # The first chunk stayed deleted
+
+        out = StringIO()
+        call_command("purge_deleted", stdout=out)
+        self.assertIn(f"Purge job {job.id} done", out.getvalue())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.last_error), ("done", ""))
+        self.assertFalse(Post.all_objects.exists())
+
+    def test_media_files_are_deleted_with_their_rows(self):
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            name = default_storage.save("posts/images/doomed.png", ContentFile(b"png"))
+            Post.objects.filter(id=self.post.id).update(image=name)
+
+            job = soft_delete_post(self.post, self.author)
+            with self.captureOnCommitCallbacks(execute=True):
+                run_purge(job.id)
+            self.assertFalse(default_storage.exists(name))
+        job.refresh_from_db()
+        self.assertEqual(job.deleted_files, 1)
+
+    def test_deleted_user_is_deactivated_then_purged(self):
+        Follow.objects.create(follower=self.fan, following=self.author)
+        self.client.force_authenticate(self.admin)
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.delete(f"/posts/users/{self.author.id}/", secure=True)
+        self.assertEqual(response.status_code, 202)
+
+        self.assertFalse(User.objects.get(id=self.author.id).is_active)
+        self.assertEqual(self.client.get(f"/posts/users/{self.author.id}/", secure=True).status_code, 404)
+        self.assertFalse(Post.objects.exists())
+        users = [user["username"] for user in self.client.get("/posts/users/", secure=True).json()["results"]]
+        self.assertNotIn("author", users)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            for callback in callbacks:
+                callback()
+        self.assertFalse(User.objects.filter(id=self.author.id).exists())
+        self.assertFalse(Post.all_objects.exists() or Follow.objects.exists() or Like.objects.exists())
+        self.assertEqual(PurgeJob.objects.get().status, "done")
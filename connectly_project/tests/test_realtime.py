@@ -0,0 +1,80 @@
+import asyncio
+import threading
+from contextlib import suppress
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from factories.post_factory import PostFactory
+from posts.models import Follow, Like
+from posts.realtime import LocalBroker, get_broker
+
+
+class LocalBrokerTest(TestCase):
+    async def test_events_reach_only_subscribed_channels(self):
+        broker = LocalBroker()
+        alice = broker.subscribe({"notify_1", "post_7"})
+        bob = broker.subscribe({"notify_2"})
+
+        # Published from another thread, like a sync view would
+        thread = threading.Thread(target=broker.publish, args=(["post_7", "notify_1"], {"type": "post_liked"}))
+        thread.start()
+        thread.join()
+
+        event = await asyncio.wait_for(alice.get(), timeout=1)
+        self.assertEqual(event["type"], "post_liked")
+        self.assertTrue(alice.queue.empty())  # Delivered once even though both channels matched
+        self.assertTrue(bob.queue.empty())
+
+        broker.unsubscribe(alice)
+        self.assertEqual(broker.publish(["post_7"], {"type": "post_liked"}), 0)
+
+
+class EventStreamTest(TestCase):
+    def setUp(self):
+        self.reader = User.objects.create(username="reader")
+        self.author = User.objects.create(username="author")
+        self.post = PostFactory.create_post(post_type="text", title="Mine", author=self.reader)
+        Follow.objects.create(follower=self.reader, following=self.author)
+        token = RefreshToken.for_user(self.reader).access_token
+        self.headers = {"Authorization": f"Bearer {token}"}
+
+    def write_and_commit(self, write):
+        with self.captureOnCommitCallbacks(execute=True):
+            write()
+
+    async def next_event(self, stream):
+        while True:
+            chunk = await asyncio.wait_for(anext(stream), timeout=2)
+            chunk = chunk.decode() if isinstance(chunk, bytes) else chunk
+            if chunk.startswith("id:"):
+                return chunk
+
+    async def test_stream_pushes_relevant_events(self):
+        response = await self.async_client.get("/events/", headers=self.headers, secure=True)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        stream = aiter(response.streaming_content)
+        self.assertTrue((await anext(stream)).startswith(b"retry:"))
+
+        # A like on the reader's post
+        await sync_to_async(self.write_and_commit)(lambda: Like.objects.create(user=self.author, post=self.post))
+        self.assertIn("event: post_liked", await self.next_event(stream))
+
+        # A public post by someone the reader follows
+        await sync_to_async(self.write_and_commit)(
+            lambda: PostFactory.create_post(post_type="text", title="News", author=self.author)
+        )
+        self.assertIn("event: post_created", await self.next_event(stream))
+
+        # A client disconnect cancels the pending read, which must drop the subscription
+        pending = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0.05)
+        pending.cancel()
+        with suppress(asyncio.CancelledError):
+            await pending
+        self.assertEqual(get_broker().subscriber_count(), 0)
+
+    async def test_requires_authentication(self):
+        response = await self.async_client.get("/events/", secure=True)
+        self.assertEqual(response.status_code, 401)
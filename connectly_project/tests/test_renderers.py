@@ -0,0 +1,40 @@
+import datetime
+import uuid
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from posts.renderers import FastJSONRenderer
+
+
+class FastJSONTest(TestCase):
+    def test_matches_drf_output(self):
+        data = {
+            "when": datetime.datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+            "day": datetime.date(2024, 5, 1),
+            "price": Decimal("9.99"),
+            "id": uuid.UUID(int=1),
+            "nested": [{"title": "Café", 3: None}],
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_line_and_paragraph_separators_are_escaped(self):
+        data = {"content": "one\u2028two\u2029three"}
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertIn(b"\\u2028", FastJSONRenderer().render(data))
+
+    def test_non_finite_floats_render_as_null(self):
+        # Known difference from DRF, which raises under STRICT_JSON (posts/renderers.py)
+        data = {"nan": float("nan"), "inf": float("inf"), "ninf": float("-inf")}
+        self.assertEqual(FastJSONRenderer().render(data), b'{"nan":null,"inf":null,"ninf":null}')
+        with self.assertRaises(ValueError):
+            JSONRenderer().render(data)
+
+    def test_invalid_json_body_is_rejected(self):
+        user = User.objects.create(username="poster")
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.post("/posts/", data=b"{not json", content_type="application/json", secure=True)
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,62 @@
+import gzip
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from factories.post_factory import PostFactory
+from posts.event_handlers import POST_LIST_PAGE_KEY, user_page_key
+from posts.renderers import dumps
+from posts.response_cache import variant_cache_key
+
+
+@override_settings(EVENTS_BACKGROUND_DISPATCH=False)
+class ResponseCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="reader")
+        PostFactory.create_post(post_type="text", title="Hello", content="World " * 50, author=self.user)
+        PostFactory.create_post(post_type="text", title="Other", content="Stuff " * 50, author=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def page_key(self):
+        return user_page_key(POST_LIST_PAGE_KEY, self.user.id, 1)
+
+    # The plain post list is the shared one (posts/visibility.py); reordered lists are cached per user
+    def test_cache_hit_returns_the_stored_bytes(self):
+        miss = self.client.get("/posts/?ordering=-created_at", secure=True)
+        entry = cache.get(variant_cache_key(self.page_key(), "ordering=-created_at"))
+        hit = self.client.get("/posts/?ordering=-created_at", secure=True)
+
+        self.assertEqual(entry["body"], dumps(miss.data))
+        self.assertEqual(hit.content, miss.content)
+        self.assertEqual(hit["Content-Type"], "application/json")
+
+    def test_gzip_variant_is_served_to_clients_that_accept_it(self):
+        miss = self.client.get("/posts/?ordering=-created_at", secure=True)
+        hit = self.client.get("/posts/?ordering=-created_at", HTTP_ACCEPT_ENCODING="gzip, deflate", secure=True)
+
+        self.assertEqual(hit["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", hit["Vary"])
+        self.assertEqual(gzip.decompress(hit.content), miss.content)
+
+    def test_query_params_get_their_own_variant(self):
+        self.client.get("/posts/?ordering=-created_at", secure=True)
+        searched = self.client.get("/posts/?search=Hello", secure=True).json()
+        self.assertEqual([post["title"] for post in searched["results"]], ["Hello"])
+
+        # Each variant has its own key, and both go away with their page
+        variants = [variant_cache_key(self.page_key(), variant) for variant in ("ordering=-created_at", "search=Hello")]
+        self.assertEqual(len(cache.get_many(variants)), 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post("/posts/", {"title": "New", "content": "x", "post_type": "text"}, format="json",
+                             secure=True)
+        self.assertIsNone(cache.get(variant_cache_key(self.page_key(), "search=Hello")))
+
+    def test_async_feed_shares_cached_pages(self):
+        sync_page = self.client.get("/feed/", secure=True)
+        token = RefreshToken.for_user(self.user).access_token
+        async_page = self.client.get("/async/feed/", headers={"Authorization": f"Bearer {token}"}, secure=True)
+        self.assertEqual(async_page.content, sync_page.content)
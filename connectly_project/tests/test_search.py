@@ -0,0 +1,73 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+from factories.comment_factory import CommentFactory
+from factories.post_factory import PostFactory
+from posts.search import SearchResults
+
+
+class SearchTest(TestCase):
+    def setUp(self):
+        self.alice = User.objects.create(username="alice")
+        self.bob = User.objects.create(username="bob")
+
+        self.django_post = PostFactory.create_post(
+            post_type="text", title="Django tips", content="Using the ORM well", author=self.alice
+        )
+        self.python_post = PostFactory.create_post(
+            post_type="text", title="Weekend", content="Wrote some django code", author=self.alice
+        )
+        self.private_post = PostFactory.create_post(
+            post_type="text", title="Django secrets", content="hidden", author=self.alice, privacy="private"
+        )
+        self.comment = CommentFactory.create_comment(
+            comment_type="text", content="Great django tutorial", author=self.bob, post=self.python_post
+        )
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.bob)
+
+    def search(self, **params):
+        return self.client.get("/search/", params, secure=True)
+
+    def test_title_matches_rank_first(self):
+        results = list(SearchResults("django", self.bob, kind="post")[0:10])
+        self.assertEqual([instance.id for kind, instance, rank in results],
+                         [self.django_post.id, self.python_post.id])
+
+    def test_private_posts_hidden_from_others(self):
+        response = self.search(q="secrets")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 0)
+
+        self.client.force_authenticate(self.alice)
+        response = self.search(q="secrets")
+        self.assertEqual(response.data["count"], 1)
+
+    def test_prefix_query_and_pagination(self):
+        response = self.search(q="dja*")
+        self.assertEqual(response.data["count"], 3)  # two public posts and one comment
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertIsNotNone(response.data["next"])
+
+    def test_index_follows_writes(self):
+        self.comment.delete()
+        response = self.search(q="tutorial")
+        self.assertEqual(response.data["count"], 0)
+
+        self.django_post.privacy = "private"
+        self.django_post.save()
+        response = self.search(q="tips")
+        self.assertEqual(response.data["count"], 0)
+
+    def test_reindex_command(self):
+        call_command("reindex_search", stdout=StringIO())
+        response = self.search(q="tutorial", type="comment")
+        self.assertEqual(response.data["count"], 1)
+        self.assertEqual(response.data["results"][0]["comment"]["id"], self.comment.id)
+
+    def test_missing_query(self):
+        self.assertEqual(self.search().status_code, 400)
@@ -1,5 +1,15 @@
-from django.test import TestCase
-from singletons.config_manager import ConfigManager  
+import json
+import os
+import signal
+import tempfile
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from factories.post_factory import PostFactory
+from singletons.config_manager import ConfigManager
 
 class ConfigManagerTest(TestCase):
     def test_singleton_instance(self):
@@ -15,4 +25,63 @@ class ConfigManagerTest(TestCase):
 
         # Assert that setting persists across instances
         new_config = ConfigManager()
-        self.assertEqual(new_config.get_setting("DEFAULT_PAGE_SIZE"), 50)
\ No newline at end of file
+        self.assertEqual(new_config.get_setting("DEFAULT_PAGE_SIZE"), 50)
+
+class RuntimeConfigTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.config = ConfigManager()
+
+    def tearDown(self):
+        os.environ.pop("CONNECTLY_FEED_PAGE_SIZE", None)
+        self.config.reload()
+
+    def test_env_values_are_typed(self):
+        os.environ["CONNECTLY_FEED_PAGE_SIZE"] = "5"
+        self.config.reload()
+        self.assertEqual(self.config.get_setting("FEED_PAGE_SIZE"), 5)
+
+    def test_invalid_values_are_rejected(self):
+        with self.assertRaises(ValueError):
+            self.config.set_setting("RATE_LIMIT", "lots")
+
+        # A bad source value keeps the default instead of breaking reload
+        os.environ["CONNECTLY_FEED_PAGE_SIZE"] = "two"
+        self.config.reload()
+        self.assertEqual(self.config.get_setting("FEED_PAGE_SIZE"), 2)
+
+    def test_settings_override_reaches_pagination(self):
+        author = User.objects.create(username="author")
+        for i in range(3):
+            PostFactory.create_post(post_type="text", title=f"Post {i}", author=author)
+        client = APIClient()
+        client.force_authenticate(author)
+
+        with override_settings(CONNECTLY_CONFIG={"FEED_PAGE_SIZE": 1}):
+            response = client.get("/posts/", secure=True)
+        self.assertEqual(len(response.json()["results"]), 1)
+
+    @skipUnless(hasattr(signal, "SIGHUP"), "needs SIGHUP")
+    def test_config_file_reloads_on_sighup(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+            json.dump({"RATE_LIMIT": 7}, f)
+        self.addCleanup(os.remove, f.name)
+
+        with override_settings(CONNECTLY_CONFIG_FILE=f.name):
+            self.assertEqual(self.config.get_setting("RATE_LIMIT"), 7)
+
+            with open(f.name, "w") as f2:
+                json.dump({"RATE_LIMIT": 9}, f2)
+            self.assertTrue(self.config.install_reload_signal())
+            self.addCleanup(self.config.remove_reload_signal)
+            handler = signal.getsignal(signal.SIGHUP)
+            self.assertTrue(self.config.install_reload_signal())
+            self.assertIs(signal.getsignal(signal.SIGHUP), handler)  # Not chained a second time
+
+            os.kill(os.getpid(), signal.SIGHUP)
+            self.assertEqual(self.config.get_setting("RATE_LIMIT"), 9)
+
+    @skipUnless(hasattr(signal, "SIGHUP"), "needs SIGHUP")
+    def test_app_startup_leaves_sighup_alone(self):
+        # Only the WSGI/ASGI entry points install the reload handler
+        self.assertEqual(signal.getsignal(signal.SIGHUP), signal.SIG_DFL)
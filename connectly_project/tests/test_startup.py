@@ -0,0 +1,33 @@
+import os
+import sys
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from django.urls import resolve
+from posts.management.commands.profile_startup import LAZY_MODULES, Command as ProfileStartup
+
+
+class StartupTest(SimpleTestCase):
+    def test_lazy_modules_stay_out_of_startup(self):
+        _, imports = ProfileStartup().profile()
+        loaded = {name for name, _, _ in imports}
+        self.assertEqual([name for name in LAZY_MODULES if name in loaded], [])
+
+    # Wall-clock timing depends on the machine, so the budget is only checked on request
+    @skipUnless(os.environ.get("CONNECTLY_CHECK_STARTUP_BUDGET"), "set CONNECTLY_CHECK_STARTUP_BUDGET=1 to time startup")
+    def test_cold_start_is_within_budget(self):
+        # Fails with CommandError if over STARTUP_IMPORT_BUDGET_MS or a lazy module loads eagerly
+        out = StringIO()
+        call_command("profile_startup", "--top", "5", stdout=out)
+        self.assertIn("Startup is within budget.", out.getvalue())
+
+    def test_google_login_is_loaded_on_first_request(self):
+        view = resolve("/auth/google/").func
+        self.assertEqual(view.lazy_view_path, "posts.social_views.GoogleLogin")
+        self.assertTrue(view.csrf_exempt)
+
+        response = self.client.get("/auth/google/", secure=True)
+        self.assertEqual(response.status_code, 405)  # The real view answered: login is POST only
+        self.assertIn("posts.social_views", sys.modules)
@@ -0,0 +1,43 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+from factories.post_factory import PostFactory
+from posts.throttling import SlidingWindowThrottle
+from singletons.config_manager import ConfigManager
+
+
+class RateLimitTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.config = ConfigManager()
+        self.saved_scopes = self.config.get_setting("RATE_LIMIT_SCOPES")
+        self.config.set_setting("RATE_LIMIT_SCOPES", {**self.saved_scopes, "likes": 2})
+
+        self.user = User.objects.create(username="spammer")
+        self.post = PostFactory.create_post(post_type="text", title="Target", author=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def tearDown(self):
+        self.config.set_setting("RATE_LIMIT_SCOPES", self.saved_scopes)
+
+    def like(self):
+        return self.client.post(f"/posts/{self.post.id}/like/", secure=True)
+
+    def test_endpoint_scope_limit_returns_retry_after(self):
+        self.assertEqual(self.like().status_code, 201)
+        self.assertEqual(self.like().status_code, 200)
+
+        response = self.like()
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response["Retry-After"]), 0)
+
+        # Other endpoints are only bound by the overall per-user limit
+        self.assertEqual(self.client.get("/posts/", secure=True).status_code, 200)
+
+    def test_wait_accounts_for_previous_window(self):
+        # 10 requests last window, 5 so far in this one, limit 10, 50% into the window:
+        # estimate is 10*0.5 + 5 = 10, the next request must wait until 60% in
+        self.assertEqual(SlidingWindowThrottle.compute_wait(10, 6, 10, 0.5, 60), 6)
+        self.assertEqual(SlidingWindowThrottle.compute_wait(10, 10, 10, 0.5, 60), 30)
@@ -0,0 +1,65 @@
+import time
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+from factories.comment_factory import CommentFactory
+from factories.post_factory import PostFactory
+from posts import trending
+from posts.models import Like, PostScore
+
+
+class TrendingTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="fan")
+        self.other = User.objects.create(username="other_fan")
+        self.quiet = PostFactory.create_post(post_type="text", title="Quiet", author=self.user)
+        self.liked = PostFactory.create_post(post_type="text", title="Liked", author=self.user)
+        self.discussed = PostFactory.create_post(post_type="text", title="Discussed", author=self.user)
+        self.hidden = PostFactory.create_post(post_type="text", title="Hidden", author=self.user, privacy="private")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def titles(self):
+        response = self.client.get("/posts/trending/?page_size=3", secure=True)
+        return [post["title"] for post in response.json()["results"]]
+
+    def test_ranks_by_likes_and_comments(self):
+        Like.objects.create(user=self.user, post=self.liked)
+        Like.objects.create(user=self.other, post=self.liked)
+        CommentFactory.create_comment(comment_type="text", content="!", author=self.other, post=self.discussed)
+        Like.objects.create(user=self.user, post=self.hidden)
+
+        # One comment (weight 3) beats two likes; unscored and private posts are left out
+        self.assertEqual(self.titles(), ["Discussed", "Liked"])
+
+    def test_unlike_removes_the_contribution(self):
+        like = Like.objects.create(user=self.user, post=self.liked)
+        self.assertAlmostEqual(trending.current_score(PostScore.objects.get(pk=self.liked.pk).hot), 1, places=2)
+
+        like.delete()
+        self.assertFalse(PostScore.objects.filter(pk=self.liked.pk).exists())
+
+    def test_scores_decay_with_age(self):
+        two_half_lives_ago = time.time() - 2 * trending.half_life_seconds()
+        trending.record_event(self.quiet.id, 4, at=two_half_lives_ago)
+        self.assertAlmostEqual(trending.current_score(PostScore.objects.get(pk=self.quiet.pk).hot), 1, places=2)
+
+        # A fresh like now outranks four old ones
+        trending.record_event(self.liked.id, 2)
+        self.assertEqual(self.titles(), ["Liked", "Quiet"])
+
+    def test_compaction_and_rebuild(self):
+        trending.record_event(self.quiet.id, 1, at=time.time() - 20 * trending.half_life_seconds())
+        Like.objects.create(user=self.user, post=self.liked)
+
+        out = StringIO()
+        call_command("compact_trending", stdout=out)
+        self.assertIn("Removed 1", out.getvalue())
+        self.assertEqual(list(PostScore.objects.values_list("post_id", flat=True)), [self.liked.id])
+
+        hot = PostScore.objects.get(pk=self.liked.pk).hot
+        call_command("compact_trending", "--rebuild", stdout=StringIO())
+        self.assertAlmostEqual(PostScore.objects.get(pk=self.liked.pk).hot, hot, places=6)
@@ -0,0 +1,97 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from factories.post_factory import PostFactory
+from posts.event_handlers import POST_LIST_PAGE_KEY, PRIVATE_POST_PAGE_KEY, PUBLIC_POST_PAGE_KEY, user_page_key
+from posts.models import Post
+from posts.response_cache import page_cache_key, variant_cache_key
+
+
+@override_settings(EVENTS_BACKGROUND_DISPATCH=False)
+class SharedPostListTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create(username="alice")
+        self.bob = User.objects.create(username="bob")
+        now = timezone.now()
+        # Private posts interleaved with public ones, including same-second ties
+        for i in range(12):
+            author = self.alice if i % 3 else self.bob
+            privacy = 'private' if i % 4 == 1 or i == 6 else 'public'
+            post = PostFactory.create_post(post_type="text", title=f"Post {i}", author=author, privacy=privacy)
+            Post.objects.filter(id=post.id).update(created_at=now - timedelta(seconds=i // 2))
+        self.client = APIClient()
+
+    def titles(self, user, page_size):
+        self.client.force_authenticate(user)
+        titles, url = [], f"/posts/?page_size={page_size}"
+        while url:
+            data = self.client.get(url, secure=True).json()
+            titles.extend(post["title"] for post in data["results"])
+            url = data["next"]
+        self.assertEqual(data["count"], len(titles))
+        return titles
+
+    def expected(self, user):
+        return list(Post.objects.filter(privacy='public').union(Post.objects.filter(author=user))
+                    .order_by('-created_at', '-id').values_list("title", flat=True))
+
+    def test_pages_merge_the_public_list_with_own_private_posts(self):
+        for user in (self.alice, self.bob):
+            for page_size in (1, 2, 3):
+                self.assertEqual(self.titles(user, page_size), self.expected(user))
+
+    def test_public_pages_are_cached_once_for_every_user(self):
+        self.titles(self.alice, 3)
+        self.titles(self.bob, 3)
+        # Filled by alice's requests, read by bob's
+        self.assertIsNotNone(cache.get(variant_cache_key(page_cache_key(PUBLIC_POST_PAGE_KEY, 1), "page_size=3")))
+        self.assertIsNotNone(cache.get(self.private_chunk_key(self.alice, 1, "page_size=3")))
+        self.assertIsNone(cache.get(user_page_key(POST_LIST_PAGE_KEY, self.alice.id, 1)))
+
+    def private_chunk_key(self, user, chunk, variant):
+        return variant_cache_key(user_page_key(PRIVATE_POST_PAGE_KEY, user.id, chunk), variant)
+
+    def test_a_page_loads_only_the_chunks_it_needs(self):
+        now = timezone.now()
+        for i in range(40):
+            post = PostFactory.create_post(post_type="text", title=f"Old {i}", author=self.alice, privacy='private')
+            Post.objects.filter(id=post.id).update(created_at=now - timedelta(days=1, seconds=i))
+        cache.clear()
+
+        self.client.force_authenticate(self.alice)
+        data = self.client.get("/posts/?page_size=2&page=8", secure=True).json()
+        self.assertEqual([post["title"] for post in data["results"]], self.expected(self.alice)[14:16])
+        cached = [chunk for chunk in range(1, 25) if cache.get(self.private_chunk_key(self.alice, chunk, "page_size=2"))]
+        self.assertLess(len(cached), 8)  # A binary search's worth, not all 22 chunks
+
+        self.assertEqual(self.titles(self.alice, 2), self.expected(self.alice))
+
+    def test_new_private_post_is_only_seen_by_its_author(self):
+        self.titles(self.alice, 3)
+        self.titles(self.bob, 3)
+        self.client.force_authenticate(self.bob)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post("/posts/", {"title": "Secret", "content": "x", "post_type": "text", "privacy": "private"},
+                             format="json", secure=True)
+
+        self.assertEqual(self.titles(self.bob, 3)[0], "Secret")
+        self.assertNotIn("Secret", self.titles(self.alice, 3))
+
+    def test_out_of_range_page_is_not_found(self):
+        self.client.force_authenticate(self.bob)
+        self.assertEqual(self.client.get("/posts/?page=99", secure=True).status_code, 404)
+        self.assertEqual(self.client.get("/posts/?page=0", secure=True).status_code, 404)
+
+    def test_user_post_views_apply_the_same_rules(self):
+        private = Post.objects.filter(author=self.alice, privacy='private').first()
+        self.client.force_authenticate(self.bob)
+        posts = self.client.get(f"/posts/users/{self.alice.id}/posts/", secure=True).json()
+        self.assertNotIn(private.title, [post["title"] for post in posts])
+        self.assertEqual(self.client.get(f"/posts/{private.id}/users/{self.alice.id}/", secure=True).status_code, 400)
+        self.client.force_authenticate(self.alice)
+        self.assertEqual(self.client.get(f"/posts/{private.id}/users/{self.alice.id}/", secure=True).status_code, 200)